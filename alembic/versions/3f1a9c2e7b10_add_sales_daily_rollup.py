@@ -0,0 +1,38 @@
+"""add sales daily rollup
+
+Revision ID: 3f1a9c2e7b10
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2e7b10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_daily_rollup',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('sale_day', sa.Date(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('product_id', 'sale_day'),
+    )
+    op.create_index(op.f('ix_sales_daily_rollup_sale_day'), 'sales_daily_rollup', ['sale_day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sales_daily_rollup_sale_day'), table_name='sales_daily_rollup')
+    op.drop_table('sales_daily_rollup')
@@ -0,0 +1,54 @@
+"""add inventory events
+
+Revision ID: 8b4d2e6f1a03
+Revises: b9d2f4a6c815
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4d2e6f1a03'
+down_revision: Union[str, None] = 'b9d2f4a6c815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'inventory_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('inventory_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('low_stock_threshold', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.ForeignKeyConstraint(['inventory_id'], ['inventory.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_inventory_events_id'), 'inventory_events', ['id'], unique=False)
+    op.create_index(op.f('ix_inventory_events_created_at'), 'inventory_events', ['created_at'], unique=False)
+    op.create_index('ix_inventory_events_inventory_created', 'inventory_events', ['inventory_id', 'created_at'], unique=False)
+    op.create_index('ix_inventory_events_product_created', 'inventory_events', ['product_id', 'created_at'], unique=False)
+
+    # Seed one snapshot per existing item so current state keeps showing up in history
+    op.execute(
+        "INSERT INTO inventory_events "
+        "(inventory_id, product_id, delta, quantity, low_stock_threshold, reason, created_at) "
+        "SELECT id, product_id, 0, quantity, low_stock_threshold, 'snapshot', "
+        "COALESCE(updated_at, created_at, CURRENT_TIMESTAMP) FROM inventory"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_events_product_created', table_name='inventory_events')
+    op.drop_index('ix_inventory_events_inventory_created', table_name='inventory_events')
+    op.drop_index(op.f('ix_inventory_events_created_at'), table_name='inventory_events')
+    op.drop_index(op.f('ix_inventory_events_id'), table_name='inventory_events')
+    op.drop_table('inventory_events')
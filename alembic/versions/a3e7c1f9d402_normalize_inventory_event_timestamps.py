@@ -0,0 +1,34 @@
+"""normalize inventory event timestamps
+
+Revision ID: a3e7c1f9d402
+Revises: f6b1d8e4a327
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e7c1f9d402'
+down_revision: Union[str, None] = 'f6b1d8e4a327'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite keeps datetimes as text. Events stamped by CURRENT_TIMESTAMP (the
+    # seeded snapshots and those written before record_event set created_at)
+    # lack the microseconds SQLAlchemy writes, and sort below a history cursor
+    # taken from an event in the same second
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "UPDATE inventory_events SET created_at = created_at || '.000000' "
+            "WHERE length(created_at) = 19"
+        )
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,58 @@
+"""drop sales daily rollup product fk
+
+Revision ID: b9d2f4a6c815
+Revises: 3f1a9c2e7b10
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d2f4a6c815'
+down_revision: Union[str, None] = '3f1a9c2e7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rollup_without_fk() -> sa.Table:
+    return sa.Table(
+        'sales_daily_rollup',
+        sa.MetaData(),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('sale_day', sa.Date(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.PrimaryKeyConstraint('product_id', 'sale_day'),
+        sa.Index('ix_sales_daily_rollup_sale_day', 'sale_day'),
+    )
+
+
+def upgrade() -> None:
+    # Rollup rows outlive deleted products, and sales without a product are
+    # kept under product_id 0, so the key to products has to go
+    bind = op.get_bind()
+    foreign_keys = [
+        fk for fk in sa.inspect(bind).get_foreign_keys('sales_daily_rollup')
+        if fk['referred_table'] == 'products'
+    ]
+    if not foreign_keys:
+        return
+    if bind.dialect.name == 'sqlite':
+        # SQLite cannot drop a constraint; the table is copied without it
+        with op.batch_alter_table('sales_daily_rollup', copy_from=_rollup_without_fk(), recreate='always'):
+            pass
+    else:
+        for fk in foreign_keys:
+            op.drop_constraint(fk['name'], 'sales_daily_rollup', type_='foreignkey')
+
+
+def downgrade() -> None:
+    # Rows under product_id 0 and under deleted products reference no product,
+    # so the key is not restored
+    pass
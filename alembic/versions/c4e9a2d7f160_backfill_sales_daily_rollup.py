@@ -0,0 +1,37 @@
+"""backfill sales daily rollup
+
+Revision ID: c4e9a2d7f160
+Revises: a3e7c1f9d402
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a2d7f160'
+down_revision: Union[str, None] = 'a3e7c1f9d402'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 3f1a9c2e7b10 created the rollup empty, so the revenue endpoints of a
+    # database upgraded past it reported nothing for its existing sales.
+    # Recompute it from every sale, like scripts.rebuild_revenue_rollup;
+    # rows already maintained come out the same
+    op.execute("DELETE FROM sales_daily_rollup")
+    op.execute(
+        "INSERT INTO sales_daily_rollup (product_id, sale_day, revenue, order_count, quantity) "
+        "SELECT COALESCE(product_id, 0), DATE(sale_date), SUM(total_amount), COUNT(id), SUM(quantity) "
+        "FROM (SELECT id, product_id, quantity, total_amount, sale_date FROM sales "
+        "UNION ALL SELECT id, product_id, quantity, total_amount, sale_date FROM sales_archive) AS all_sales "
+        "GROUP BY COALESCE(product_id, 0), DATE(sale_date)"
+    )
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,29 @@
+"""add product fulltext index
+
+Revision ID: c71e5a9d3b24
+Revises: 8b4d2e6f1a03
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71e5a9d3b24'
+down_revision: Union[str, None] = '8b4d2e6f1a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only MySQL has FULLTEXT; other backends search with the in-process index
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('ix_products_fulltext', 'products', ['name', 'description'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ix_products_fulltext', table_name='products')
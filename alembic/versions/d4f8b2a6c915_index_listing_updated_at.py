@@ -0,0 +1,32 @@
+"""index products and inventory updated_at
+
+Revision ID: d4f8b2a6c915
+Revises: c71e5a9d3b24
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8b2a6c915'
+down_revision: Union[str, None] = 'c71e5a9d3b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Listing ETags are derived from max(updated_at), so rows written before it
+    # had a default take their creation time
+    op.execute("UPDATE products SET updated_at = created_at WHERE updated_at IS NULL")
+    op.execute("UPDATE inventory SET updated_at = created_at WHERE updated_at IS NULL")
+    op.create_index(op.f('ix_products_updated_at'), 'products', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_inventory_updated_at'), 'inventory', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inventory_updated_at'), table_name='inventory')
+    op.drop_index(op.f('ix_products_updated_at'), table_name='products')
@@ -0,0 +1,28 @@
+"""index sales sale_date
+
+Revision ID: e5a3c9f7d218
+Revises: d4f8b2a6c915
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a3c9f7d218'
+down_revision: Union[str, None] = 'd4f8b2a6c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_sales_sale_date'), 'sales', ['sale_date'], unique=False)
+    op.create_index('ix_sales_product_sale_date', 'sales', ['product_id', 'sale_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_product_sale_date', table_name='sales')
+    op.drop_index(op.f('ix_sales_sale_date'), table_name='sales')
@@ -0,0 +1,62 @@
+"""drop inventory events inventory fk
+
+Revision ID: e7c3a1b5d924
+Revises: c4e9a2d7f160
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c3a1b5d924'
+down_revision: Union[str, None] = 'c4e9a2d7f160'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _events_without_fk() -> sa.Table:
+    return sa.Table(
+        'inventory_events',
+        sa.MetaData(),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('inventory_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('low_stock_threshold', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_inventory_events_id', 'id'),
+        sa.Index('ix_inventory_events_created_at', 'created_at'),
+        sa.Index('ix_inventory_events_inventory_created', 'inventory_id', 'created_at'),
+        sa.Index('ix_inventory_events_product_created', 'product_id', 'created_at'),
+    )
+
+
+def upgrade() -> None:
+    # The movement log outlives the inventory row it describes, so deleting
+    # the row must neither cascade to its events nor be blocked by them
+    bind = op.get_bind()
+    foreign_keys = [
+        fk for fk in sa.inspect(bind).get_foreign_keys('inventory_events')
+        if fk['referred_table'] == 'inventory'
+    ]
+    if not foreign_keys:
+        return
+    if bind.dialect.name == 'sqlite':
+        # SQLite cannot drop a constraint; the table is copied without it
+        with op.batch_alter_table('inventory_events', copy_from=_events_without_fk(), recreate='always'):
+            pass
+    else:
+        for fk in foreign_keys:
+            op.drop_constraint(fk['name'], 'inventory_events', type_='foreignkey')
+
+
+def downgrade() -> None:
+    # Events of deleted inventory rows reference no row, so the key is not restored
+    pass
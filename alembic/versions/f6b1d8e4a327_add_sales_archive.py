@@ -0,0 +1,41 @@
+"""add sales archive
+
+Revision ID: f6b1d8e4a327
+Revises: e5a3c9f7d218
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b1d8e4a327'
+down_revision: Union[str, None] = 'e5a3c9f7d218'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('sale_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        mysql_row_format='COMPRESSED',
+    )
+    op.create_index(op.f('ix_sales_archive_sale_date'), 'sales_archive', ['sale_date'], unique=False)
+    op.create_index('ix_sales_archive_product_sale_date', 'sales_archive', ['product_id', 'sale_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_archive_product_sale_date', table_name='sales_archive')
+    op.drop_index(op.f('ix_sales_archive_sale_date'), table_name='sales_archive')
+    op.drop_table('sales_archive')
@@ -0,0 +1,128 @@
+import asyncio
+import math
+import time
+from typing import List, Optional, Sequence
+from fastapi.responses import JSONResponse
+from app.core import metrics
+
+# Weight of the newest request in a group's average service time
+_SMOOTHING = 0.2
+
+queued_requests = metrics.registry.counter(
+    "admission_queued_total", "Requests that waited for a free slot in their route group", ("group",),
+)
+rejected_requests = metrics.registry.counter(
+    "admission_rejected_total", "Requests shed by admission control, by reason", ("group", "reason"),
+)
+queue_wait = metrics.registry.histogram(
+    "admission_queue_wait_seconds", "Time queued requests waited for a slot", ("group",),
+)
+group_requests = metrics.registry.gauge(
+    "admission_requests", "Requests of a route group by state", ("group", "state"),
+)
+
+
+class RouteGroup:
+    """Requests to any of ``prefixes``: at most ``concurrency`` run, ``queue`` more may wait"""
+
+    def __init__(self, name: str, prefixes: Sequence[str], concurrency: int, queue: int):
+        self.name = name
+        self.prefixes = tuple(prefixes)
+        self.concurrency = concurrency
+        self.queue = queue
+        self.active = 0
+        self.waiting = 0
+        self.service_seconds = 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it belongs to the server's event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def observe(self, seconds: float):
+        self.service_seconds += _SMOOTHING * (seconds - self.service_seconds)
+
+    def retry_after(self) -> int:
+        """Seconds for the requests ahead of a new one to drain at the recent service time"""
+        return max(1, math.ceil(self.service_seconds * (self.waiting + 1) / self.concurrency))
+
+
+# Groups of the most recently built AdmissionControl; every create_app() builds
+# a new one, while the collector below is registered once
+_groups: List[RouteGroup] = []
+
+
+@metrics.registry.collector
+def _collect():
+    for group in _groups:
+        group_requests.set(group.active, group.name, "active")
+        group_requests.set(group.waiting, group.name, "waiting")
+
+
+class AdmissionControl:
+    """ASGI middleware bounding concurrent requests per route group.
+
+    A request finding its group at ``concurrency`` waits in a queue of at
+    most ``queue`` requests for up to ``queue_timeout`` seconds. Requests
+    arriving to a full queue get 429 at once and requests that time out get
+    503, both with a Retry-After estimate, so a burst on one group cannot
+    take every database connection from the routes outside it.
+    Limits apply per worker process; paths in no group are not limited.
+    """
+
+    def __init__(self, app, groups: Sequence[RouteGroup], queue_timeout: float):
+        self.app = app
+        self.groups = [group for group in groups if group.concurrency > 0]
+        self.queue_timeout = queue_timeout
+        _groups[:] = self.groups
+
+    def _group(self, path: str) -> Optional[RouteGroup]:
+        for group in self.groups:
+            if path.startswith(group.prefixes):
+                return group
+        return None
+
+    async def _reject(self, scope, receive, send, group: RouteGroup, status: int, reason: str, detail: str):
+        rejected_requests.inc(group.name, reason)
+        response = JSONResponse({"detail": detail}, status_code=status, headers={"Retry-After": str(group.retry_after())})
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        group = self._group(scope["path"]) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        semaphore = group.semaphore
+        if semaphore.locked():
+            if group.waiting >= group.queue:
+                await self._reject(scope, receive, send, group, 429, "queue_full", f"Too many {group.name} requests")
+                return
+            queued_requests.inc(group.name)
+            group.waiting += 1
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+                admitted = True
+            except asyncio.TimeoutError:
+                admitted = False
+            finally:
+                group.waiting -= 1
+                queue_wait.observe(time.perf_counter() - started, group.name)
+            if not admitted:
+                await self._reject(scope, receive, send, group, 503, "timeout", f"Timed out waiting for a {group.name} slot")
+                return
+        else:
+            await semaphore.acquire()
+
+        group.active += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.active -= 1
+            semaphore.release()
+            group.observe(time.perf_counter() - started)
@@ -0,0 +1,174 @@
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Optional
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.db.session import async_engine, async_read_engine
+
+# Arguments that identify the caller's plumbing rather than the query
+_IGNORED_ARGS = {"db", "request", "response"}
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def generation(self, tag: str) -> int:
+        return self._generations.get(tag, 0)
+
+    async def bump(self, tag: str):
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """Cache shared between workers, stored in Redis as JSON"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_URL requires the redis package (pip install '.[redis]')")
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str):
+        raw = await self._client.get(f"cache:{key}")
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value, ttl: float):
+        await self._client.set(f"cache:{key}", json.dumps(value), px=int(ttl * 1000))
+
+    async def generation(self, tag: str) -> int:
+        return int(await self._client.get(f"cache:gen:{tag}") or 0)
+
+    async def bump(self, tag: str):
+        await self._client.incr(f"cache:gen:{tag}")
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class ResponseCache:
+    """Route response cache with tag-based invalidation and hit/miss counters.
+
+    Keys embed a per-tag generation number, so invalidating a tag is a single
+    increment and superseded entries simply age out of the backend.
+    """
+
+    def __init__(self, backend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.stats = {}
+
+    def _count(self, route: str, outcome: str):
+        counters = self.stats.setdefault(route, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    async def invalidate(self, *tags: str):
+        for tag in tags:
+            await self.backend.bump(tag)
+
+    def cached(self, tag: str, ttl: Optional[float] = None):
+        """Cache an async route's result keyed on its name and query arguments"""
+        def decorator(func):
+            route = f"{func.__module__}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                generation = await self.backend.generation(tag)
+                key = f"{route}:{generation}:{_source(kwargs)}:{_normalize(kwargs)}"
+                value = await self.backend.get(key)
+                if value is not None:
+                    self._count(route, "hits")
+                    return value
+                self._count(route, "misses")
+                value = _cacheable(await func(*args, **kwargs))
+                await self.backend.set(key, value, self.ttl if ttl is None else ttl)
+                return value
+            return wrapper
+        return decorator
+
+    def report(self) -> dict:
+        hits = sum(c["hits"] for c in self.stats.values())
+        misses = sum(c["misses"] for c in self.stats.values())
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "routes": self.stats,
+        }
+
+
+def _cacheable(value):
+    """Plain JSON-compatible copy of a route result, including SQLAlchemy rows"""
+    if isinstance(value, list):
+        return [_cacheable(item) for item in value]
+    if hasattr(value, "_asdict"):
+        value = value._asdict()
+    return jsonable_encoder(value)
+
+
+def _source(kwargs) -> str:
+    """Database the route reads from. Replica results can lag the primary, so
+    clients pinned to the primary for read-your-writes never get them"""
+    db = kwargs.get("db")
+    if db is not None and async_read_engine is not async_engine and db.bind is async_read_engine:
+        return "replica"
+    return "primary"
+
+
+def _normalize(kwargs) -> str:
+    params = {}
+    for name, value in kwargs.items():
+        if name in _IGNORED_ARGS:
+            continue
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        params[name] = value
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _build_backend():
+    if settings.CACHE_URL:
+        return RedisCache(settings.CACHE_URL)
+    return TTLCache(settings.CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_build_backend(), settings.CACHE_TTL, settings.CACHE_ENABLED)
@@ -0,0 +1,118 @@
+import functools
+import typing
+from datetime import date, datetime
+from typing import Any, Callable, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # only needed with FAST_RESPONSES, checked when routes are decorated
+    orjson = None
+
+# Headers a route's injected Response may carry that the fast response must not copy
+_OWN_HEADERS = {b"content-length", b"content-type"}
+
+
+def _to_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+# Scalar conversions for values a database driver may return as another type
+# (Decimal sums on MySQL, NumPy scalars from the analytics frames)
+_SCALARS = {int: int, float: float, date: _to_date}
+
+
+def _converter(annotation) -> Optional[Callable[[Any], Any]]:
+    """Function turning a trusted value into JSON-ready data, or None to pass it through"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        inner = _converter(args[0]) if len(args) == 1 else None
+        if inner is None:
+            return None
+        return lambda value: None if value is None else inner(value)
+    if origin is list:
+        (item,) = typing.get_args(annotation)
+        inner = _converter(item)
+        if inner is None:
+            return list
+        return lambda values: [inner(v) for v in values]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _model_serializer(annotation)
+    return _SCALARS.get(annotation)
+
+
+@functools.lru_cache(maxsize=None)
+def _model_serializer(model) -> Callable[[Any], dict]:
+    """Build a dict from an ORM object, row or dict without validating it against ``model``"""
+    fields = [
+        (
+            name,
+            field.serialization_alias or name,
+            None if field.default is PydanticUndefined else field.default,
+            _converter(field.annotation),
+        )
+        for name, field in model.model_fields.items()
+    ]
+
+    def serialize(obj) -> dict:
+        # Loaded ORM attributes sit in the instance __dict__; reading them there
+        # skips the attribute descriptors, and anything unloaded falls back to getattr
+        loaded = obj if isinstance(obj, dict) else getattr(obj, "__dict__", {})
+        data = {}
+        for name, key, default, convert in fields:
+            if name in loaded:
+                value = loaded[name]
+            elif loaded is obj:
+                value = default
+            else:
+                value = getattr(obj, name, default)
+            data[key] = value if convert is None or value is None else convert(value)
+        return data
+
+    return serialize
+
+
+def serializer_for(annotation) -> Callable[[Any], Any]:
+    """Prebuilt serializer for a response_model annotation such as ``List[SaleResponse]``"""
+    return _converter(annotation) or (lambda value: value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson, which handles datetimes and NumPy scalars natively"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def fast_response(annotation):
+    """Serve a route's result through serializer_for and orjson when FAST_RESPONSES is on.
+
+    Results are trusted database rows, so they skip FastAPI's response_model
+    validation; the annotation should match the route's response_model, which
+    still documents the route. Responses returned by the route (such as a 304)
+    pass through, and headers set on its injected ``response`` are kept.
+    """
+    def decorator(func):
+        if not settings.FAST_RESPONSES:
+            return func
+        if orjson is None:
+            raise RuntimeError("FAST_RESPONSES=true requires the orjson package")
+        serialize = serializer_for(annotation)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            response = FastJSONResponse(serialize(result))
+            injected = kwargs.get("response")
+            if injected is not None:
+                response.raw_headers.extend(h for h in injected.raw_headers if h[0] not in _OWN_HEADERS)
+            return response
+        return wrapper
+    return decorator
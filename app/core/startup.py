@@ -0,0 +1,120 @@
+import logging
+import sys
+import time
+from contextlib import AsyncExitStack, contextmanager
+from fastapi import HTTPException
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Read routes requested once through the router at startup. Running them
+# compiles and caches their SQL, builds their response serializers and loads
+# their code paths before the first client request; ids and dates are chosen
+# to match no rows.
+WARMUP_PATHS = (
+    "/api/products/?limit=1",
+    "/api/products/?limit=1&cursor=",
+    "/api/products/0",
+    "/api/inventory/?limit=1",
+    "/api/inventory/?limit=1&cursor=",
+    "/api/inventory/0",
+    "/api/inventory/status",
+    "/api/inventory/history?limit=1",
+    "/api/sales/?limit=1",
+    "/api/sales/?limit=1&cursor=",
+    "/api/sales/0",
+    "/api/sales/revenue/daily?start_date=1970-01-01T00:00:00&end_date=1970-01-01T00:00:00",
+)
+
+# Optional heavy modules that should only load when a route needs them
+LAZY_MODULES = ("pandas", "pyarrow", "redis")
+
+startup_seconds = metrics.registry.gauge(
+    "app_startup_seconds", "Time spent in each startup phase of this worker", ("phase",),
+)
+
+
+class StartupTimer:
+    """Durations of the import and lifespan startup phases of this worker"""
+
+    def __init__(self):
+        self.phases = {}
+        self.warmup = {}
+        self.started_at = None
+
+    def record(self, phase: str, seconds: float):
+        self.phases[phase] = round(seconds, 4)
+        startup_seconds.set(round(seconds, 4), phase)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def finish(self):
+        self.started_at = time.time()
+        self.record("total", sum(v for k, v in self.phases.items() if k != "total"))
+        logger.info("Worker ready in %.2fs: %s", self.phases["total"], self.phases)
+
+    def report(self) -> dict:
+        return {
+            "phases": self.phases,
+            "warmup": self.warmup,
+            "started_at": self.started_at,
+            "lazy_modules_loaded": [name for name in LAZY_MODULES if name in sys.modules],
+        }
+
+
+async def _get(app, path: str) -> int:
+    """Run one GET through the app's router, outside the middleware, and return its status"""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"warmup")],
+        "client": None,
+        "server": ("warmup", 80),
+        "app": app,
+    }
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    try:
+        # FastAPI's own middleware normally provides the stack that closes dependencies
+        async with AsyncExitStack() as stack:
+            scope["fastapi_astack"] = stack
+            await app.router(scope, receive, send)
+    except HTTPException as e:
+        return e.status_code
+    return status[0] if status else 500
+
+
+async def warm_routes(app, paths=WARMUP_PATHS) -> dict:
+    """Request each of ``paths`` once; returns the status of each, and never raises"""
+    results = {}
+    for path in paths:
+        try:
+            results[path] = await _get(app, path)
+        except Exception:
+            logger.warning("Warm-up request %s failed", path, exc_info=True)
+            results[path] = 500
+    return results
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+# updated_at has whole-second resolution on MySQL and SQLite, so a listing whose
+# newest change is this recent could still change without moving max(updated_at)
+SETTLE_SECONDS = 2
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive timestamps come from databases that store UTC without an offset
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    # HTTP dates have whole seconds
+    return last_modified.replace(microsecond=0) > _utc(since)
+
+
+async def not_modified(db, request: Request, response: Response, stmt) -> Optional[Response]:
+    """Set validators for a listing and answer 304 when the client's copy is current.
+
+    ``stmt`` selects one row of row counts and max ``updated_at`` values for
+    the tables behind the listing. The ETag hashes that row with the query
+    string, so it changes on any insert, update or delete (and differs per
+    page) without reading or serializing the listing itself. Last-Modified is
+    the newest ``updated_at``; it does not move on deletes, so If-None-Match
+    is checked first and If-Modified-Since only when it is absent. Listings
+    changed within the last SETTLE_SECONDS get no validators at all.
+    """
+    row = (await db.execute(stmt)).one()
+    timestamps = [_utc(value) for value in row if isinstance(value, datetime)]
+    last_modified = max(timestamps) if timestamps else None
+    if last_modified and (datetime.now(timezone.utc) - last_modified).total_seconds() < SETTLE_SECONDS:
+        return None
+
+    state = "|".join([*(str(value) for value in row), str(request.query_params)])
+    etag = f'W/"{hashlib.sha1(state.encode()).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        fresh = (
+            if_modified_since is not None
+            and last_modified is not None
+            and not _modified_since(if_modified_since, last_modified)
+        )
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
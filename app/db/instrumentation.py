@@ -0,0 +1,81 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+_request_stats: ContextVar[Optional[dict]] = ContextVar("request_stats", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%s|%\(\w+\)s|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Statement with literals and parameters replaced by ``?`` and lists collapsed"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PARAMETER.sub("?", statement)
+    statement = _IN_LIST.sub("IN (...)", statement)
+    statement = _VALUES_LIST.sub(r"\1, ...", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _operation(statement: str) -> str:
+    words = statement.split(None, 1)
+    return words[0].upper() if words else ""
+
+
+def start_request() -> dict:
+    """Begin collecting SQL statistics for the current request context.
+
+    The returned dict is shared with the task that runs the route, which
+    gets a copy of this context from the middleware, so counts recorded
+    there are visible to the caller afterwards.
+    """
+    stats = {"queries": 0, "db_seconds": 0.0}
+    _request_stats.set(stats)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["db_seconds"] += elapsed
+    slow = elapsed >= settings.SLOW_QUERY_SECONDS
+    metrics.observe_query(_operation(statement), elapsed, slow)
+    if slow:
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, normalize(statement))
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute is skipped for failed statements. ExceptionContext
+    # has no cursor attribute, so an error raised here would replace the DBAPI one.
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def install(engine):
+    """Attach the statement counter and timers to an engine"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row of a page as an opaque token"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def parse_datetime(value: str) -> datetime:
+    """datetime.fromisoformat, also accepting the trailing Z it only reads from Python 3.11"""
+    return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Decode a token produced by encode_cursor back into typed values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("unexpected cursor shape")
+        return tuple(
+            parse_datetime(v) if t is datetime else t(v)
+            for t, v in zip(types, payload)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def keyset_page(
+    db,
+    stmt,
+    response: Response,
+    cursor: str,
+    limit: int,
+    columns,
+    types,
+    descending: bool = False,
+    keys=None
+):
+    """Return one page of ``stmt`` ordered by ``columns`` after ``cursor``.
+
+    An empty cursor starts from the beginning. The sort key of the last row is
+    returned to the client in the X-Next-Cursor header when more rows may follow,
+    so every page costs an index range scan of ``limit`` rows regardless of depth.
+    Entity statements return ORM objects; when ``keys`` is given the statement is
+    treated as a column SELECT, rows are returned as-is and the sort key is read
+    from the named row attributes.
+    """
+    if cursor:
+        after = decode_cursor(cursor, *types)
+        key = columns[0] if len(columns) == 1 else tuple_(*columns)
+        bound = after[0] if len(columns) == 1 else after
+        stmt = stmt.where(key < bound if descending else key > bound)
+
+    order = [c.desc() for c in columns] if descending else list(columns)
+    result = await db.execute(stmt.order_by(*order).limit(limit))
+    rows = result.all() if keys else result.scalars().all()
+    if len(rows) == limit and rows:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            *(getattr(last, k) for k in (keys or [c.key for c in columns]))
+        )
+    return rows
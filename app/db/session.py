@@ -1,15 +1,85 @@
 import pymysql
 pymysql.install_as_MySQLdb()
+import time
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
 
-engine = create_engine(settings.DATABASE_URL)
+def engine_options(url: str, async_: bool = False) -> dict:
+    """Pool configuration from settings for an engine on ``url``"""
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    # SQLite keeps the pool classes its dialects choose
+    if not url.startswith("sqlite"):
+        options.update(
+            poolclass=TimedAsyncAdaptedQueuePool if async_ else TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+# Synchronous engine for scripts, migrations and other non-request work
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_url(url: str) -> str:
+    """Swap the synchronous driver in a database URL for its async counterpart"""
+    scheme, sep, rest = url.partition("://")
+    drivers = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+    dialect = scheme.split("+")[0]
+    return drivers[dialect] + sep + rest if dialect in drivers else url
+
+# Async engine used by the API routes
+_async_database_url = settings.ASYNC_DATABASE_URL or _async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_database_url, **engine_options(_async_database_url, async_=True))
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Async engine for read-only routes; the primary unless a replica is configured
+if settings.READ_DATABASE_URL:
+    _read_database_url = _async_url(settings.READ_DATABASE_URL)
+    async_read_engine = create_async_engine(_read_database_url, **engine_options(_read_database_url, async_=True))
+else:
+    async_read_engine = async_engine
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Read-your-writes: a client is pinned to the primary by this header, or by the
+# cookie set on its successful writes until the timestamp it carries
+READ_PRIMARY_HEADER = "X-Read-Primary"
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+def reads_from_primary(request: Request) -> bool:
+    if async_read_engine is async_engine:
+        return True
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db(request: Request):
+    """Session for read-only routes, bound to the replica when one is configured"""
+    factory = AsyncSessionLocal if reads_from_primary(request) else AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
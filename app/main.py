@@ -1,27 +1,175 @@
-from fastapi import FastAPI
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import sales, inventory, products
-
-app = FastAPI(
-    title="E-commerce Admin API",
-    description="API for managing e-commerce inventory, products, and sales",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(sales.router, prefix="/api/sales", tags=["sales"])
-app.include_router(inventory.router, prefix="/api/inventory", tags=["inventory"])
-app.include_router(products.router, prefix="/api/products", tags=["products"])
-
-@app.get("/")
-def read_root():
-    return {"message": "Welcome to E-commerce Admin API"} 
\ No newline at end of file
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy.orm import configure_mappers
+from app.core import metrics
+from app.core.admission import AdmissionControl, RouteGroup
+from app.core.config import settings
+from app.core.startup import startup_timer, warm_routes
+from app.db import instrumentation
+from app.db.pool import prewarm
+from app.db.session import READ_PRIMARY_COOKIE, AsyncSessionLocal, async_engine, async_read_engine
+from app.routers import sales, inventory, products, reports, system
+from app.routers import metrics as metrics_router
+from app.services.inventory_index import inventory_index
+from app.services.product_search import product_search_index
+from app.services.reports import report_jobs
+from app.services.sales_snapshot import sales_snapshot
+
+logger = logging.getLogger(__name__)
+
+async def _open_connections():
+    engines = [async_engine] if async_read_engine is async_engine else [async_engine, async_read_engine]
+    for pooled in engines:
+        try:
+            await prewarm(pooled, settings.DB_POOL_WARM_CONNECTIONS)
+        except Exception:
+            # The first requests will connect (and report the error) themselves
+            logger.warning("Could not pre-open database connections", exc_info=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_timer.phase("mappers"):
+        configure_mappers()
+    with startup_timer.phase("connections"):
+        await _open_connections()
+    if settings.STARTUP_WARMUP:
+        with startup_timer.phase("warmup"):
+            startup_timer.warmup = await warm_routes(app)
+
+    tasks = []
+    if settings.INVENTORY_INDEX_ENABLED:
+        with startup_timer.phase("inventory_index"):
+            await inventory_index.reload(AsyncSessionLocal)
+        tasks.append(asyncio.create_task(
+            inventory_index.reconcile_forever(AsyncSessionLocal, settings.INVENTORY_INDEX_RECONCILE_SECONDS)
+        ))
+    if settings.PRODUCT_SEARCH_INDEX_ENABLED and async_engine.dialect.name != "mysql":
+        # Loads in the background; searches use a LIKE scan until it is ready
+        tasks.append(asyncio.create_task(
+            product_search_index.maintain(AsyncSessionLocal, settings.PRODUCT_SEARCH_RELOAD_SECONDS)
+        ))
+    if settings.SALES_SNAPSHOT_ENABLED:
+        tasks.append(asyncio.create_task(sales_snapshot.maintain(
+            async_read_engine, settings.SALES_SNAPSHOT_REFRESH_SECONDS, settings.SALES_SNAPSHOT_REBUILD_SECONDS
+        )))
+    startup_timer.finish()
+    yield
+    for task in tasks:
+        task.cancel()
+    report_jobs.shutdown()
+    if sales_snapshot.ready:
+        # Keep sales added since the last rebuild so the next start only reads newer ones
+        await asyncio.to_thread(sales_snapshot.save)
+
+def _route_template(request: Request) -> str:
+    """Path template of the matched route, so ids don't split the metrics"""
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+def create_app() -> FastAPI:
+    """Build the application; ``uvicorn --factory app.main:create_app`` or the module-level ``app``"""
+    app = FastAPI(
+        title="E-commerce Admin API",
+        description="API for managing e-commerce inventory, products, and sales",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    if settings.GZIP_MINIMUM_SIZE > 0:
+        app.add_middleware(
+            GZipMiddleware,
+            minimum_size=settings.GZIP_MINIMUM_SIZE,
+            compresslevel=settings.GZIP_COMPRESS_LEVEL,
+        )
+
+    if settings.ADMISSION_ENABLED:
+        app.add_middleware(
+            AdmissionControl,
+            groups=[
+                RouteGroup(
+                    "analytics",
+                    ("/api/sales/revenue", "/api/sales/analytics"),
+                    settings.ADMISSION_ANALYTICS_CONCURRENCY,
+                    settings.ADMISSION_ANALYTICS_QUEUE,
+                ),
+                RouteGroup(
+                    "bulk",
+                    ("/api/sales/bulk", "/api/sales/export"),
+                    settings.ADMISSION_BULK_CONCURRENCY,
+                    settings.ADMISSION_BULK_QUEUE,
+                ),
+            ],
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        )
+
+    if settings.DEBUG or settings.METRICS_ENABLED:
+        instrumentation.install(async_engine.sync_engine)
+        instrumentation.install(async_read_engine.sync_engine)
+
+        @app.middleware("http")
+        async def observe_requests(request: Request, call_next):
+            stats = instrumentation.start_request()
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = await call_next(request)
+                status = response.status_code
+            finally:
+                if settings.METRICS_ENABLED:
+                    metrics.observe_request(
+                        request.method, _route_template(request), status, time.perf_counter() - started, stats
+                    )
+            if settings.DEBUG:
+                response.headers[instrumentation.QUERY_COUNT_HEADER] = str(stats["queries"])
+            return response
+
+    if async_read_engine is not async_engine:
+        @app.middleware("http")
+        async def pin_writers_to_primary(request: Request, call_next):
+            """Send a client's reads to the primary for a short window after its writes"""
+            response = await call_next(request)
+            if request.method in ("POST", "PUT", "PATCH", "DELETE") and response.status_code < 400:
+                window = settings.READ_YOUR_WRITES_WINDOW
+                response.set_cookie(
+                    READ_PRIMARY_COOKIE,
+                    str(time.time() + window),
+                    max_age=window,
+                    httponly=True,
+                )
+            return response
+
+    # Configure CORS. Added last so it is the outermost middleware and every
+    # response, including admission control's 429/503, carries its headers
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, replace with specific origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Retry-After", instrumentation.QUERY_COUNT_HEADER],
+    )
+
+    # Include routers
+    app.include_router(sales.router, prefix="/api/sales", tags=["sales"])
+    app.include_router(inventory.router, prefix="/api/inventory", tags=["inventory"])
+    app.include_router(products.router, prefix="/api/products", tags=["products"])
+    app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+    app.include_router(system.router, prefix="/api/system", tags=["system"])
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router.router, tags=["system"])
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Welcome to E-commerce Admin API"}
+
+    return app
+
+app = create_app()
+startup_timer.record("import", time.perf_counter() - _import_started)
@@ -1,17 +1,20 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_fulltext", "name", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), index=True)
 
     # Relationships
     inventory = relationship("Inventory", back_populates="product", uselist=False)
@@ -25,21 +28,75 @@ class Inventory(Base):
     quantity = Column(Integer, nullable=False, default=0)
     low_stock_threshold = Column(Integer, nullable=False, default=10)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), index=True)
 
     # Relationships
     product = relationship("Product", back_populates="inventory")
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        Index("ix_sales_product_sale_date", "product_id", "sale_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"))
     quantity = Column(Integer, nullable=False)
     total_amount = Column(Float, nullable=False)
-    sale_date = Column(DateTime(timezone=True), nullable=False)
+    sale_date = Column(DateTime(timezone=True), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
     # Relationships
-    product = relationship("Product", back_populates="sales") 
\ No newline at end of file
+    product = relationship("Product", back_populates="sales") 
+
+class SaleArchive(Base):
+    """Sales moved out of the hot table by scripts/archive_sales.py, kept read-only"""
+    __tablename__ = "sales_archive"
+    __table_args__ = (
+        Index("ix_sales_archive_product_sale_date", "product_id", "sale_date"),
+        {"mysql_row_format": "COMPRESSED"},
+    )
+
+    # Ids are copied from sales. No foreign key: like the rollup, archived
+    # history outlives deleted products
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    product_id = Column(Integer)
+    quantity = Column(Integer, nullable=False)
+    total_amount = Column(Float, nullable=False)
+    sale_date = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+
+    product = relationship("Product", primaryjoin="foreign(SaleArchive.product_id) == Product.id", viewonly=True)
+
+class SaleDailyRollup(Base):
+    """Per-product, per-day sales totals maintained alongside the sales table"""
+    __tablename__ = "sales_daily_rollup"
+
+    # No foreign key: revenue history outlives deleted products, whose sales are
+    # kept with a NULL product_id and rolled up under product_id 0
+    product_id = Column(Integer, primary_key=True)
+    sale_day = Column(Date, primary_key=True, index=True)
+    revenue = Column(Float, nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class InventoryEvent(Base):
+    """Append-only log of inventory movements, newest read first by range scan"""
+    __tablename__ = "inventory_events"
+    __table_args__ = (
+        Index("ix_inventory_events_inventory_created", "inventory_id", "created_at"),
+        Index("ix_inventory_events_product_created", "product_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # No foreign key: the log outlives the inventory row, ending with its "deleted" event
+    inventory_id = Column(Integer, nullable=False)
+    product_id = Column(Integer, nullable=True)
+    delta = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    low_stock_threshold = Column(Integer, nullable=False)
+    reason = Column(String(50), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
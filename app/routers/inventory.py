@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import case, func, select
 from typing import List, Optional
 from datetime import datetime, timedelta
-from app.db.session import get_db
-from app.models.models import Inventory, Product
+from app.core.cache import response_cache
+from app.core.serialization import fast_response
+from app.db.conditional import not_modified
+from app.db.session import get_async_db, get_read_db
+from app.db.pagination import keyset_page
+from app.models.models import Inventory, InventoryEvent, Product
+from app.services.inventory_events import history_statement, record_event, remove_inventory
+from app.services.inventory_index import inventory_index
 from app.schemas.schemas import (
     InventoryResponse, InventoryCreate, InventoryUpdate,
     InventoryStatus, InventoryHistory
@@ -12,26 +19,71 @@ from app.schemas.schemas import (
 
 router = APIRouter()
 
+# History pages are ordered newest first by (created_at, event id)
+HISTORY_ORDER = (InventoryEvent.created_at, InventoryEvent.id)
+HISTORY_KEYS = ("change_date", "event_id")
+
+async def _load_inventory(db: AsyncSession, inventory_id: int) -> Optional[Inventory]:
+    """Load an inventory item with its product, refreshing any copy already in the session"""
+    stmt = (
+        select(Inventory)
+        .options(joinedload(Inventory.product))
+        .where(Inventory.id == inventory_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+def _listing_validators(product_id: Optional[int]):
+    """Counts and newest updates of inventory and the products embedded in it"""
+    inventory_filter = [Inventory.product_id == product_id] if product_id else []
+    product_filter = [Product.id == product_id] if product_id else []
+    return select(
+        select(func.count(Inventory.id)).where(*inventory_filter).scalar_subquery(),
+        select(func.max(Inventory.updated_at)).where(*inventory_filter).scalar_subquery(),
+        select(func.count(Product.id)).where(*product_filter).scalar_subquery(),
+        select(func.max(Product.updated_at)).where(*product_filter).scalar_subquery(),
+    )
+
 @router.get("/", response_model=List[InventoryResponse])
-def get_inventory(
-    db: Session = Depends(get_db),
+@fast_response(List[InventoryResponse])
+async def get_inventory(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     product_id: Optional[int] = None
 ):
-    """Get all inventory items with optional product filter"""
-    query = db.query(Inventory)
+    """Get all inventory items with optional product filter.
+
+    Pass ``cursor`` (empty for the first page) to page by id instead of
+    skip/limit; the next page's cursor is returned in the X-Next-Cursor header.
+    Responses carry ETag/Last-Modified and conditional requests for unchanged
+    inventory get a 304.
+    """
+    unchanged = await not_modified(db, request, response, _listing_validators(product_id))
+    if unchanged is not None:
+        return unchanged
+    stmt = select(Inventory).options(joinedload(Inventory.product))
     if product_id:
-        query = query.filter(Inventory.product_id == product_id)
-    return query.offset(skip).limit(limit).all()
+        stmt = stmt.where(Inventory.product_id == product_id)
+    if cursor is not None:
+        return await keyset_page(db, stmt, response, cursor, limit, (Inventory.id,), (int,))
+    return (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
 
 @router.get("/status", response_model=List[InventoryStatus])
-def get_inventory_status(
-    db: Session = Depends(get_db),
+@fast_response(List[InventoryStatus])
+@response_cache.cached("inventory")
+async def get_inventory_status(
+    db: AsyncSession = Depends(get_read_db),
     low_stock_only: bool = False
 ):
     """Get current inventory status with optional low stock filter"""
-    query = db.query(
+    if inventory_index.ready:
+        return inventory_index.status(low_stock_only)
+
+    stmt = select(
         Inventory.id,
         Product.name.label('product_name'),
         Inventory.quantity,
@@ -44,17 +96,22 @@ def get_inventory_status(
     ).join(Product)
 
     if low_stock_only:
-        query = query.filter(Inventory.quantity <= Inventory.low_stock_threshold)
+        stmt = stmt.where(Inventory.quantity <= Inventory.low_stock_threshold)
 
-    return query.all()
+    return (await db.execute(stmt)).all()
 
 @router.get("/alerts", response_model=List[InventoryStatus])
-def get_low_stock_alerts(
-    db: Session = Depends(get_db),
+@fast_response(List[InventoryStatus])
+@response_cache.cached("inventory")
+async def get_low_stock_alerts(
+    db: AsyncSession = Depends(get_read_db),
     threshold: Optional[int] = None
 ):
     """Get low stock alerts with optional custom threshold"""
-    query = db.query(
+    if inventory_index.ready:
+        return inventory_index.alerts(threshold)
+
+    stmt = select(
         Inventory.id,
         Product.name.label('product_name'),
         Inventory.quantity,
@@ -67,138 +124,149 @@ def get_low_stock_alerts(
     ).join(Product)
 
     if threshold is not None:
-        query = query.filter(Inventory.quantity <= threshold)
+        stmt = stmt.where(Inventory.quantity <= threshold)
     else:
-        query = query.filter(Inventory.quantity <= Inventory.low_stock_threshold)
+        stmt = stmt.where(Inventory.quantity <= Inventory.low_stock_threshold)
 
-    return query.all()
+    return (await db.execute(stmt)).all()
 
 @router.get("/history", response_model=List[InventoryHistory])
-def get_all_inventory_history(
-    db: Session = Depends(get_db),
+@fast_response(List[InventoryHistory])
+async def get_all_inventory_history(
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    product_id: Optional[int] = None
+    product_id: Optional[int] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
-    """Get inventory change history for all items or specific product"""
+    """Get inventory change history for all items or specific product.
+
+    Events are returned newest first; the next page's cursor is returned in
+    the X-Next-Cursor header.
+    """
     if not start_date:
         start_date = datetime.utcnow() - timedelta(days=30)
     if not end_date:
         end_date = datetime.utcnow()
 
-    query = db.query(
-        Inventory.id,
-        Product.name.label('product_name'),
-        Inventory.quantity,
-        Inventory.low_stock_threshold,
-        Inventory.updated_at.label('change_date'),
-        case(
-            (Inventory.quantity <= Inventory.low_stock_threshold, 'Low Stock'),
-            (Inventory.quantity == 0, 'Out of Stock'),
-            else_='In Stock'
-        ).label('status')
-    ).join(Product).filter(
-        Inventory.updated_at >= start_date,
-        Inventory.updated_at <= end_date
+    stmt = history_statement().where(
+        InventoryEvent.created_at >= start_date,
+        InventoryEvent.created_at <= end_date
     )
 
     if product_id:
-        query = query.filter(Inventory.product_id == product_id)
+        stmt = stmt.where(InventoryEvent.product_id == product_id)
 
-    return query.order_by(Inventory.updated_at.desc()).all()
+    return await keyset_page(
+        db, stmt, response, cursor, limit,
+        HISTORY_ORDER, (datetime, int), descending=True, keys=HISTORY_KEYS
+    )
 
 @router.get("/history/{inventory_id}", response_model=List[InventoryHistory])
-def get_inventory_history(
+@fast_response(List[InventoryHistory])
+async def get_inventory_history(
     inventory_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
-    """Get inventory change history"""
+    """Get inventory change history, newest first"""
     if not start_date:
         start_date = datetime.utcnow() - timedelta(days=30)
     if not end_date:
         end_date = datetime.utcnow()
 
-    inventory = db.query(Inventory).filter(Inventory.id == inventory_id).first()
-    if not inventory:
+    # The history of a deleted item is still served, ending with its "deleted" event
+    logged = select(InventoryEvent.id).where(InventoryEvent.inventory_id == inventory_id).limit(1)
+    if await db.get(Inventory, inventory_id) is None and (await db.execute(logged)).first() is None:
         raise HTTPException(status_code=404, detail="Inventory not found")
 
-    # Get all updates within the date range
-    history = db.query(
-        Inventory.id,
-        Product.name.label('product_name'),
-        Inventory.quantity,
-        Inventory.low_stock_threshold,
-        Inventory.updated_at.label('change_date'),
-        case(
-            (Inventory.quantity <= Inventory.low_stock_threshold, 'Low Stock'),
-            (Inventory.quantity == 0, 'Out of Stock'),
-            else_='In Stock'
-        ).label('status')
-    ).join(Product).filter(
-        Inventory.id == inventory_id,
-        Inventory.updated_at >= start_date,
-        Inventory.updated_at <= end_date
-    ).order_by(Inventory.updated_at.desc()).all()
+    # Range scan on (inventory_id, created_at)
+    stmt = history_statement().where(
+        InventoryEvent.inventory_id == inventory_id,
+        InventoryEvent.created_at >= start_date,
+        InventoryEvent.created_at <= end_date
+    )
 
-    return history
+    return await keyset_page(
+        db, stmt, response, cursor, limit,
+        HISTORY_ORDER, (datetime, int), descending=True, keys=HISTORY_KEYS
+    )
 
 @router.get("/{inventory_id}", response_model=InventoryResponse)
-def get_inventory_item(inventory_id: int, db: Session = Depends(get_db)):
+async def get_inventory_item(inventory_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific inventory item"""
-    inventory = db.query(Inventory).filter(Inventory.id == inventory_id).first()
+    inventory = await _load_inventory(db, inventory_id)
     if inventory is None:
         raise HTTPException(status_code=404, detail="Inventory not found")
     return inventory
 
 @router.post("/", response_model=InventoryResponse)
-def create_inventory(inventory: InventoryCreate, db: Session = Depends(get_db)):
+async def create_inventory(inventory: InventoryCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new inventory item"""
     # Check if product exists
-    product = db.query(Product).filter(Product.id == inventory.product_id).first()
+    product = await db.get(Product, inventory.product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Check if inventory already exists for this product
-    existing_inventory = db.query(Inventory).filter(Inventory.product_id == inventory.product_id).first()
+    existing_inventory = await db.scalar(select(Inventory).where(Inventory.product_id == inventory.product_id))
     if existing_inventory:
         raise HTTPException(status_code=400, detail="Inventory already exists for this product")
     
     db_inventory = Inventory(**inventory.model_dump())
     db.add(db_inventory)
-    db.commit()
-    db.refresh(db_inventory)
+    await db.flush()
+    record_event(db, db_inventory, db_inventory.quantity, "created")
+    await db.commit()
+    db_inventory = await _load_inventory(db, db_inventory.id)
+    inventory_index.upsert_from(db_inventory)
+    await response_cache.invalidate("inventory")
     return db_inventory
 
 @router.put("/{inventory_id}", response_model=InventoryResponse)
-def update_inventory(
+async def update_inventory(
     inventory_id: int,
     inventory: InventoryUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an inventory item"""
-    db_inventory = db.query(Inventory).filter(Inventory.id == inventory_id).first()
+    # Locked so concurrent updates can't both log a delta against the same old quantity
+    db_inventory = await db.get(Inventory, inventory_id, with_for_update=True)
     if db_inventory is None:
         raise HTTPException(status_code=404, detail="Inventory not found")
     
     # Store old quantity for history
     old_quantity = db_inventory.quantity
     
+    old_threshold = db_inventory.low_stock_threshold
+    
     for key, value in inventory.model_dump(exclude_unset=True).items():
         setattr(db_inventory, key, value)
     
-    db.commit()
-    db.refresh(db_inventory)
+    delta = db_inventory.quantity - old_quantity
+    if delta or db_inventory.low_stock_threshold != old_threshold:
+        record_event(db, db_inventory, delta, "adjustment" if delta else "threshold")
+    await db.commit()
+    db_inventory = await _load_inventory(db, inventory_id)
+    inventory_index.upsert_from(db_inventory)
+    await response_cache.invalidate("inventory")
     return db_inventory
 
 @router.delete("/{inventory_id}")
-def delete_inventory(inventory_id: int, db: Session = Depends(get_db)):
-    """Delete an inventory item"""
-    db_inventory = db.query(Inventory).filter(Inventory.id == inventory_id).first()
+async def delete_inventory(inventory_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete an inventory item; its movement log is kept"""
+    db_inventory = await db.get(Inventory, inventory_id, with_for_update=True)
     if db_inventory is None:
         raise HTTPException(status_code=404, detail="Inventory not found")
     
-    db.delete(db_inventory)
-    db.commit()
+    await remove_inventory(db, db_inventory)
+    await db.commit()
+    inventory_index.remove(inventory_id)
+    await response_cache.invalidate("inventory")
     return {"message": "Inventory deleted successfully"} 
\ No newline at end of file
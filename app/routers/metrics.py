@@ -0,0 +1,55 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core import metrics
+from app.core.cache import response_cache
+from app.db.pool import pool_status
+from app.db.session import async_engine, async_read_engine, engine
+from app.services.reports import report_jobs
+
+router = APIRouter()
+
+pool_connections = metrics.registry.gauge(
+    "db_pool_connections", "Pooled connections by state", ("engine", "state"),
+)
+pool_checkouts = metrics.registry.gauge(
+    "db_pool_checkouts_total", "Connection checkouts", ("engine",), kind="counter",
+)
+pool_timeouts = metrics.registry.gauge(
+    "db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a connection", ("engine",), kind="counter",
+)
+pool_wait = metrics.registry.gauge(
+    "db_pool_checkout_wait_seconds_total", "Time spent waiting for connections", ("engine",), kind="counter",
+)
+cache_lookups = metrics.registry.gauge(
+    "response_cache_lookups_total", "Response cache lookups by route and outcome", ("route", "outcome"), kind="counter",
+)
+report_jobs_gauge = metrics.registry.gauge(
+    "report_jobs", "Report jobs held by this worker by status", ("status",),
+)
+
+
+@metrics.registry.collector
+def _collect():
+    engines = {"api": async_engine.sync_engine, "sync": engine}
+    if async_read_engine is not async_engine:
+        engines["read"] = async_read_engine.sync_engine
+    for name, pooled in engines.items():
+        status = pool_status(pooled)
+        for state in ("checked_out", "idle", "overflow"):
+            if state in status:
+                pool_connections.set(status[state], name, state)
+        if "checkouts" in status:
+            pool_checkouts.set(status["checkouts"], name)
+            pool_timeouts.set(status["timeouts"], name)
+            pool_wait.set(status["wait_seconds_total"], name)
+    for route, counters in response_cache.stats.items():
+        for outcome, count in counters.items():
+            cache_lookups.set(count, route, outcome)
+    for status, count in report_jobs.counts().items():
+        report_jobs_gauge.set(count, status)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """Request, SQL, pool and cache metrics of this worker in the Prometheus text format"""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
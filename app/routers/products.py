@@ -1,60 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.session import get_db
-from app.models.models import Product
+from app.core.cache import response_cache
+from app.core.serialization import fast_response
+from app.db.conditional import not_modified
+from app.db.session import get_async_db, get_read_db
+from app.db.pagination import keyset_page
+from app.models.models import Inventory, Product, SaleArchive
+from app.services import inventory_events, revenue_rollup
+from app.services.inventory_index import inventory_index
+from app.services.product_search import product_search_index, search_products
 from app.schemas.schemas import ProductResponse, ProductCreate, ProductUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ProductResponse])
-def get_products(
-    db: Session = Depends(get_db),
+@fast_response(List[ProductResponse])
+async def get_products(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     search: Optional[str] = None
 ):
-    """Get all products with optional filtering"""
-    query = db.query(Product)
+    """Get all products with optional filtering.
+
+    Pass ``cursor`` (empty for the first page) to page by id instead of
+    skip/limit; the next page's cursor is returned in the X-Next-Cursor header.
+    ``search`` matches every word as a prefix of a word in the name or
+    description and orders by relevance, so it pages with skip/limit only.
+    Responses carry ETag/Last-Modified and conditional requests for an
+    unchanged catalog get a 304.
+    """
+    unchanged = await not_modified(
+        db, request, response, select(func.count(Product.id), func.max(Product.updated_at))
+    )
+    if unchanged is not None:
+        return unchanged
     if search:
-        query = query.filter(Product.name.ilike(f"%{search}%"))
-    return query.offset(skip).limit(limit).all()
+        if cursor is not None:
+            raise HTTPException(status_code=400, detail="Search results are paged with skip/limit, not cursor")
+        return await search_products(db, search, skip, limit)
+    stmt = select(Product)
+    if cursor is not None:
+        return await keyset_page(db, stmt, response, cursor, limit, (Product.id,), (int,))
+    return (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
 
 @router.post("/", response_model=ProductResponse)
-def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new product"""
     db_product = Product(**product.model_dump())
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    await db.refresh(db_product)
+    product_search_index.upsert(db_product.id, db_product.name, db_product.description)
     return db_product
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific product"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
 @router.put("/{product_id}", response_model=ProductResponse)
-def update_product(product_id: int, product: ProductUpdate, db: Session = Depends(get_db)):
+async def update_product(product_id: int, product: ProductUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update a product"""
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = await db.get(Product, product_id)
     if db_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     for key, value in product.model_dump(exclude_unset=True).items():
         setattr(db_product, key, value)
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    await db.refresh(db_product)
+    # Inventory status rows and the top-products and velocity analytics carry the product name
+    inventory_index.rename_product(product_id, db_product.name)
+    product_search_index.upsert(product_id, db_product.name, db_product.description)
+    await response_cache.invalidate("inventory", "sales")
     return db_product
 
 @router.delete("/{product_id}")
-def delete_product(product_id: int, db: Session = Depends(get_db)):
-    """Delete a product"""
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a product and its inventory item"""
+    db_product = await db.get(Product, product_id)
     if db_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    db.delete(db_product)
-    db.commit()
+    # Its sales keep their history without a product: hot ones are set to NULL
+    # by the ORM, archived ones here, and the rollup files both under product 0
+    await db.execute(update(SaleArchive).where(SaleArchive.product_id == product_id).values(product_id=None))
+    await revenue_rollup.orphan_product(db, product_id)
+    inventory = (await db.execute(
+        select(Inventory).where(Inventory.product_id == product_id).with_for_update()
+    )).scalar_one_or_none()
+    if inventory is not None:
+        await inventory_events.remove_inventory(db, inventory)
+    await db.delete(db_product)
+    await db.commit()
+    inventory_index.remove_product(product_id)
+    product_search_index.remove(product_id)
+    await response_cache.invalidate("inventory", "sales")
     return {"message": "Product deleted successfully"} 
\ No newline at end of file
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Response
+from app.core.config import settings
+from app.schemas.schemas import ReportJob, ReportRequest
+from app.services.reports import QueueFull, report_jobs, validate
+
+router = APIRouter()
+
+@router.post("/", response_model=ReportJob, status_code=202)
+def submit_report(request: ReportRequest, response: Response):
+    """Queue a report (revenue, top_products or velocity) and return its job.
+
+    An identical report that is still waiting or running is returned instead
+    of queuing another. Poll the URL in the Location header for the result.
+    """
+    params = request.model_dump(exclude={"report"})
+    try:
+        validate(request.report, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        job = report_jobs.submit(request.report, params)
+    except QueueFull:
+        raise HTTPException(
+            status_code=429,
+            detail=f"{settings.REPORT_MAX_PENDING} reports are already pending, retry later",
+            headers={"Retry-After": "30"},
+        )
+    response.headers["Location"] = f"/api/reports/{job.id}"
+    return job.to_dict()
+
+@router.get("/{job_id}", response_model=ReportJob)
+def get_report(job_id: str):
+    """Get a report job's status, and its result once done (kept for REPORT_RESULT_TTL seconds)"""
+    job = report_jobs.lookup(job_id)
+    if job is None:
+        detail = "Report not found or expired"
+        if report_jobs.store is None:
+            # Without CACHE_URL another worker may hold it
+            detail += " in this worker"
+        raise HTTPException(status_code=404, detail=detail)
+    return job
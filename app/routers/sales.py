@@ -1,84 +1,370 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract
+import asyncio
+import heapq
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Optional
 from datetime import datetime, timedelta
-from app.db.session import get_db
-from app.models.models import Sale, Product
+from app.core.cache import response_cache
+from app.core.serialization import fast_response
+from app.core.config import settings
+from app.db.session import async_read_engine, get_async_db, get_read_db
+from app.db.pagination import NEXT_CURSOR_HEADER, encode_cursor, keyset_page, parse_datetime
+from app.models.models import Sale, SaleArchive, Product
+from app.services import revenue_rollup, sales_analytics, sales_archive, sales_export, stock, time_buckets
+from app.services.inventory_index import inventory_index
+from app.services.sales_snapshot import DailyTotal, sales_snapshot
 from app.schemas.schemas import (
-    SaleResponse, SaleCreate, SaleUpdate, 
+    SaleResponse, SaleCreate, SaleUpdate, BulkSaleResponse,
     SalesAnalytics, SalesComparison,
-    RevenueAnalytics, RevenueResponse, RevenueComparisonResponse
+    RevenueAnalytics, RevenueResponse, RevenueComparisonResponse,
+    MultiPeriodComparisonResponse, ProductLeaderboardEntry, ProductVelocity, RevenueBucket
 )
 
 router = APIRouter()
 
+# Upper bound on periods per comparison, each adds three aggregates to the query
+MAX_COMPARE_PERIODS = 60
+
+TIMEZONE_QUERY = Query(None, description="IANA time zone for bucket boundaries, e.g. Europe/Berlin (default UTC)")
+
+def _filter_sales(query, start_date=None, end_date=None, product_id=None, table=Sale):
+    """Apply the common sale filters to an ORM query or a select() of ``table``"""
+    if start_date:
+        query = query.filter(table.sale_date >= start_date)
+    if end_date:
+        query = query.filter(table.sale_date <= end_date)
+    if product_id:
+        query = query.filter(table.product_id == product_id)
+    return query
+
+async def _load_sale(db: AsyncSession, sale_id: int) -> Optional[Sale]:
+    """Load a sale with its product, refreshing any copy already in the session"""
+    stmt = (
+        select(Sale)
+        .options(joinedload(Sale.product))
+        .where(Sale.id == sale_id)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+async def _missing_sale(db: AsyncSession, sale_id: int):
+    """404 for an unknown sale, 409 for one that has been archived"""
+    if await db.get(SaleArchive, sale_id) is not None:
+        raise HTTPException(status_code=409, detail="Sale is archived and read-only")
+    raise HTTPException(status_code=404, detail="Sale not found")
+
+async def _reaches_archive(db: AsyncSession, start_date) -> bool:
+    """Whether archived sales could match a listing starting at ``start_date``"""
+    archived_through = await sales_archive.archived_through(db)
+    if archived_through is None:
+        return False
+    return start_date is None or start_date.replace(tzinfo=None) <= archived_through.replace(tzinfo=None)
+
 @router.get("/", response_model=List[SaleResponse])
-def get_sales(
-    db: Session = Depends(get_db),
+@fast_response(List[SaleResponse])
+async def get_sales(
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     product_id: Optional[int] = None
 ):
-    query = db.query(Sale)
-    
-    if start_date:
-        query = query.filter(Sale.sale_date >= start_date)
-    if end_date:
-        query = query.filter(Sale.sale_date <= end_date)
-    if product_id:
-        query = query.filter(Sale.product_id == product_id)
-    
-    return query.offset(skip).limit(limit).all()
+    """Get sales with optional filters.
+
+    Pass ``cursor`` (empty for the first page) to page by (sale_date, id) instead
+    of skip/limit; the next page's cursor is returned in the X-Next-Cursor header.
+    Archived sales are included when the date range reaches them: cursor pages
+    merge both tables in order, skip/limit pages list hot sales first.
+    """
+    stmt = select(Sale).options(joinedload(Sale.product))
+    stmt = _filter_sales(stmt, start_date, end_date, product_id)
+    if not await _reaches_archive(db, start_date):
+        if cursor is not None:
+            return await keyset_page(db, stmt, response, cursor, limit, (Sale.sale_date, Sale.id), (datetime, int))
+        return (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
+
+    archived = select(SaleArchive).options(joinedload(SaleArchive.product))
+    archived = _filter_sales(archived, start_date, end_date, product_id, SaleArchive)
+    if cursor is not None:
+        # Each table gives its next ``limit`` rows after the cursor; the page is
+        # the first ``limit`` of the two merged
+        hot = await keyset_page(db, stmt, Response(), cursor, limit, (Sale.sale_date, Sale.id), (datetime, int))
+        old = await keyset_page(
+            db, archived, Response(), cursor, limit, (SaleArchive.sale_date, SaleArchive.id), (datetime, int)
+        )
+        rows = list(heapq.merge(old, hot, key=lambda sale: (sale.sale_date, sale.id)))[:limit]
+        if len(rows) == limit and rows:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].sale_date, rows[-1].id)
+        return rows
+
+    rows = (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
+    if len(rows) == limit:
+        return rows
+    # The hot table ran out on this page: continue into the archive
+    hot_count = skip + len(rows) if rows else (
+        await db.execute(_filter_sales(select(func.count(Sale.id)), start_date, end_date, product_id))
+    ).scalar()
+    archived = archived.offset(max(skip - hot_count, 0)).limit(limit - len(rows))
+    return [*rows, *(await db.execute(archived)).scalars().all()]
 
 @router.post("/", response_model=SaleResponse)
-def create_sale(sale: SaleCreate, db: Session = Depends(get_db)):
+async def create_sale(sale: SaleCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new sale"""
     db_sale = Sale(**sale.model_dump())
     db.add(db_sale)
-    db.commit()
-    db.refresh(db_sale)
-    return db_sale
+    await revenue_rollup.record_sale(db, sale.product_id, sale.sale_date, sale.quantity, sale.total_amount)
+    await db.commit()
+    sales_snapshot.mark_stale()
+    await response_cache.invalidate("sales")
+    return await _load_sale(db, db_sale.id)
+
+@router.post("/place", response_model=SaleResponse)
+async def place_sale(sale: SaleCreate, db: AsyncSession = Depends(get_async_db)):
+    """Record a sale and take its quantity from stock in one transaction.
+
+    Responds 409 without recording anything when the product does not have
+    enough stock left.
+    """
+    try:
+        inventory = await stock.decrement_stock(db, sale.product_id, sale.quantity)
+    except HTTPException:
+        await db.rollback()
+        raise
+    db_sale = Sale(**sale.model_dump())
+    db.add(db_sale)
+    await revenue_rollup.record_sale(db, sale.product_id, sale.sale_date, sale.quantity, sale.total_amount)
+    await db.commit()
+    sales_snapshot.mark_stale()
+    inventory_index.set_stock(inventory.id, inventory.quantity, inventory.low_stock_threshold)
+    await response_cache.invalidate("sales", "inventory")
+    return await _load_sale(db, db_sale.id)
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'body'}: {err['msg']}" for err in e.errors()
+    )
+
+async def _write_sale_chunk(db: AsyncSession, chunk, results):
+    """Insert a chunk of validated sales in one transaction with a multi-row INSERT"""
+    rows = [row for _, row in chunk]
+    try:
+        await db.execute(insert(Sale), rows)
+        await revenue_rollup.record_sales(db, rows)
+        await db.commit()
+        sales_snapshot.mark_stale()
+        await response_cache.invalidate("sales")
+        status, error = "created", None
+    except SQLAlchemyError as e:
+        await db.rollback()
+        status, error = "failed", str(getattr(e, "orig", None) or e)
+    for index, _ in chunk:
+        results[index] = {"index": index, "status": status, "error": error}
+
+@router.post("/bulk", response_model=BulkSaleResponse)
+async def create_sales_bulk(
+    request: Request,
+    chunk_size: Optional[int] = Query(None, gt=0, le=10000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many sales from a JSON array or a streamed NDJSON body.
+
+    Valid rows are written with multi-row inserts, one transaction per chunk of
+    ``chunk_size`` rows (BULK_INSERT_CHUNK_SIZE by default). A failing chunk is
+    rolled back on its own; every input row gets a status in the response.
+    """
+    chunk_size = chunk_size or settings.BULK_INSERT_CHUNK_SIZE
+    results = {}
+    chunk = []
+
+    async def add(index, data):
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object")
+            sale = SaleCreate.model_validate(data)
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "invalid", "error": _validation_message(e)}
+            return
+        except ValueError as e:
+            results[index] = {"index": index, "status": "invalid", "error": str(e)}
+            return
+        chunk.append((index, sale.model_dump()))
+        if len(chunk) >= chunk_size:
+            await _write_sale_chunk(db, list(chunk), results)
+            chunk.clear()
+
+    async def add_line(index, line):
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            results[index] = {"index": index, "status": "invalid", "error": f"invalid JSON: {e}"}
+            return
+        await add(index, data)
+
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        # Parse line by line as the body arrives so memory stays bounded by the chunk size
+        index = 0
+        buffer = b""
+        async for block in request.stream():
+            buffer += block
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    await add_line(index, line)
+                    index += 1
+        if buffer.strip():
+            await add_line(index, buffer)
+    else:
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of sales")
+        for index, data in enumerate(payload):
+            await add(index, data)
+
+    if chunk:
+        await _write_sale_chunk(db, chunk, results)
+
+    ordered = [results[i] for i in sorted(results)]
+    created = sum(1 for r in ordered if r["status"] == "created")
+    return {"created": created, "failed": len(ordered) - created, "results": ordered}
+
+@router.get("/export")
+async def export_sales(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    product_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Stream sales as CSV, NDJSON or Parquet using a server-side cursor.
+
+    Rows are fetched in batches of EXPORT_BATCH_SIZE and written straight to
+    the response, so memory use does not depend on the size of the export.
+    """
+    if format == "parquet" and not sales_export.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+    stmt = sales_archive.union_sales(
+        lambda table: _filter_sales(sales_export.export_statement(table), start_date, end_date, product_id, table)
+    )
+    body = sales_export.WRITERS[format](db.bind, stmt, settings.EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        body,
+        media_type=sales_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="sales.{format}"'}
+    )
 
 @router.get("/{sale_id}", response_model=SaleResponse)
-def get_sale(sale_id: int, db: Session = Depends(get_db)):
-    """Get a specific sale by ID"""
-    sale = db.query(Sale).filter(Sale.id == sale_id).first()
+async def get_sale(sale_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Get a specific sale by ID, hot or archived"""
+    sale = await _load_sale(db, sale_id)
+    if sale is None:
+        sale = await db.get(SaleArchive, sale_id, options=[joinedload(SaleArchive.product)])
     if sale is None:
         raise HTTPException(status_code=404, detail="Sale not found")
     return sale
 
 @router.put("/{sale_id}", response_model=SaleResponse)
-def update_sale(sale_id: int, sale: SaleUpdate, db: Session = Depends(get_db)):
+async def update_sale(sale_id: int, sale: SaleUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update a sale"""
-    db_sale = db.query(Sale).filter(Sale.id == sale_id).first()
+    # Locked so concurrent edits of one sale can't both subtract its old values from the rollup
+    db_sale = await db.get(Sale, sale_id, with_for_update=True)
     if db_sale is None:
-        raise HTTPException(status_code=404, detail="Sale not found")
+        await _missing_sale(db, sale_id)
     
+    await revenue_rollup.remove_sale(db, db_sale.product_id, db_sale.sale_date, db_sale.quantity, db_sale.total_amount)
     for key, value in sale.model_dump(exclude_unset=True).items():
         setattr(db_sale, key, value)
+    await revenue_rollup.record_sale(db, db_sale.product_id, db_sale.sale_date, db_sale.quantity, db_sale.total_amount)
     
-    db.commit()
-    db.refresh(db_sale)
-    return db_sale
+    await db.commit()
+    sales_snapshot.apply_update(sale_id, db_sale.product_id, db_sale.quantity, db_sale.total_amount, db_sale.sale_date)
+    await response_cache.invalidate("sales")
+    return await _load_sale(db, sale_id)
 
 @router.delete("/{sale_id}")
-def delete_sale(sale_id: int, db: Session = Depends(get_db)):
+async def delete_sale(sale_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a sale"""
-    db_sale = db.query(Sale).filter(Sale.id == sale_id).first()
+    db_sale = await db.get(Sale, sale_id, with_for_update=True)
     if db_sale is None:
-        raise HTTPException(status_code=404, detail="Sale not found")
+        await _missing_sale(db, sale_id)
     
-    db.delete(db_sale)
-    db.commit()
+    await revenue_rollup.remove_sale(db, db_sale.product_id, db_sale.sale_date, db_sale.quantity, db_sale.total_amount)
+    await db.delete(db_sale)
+    await db.commit()
+    sales_snapshot.apply_delete(sale_id)
+    await response_cache.invalidate("sales")
     return {"message": "Sale deleted successfully"}
 
+async def _snapshot():
+    """The sales snapshot, caught up with recent sales, or None when not loaded"""
+    if not sales_snapshot.ready:
+        return None
+    await sales_snapshot.catch_up(async_read_engine, settings.SALES_SNAPSHOT_REFRESH_SECONDS)
+    return sales_snapshot
+
+def _zone(name: Optional[str]):
+    try:
+        return time_buckets.get_zone(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _check_bucket_count(granularity: str, zone, start_date, end_date):
+    try:
+        time_buckets.check_bucket_count(granularity, zone, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _local_daily_totals(db: AsyncSession, start_date, end_date, zone):
+    """Daily totals with day boundaries in ``zone``, bucketed from the sales table"""
+    if start_date is None or end_date is None:
+        bounds = await time_buckets.sales_bounds(db)
+        if bounds is None:
+            return []
+        start_date, end_date = start_date or bounds[0], end_date or bounds[1]
+    _check_bucket_count("day", zone, start_date, end_date)
+    buckets = await time_buckets.bucket_totals(db, "day", zone, start_date, end_date)
+    return [DailyTotal(b.start.date(), b.revenue, b.order_count, b.quantity) for b in buckets]
+
+async def _daily_totals(db: AsyncSession, start_date, end_date, timezone=None):
+    # The rollup and the snapshot keep UTC days
+    zone = _zone(timezone)
+    if zone.key != "UTC":
+        return await _local_daily_totals(db, start_date, end_date, zone)
+    snapshot = await _snapshot()
+    if snapshot is not None:
+        return await asyncio.to_thread(snapshot.daily_totals, start_date, end_date)
+    return await revenue_rollup.daily_totals(db, start_date, end_date)
+
+async def _product_totals(db: AsyncSession, product_id, start_date, end_date):
+    snapshot = await _snapshot()
+    if snapshot is not None:
+        return await asyncio.to_thread(snapshot.product_totals, product_id, start_date, end_date)
+    return await revenue_rollup.product_totals(db, product_id, start_date, end_date)
+
+async def _period_totals(db: AsyncSession, periods, product_id=None):
+    snapshot = await _snapshot()
+    if snapshot is not None:
+        return await asyncio.to_thread(snapshot.period_totals, periods, product_id)
+    return await sales_analytics.period_totals(db, periods, product_id)
+
 @router.get("/revenue/product/{product_id}", response_model=RevenueAnalytics)
-def get_product_revenue(
+@response_cache.cached("sales")
+async def get_product_revenue(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None
 ):
@@ -88,142 +374,224 @@ def get_product_revenue(
     if not end_date:
         end_date = datetime.utcnow()
 
-    result = db.query(
-        func.sum(Sale.total_amount).label('revenue'),
-        func.count(Sale.id).label('order_count'),
-        func.avg(Sale.total_amount).label('average_order_value')
-    ).filter(
-        Sale.product_id == product_id,
-        Sale.sale_date >= start_date,
-        Sale.sale_date <= end_date
-    ).first()
+    result = await _product_totals(db, product_id, start_date, end_date)
 
     if not result:
         raise HTTPException(status_code=404, detail="No sales data found for this product")
 
+    revenue = float(result.revenue or 0)
+    order_count = int(result.order_count or 0)
     return RevenueAnalytics(
         period=f"{start_date.date()} to {end_date.date()}",
-        revenue=float(result.revenue or 0),
-        order_count=int(result.order_count or 0),
-        average_order_value=float(result.average_order_value or 0)
+        revenue=revenue,
+        order_count=order_count,
+        average_order_value=revenue / order_count if order_count else 0.0
     )
 
 @router.get("/revenue/daily", response_model=List[RevenueResponse])
-def get_daily_revenue(
+@fast_response(List[RevenueResponse])
+@response_cache.cached("sales")
+async def get_daily_revenue(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db)
+    timezone: Optional[str] = TIMEZONE_QUERY,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get daily revenue for a specified period"""
-    query = db.query(
-        func.date(Sale.sale_date).label("period"),
-        func.sum(Sale.total_amount).label("total_revenue")
-    ).group_by(func.date(Sale.sale_date))
-    
-    if start_date:
-        query = query.filter(Sale.sale_date >= start_date)
-    if end_date:
-        query = query.filter(Sale.sale_date <= end_date)
-    
-    results = query.all()
-    return [{"period": str(r.period), "total_revenue": r.total_revenue} for r in results]
+    results = await _daily_totals(db, start_date, end_date, timezone)
+    return [{"period": str(r.sale_day), "total_revenue": r.revenue} for r in results]
+
+def _bucket_revenue(results, period_key):
+    """Fold ordered daily rollup rows into coarser periods"""
+    buckets = {}
+    for r in results:
+        key = period_key(r.sale_day)
+        buckets[key] = buckets.get(key, 0.0) + float(r.revenue or 0)
+    return [{"period": key, "total_revenue": total} for key, total in buckets.items()]
 
 @router.get("/revenue/weekly", response_model=List[RevenueResponse])
-def get_weekly_revenue(
+@fast_response(List[RevenueResponse])
+@response_cache.cached("sales")
+async def get_weekly_revenue(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db)
+    timezone: Optional[str] = TIMEZONE_QUERY,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get weekly revenue for a specified period (MySQL compatible)"""
-    query = db.query(
-        func.year(Sale.sale_date).label("year"),
-        func.week(Sale.sale_date, 1).label("week"),
-        func.sum(Sale.total_amount).label("total_revenue")
+    """Get weekly revenue for a specified period (MySQL WEEK mode 1 numbering)"""
+    results = await _daily_totals(db, start_date, end_date, timezone)
+    return _bucket_revenue(
+        results,
+        lambda day: f"{day.year}-W{str(revenue_rollup.mysql_week(day)).zfill(2)}"
     )
-    if start_date:
-        query = query.filter(Sale.sale_date >= start_date)
-    if end_date:
-        query = query.filter(Sale.sale_date <= end_date)
-    query = query.group_by(func.year(Sale.sale_date), func.week(Sale.sale_date, 1)).order_by(func.year(Sale.sale_date), func.week(Sale.sale_date, 1))
-    results = query.all()
-    return [{"period": f"{r.year}-W{str(r.week).zfill(2)}", "total_revenue": r.total_revenue} for r in results]
 
 @router.get("/revenue/monthly", response_model=List[RevenueResponse])
-def get_monthly_revenue(
+@fast_response(List[RevenueResponse])
+@response_cache.cached("sales")
+async def get_monthly_revenue(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db)
+    timezone: Optional[str] = TIMEZONE_QUERY,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get monthly revenue for a specified period (MySQL compatible)"""
-    query = db.query(
-        func.year(Sale.sale_date).label("year"),
-        func.month(Sale.sale_date).label("month"),
-        func.sum(Sale.total_amount).label("total_revenue")
-    )
-    if start_date:
-        query = query.filter(Sale.sale_date >= start_date)
-    if end_date:
-        query = query.filter(Sale.sale_date <= end_date)
-    query = query.group_by(func.year(Sale.sale_date), func.month(Sale.sale_date)).order_by(func.year(Sale.sale_date), func.month(Sale.sale_date))
-    results = query.all()
-    return [{"period": f"{r.year}-{str(r.month).zfill(2)}", "total_revenue": r.total_revenue} for r in results]
+    """Get monthly revenue for a specified period"""
+    results = await _daily_totals(db, start_date, end_date, timezone)
+    return _bucket_revenue(results, lambda day: f"{day.year}-{str(day.month).zfill(2)}")
 
 @router.get("/revenue/annual", response_model=List[RevenueResponse])
-def get_annual_revenue(
+@fast_response(List[RevenueResponse])
+@response_cache.cached("sales")
+async def get_annual_revenue(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db)
+    timezone: Optional[str] = TIMEZONE_QUERY,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get annual revenue for a specified period (MySQL compatible)"""
-    query = db.query(
-        func.year(Sale.sale_date).label("year"),
-        func.sum(Sale.total_amount).label("total_revenue")
-    )
-    if start_date:
-        query = query.filter(Sale.sale_date >= start_date)
-    if end_date:
-        query = query.filter(Sale.sale_date <= end_date)
-    query = query.group_by(func.year(Sale.sale_date)).order_by(func.year(Sale.sale_date))
-    results = query.all()
-    return [{"period": str(r.year), "total_revenue": r.total_revenue} for r in results]
+    """Get annual revenue for a specified period"""
+    results = await _daily_totals(db, start_date, end_date, timezone)
+    return _bucket_revenue(results, lambda day: str(day.year))
+
+@router.get("/revenue/buckets", response_model=List[RevenueBucket])
+@fast_response(List[RevenueBucket])
+@response_cache.cached("sales")
+async def get_revenue_buckets(
+    granularity: str = Query("day", pattern="^(hour|day|week|month|year)$"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    timezone: Optional[str] = TIMEZONE_QUERY,
+    product_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Revenue, orders and units per hour, day, week (from Monday), month or year
+    in ``timezone``. Naive dates are wall time in that zone and the range is
+    widened to whole buckets; empty buckets are omitted."""
+    zone = _zone(timezone)
+    if start_date is None or end_date is None:
+        bounds = await time_buckets.sales_bounds(db, product_id)
+        if bounds is None:
+            return []
+        start_date, end_date = start_date or bounds[0], end_date or bounds[1]
+    start_date, end_date = time_buckets.aware(start_date, zone), time_buckets.aware(end_date, zone)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    _check_bucket_count(granularity, zone, start_date, end_date)
+    return await time_buckets.bucket_totals(db, granularity, zone, start_date, end_date, product_id)
 
 @router.get("/revenue/compare", response_model=RevenueComparisonResponse)
-def compare_revenue(
+@response_cache.cached("sales")
+async def compare_revenue(
     period1_start: datetime = Query(...),
     period1_end: datetime = Query(...),
     period2_start: datetime = Query(...),
     period2_end: datetime = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Compare revenue between two different periods"""
-    # Get revenue for period 1
-    period1_revenue = db.query(func.sum(Sale.total_amount)).filter(
-        Sale.sale_date >= period1_start,
-        Sale.sale_date <= period1_end
-    ).scalar() or 0
-
-    # Get revenue for period 2
-    period2_revenue = db.query(func.sum(Sale.total_amount)).filter(
-        Sale.sale_date >= period2_start,
-        Sale.sale_date <= period2_end
-    ).scalar() or 0
-
-    # Calculate percentage change
-    if period1_revenue == 0:
-        percentage_change = 100 if period2_revenue > 0 else 0
-    else:
-        percentage_change = ((period2_revenue - period1_revenue) / period1_revenue) * 100
+    period1, period2 = await _period_totals(
+        db, [(period1_start, period1_end), (period2_start, period2_end)]
+    )
 
     return {
         "period1": {
             "start": period1_start,
             "end": period1_end,
-            "total_revenue": period1_revenue
+            "total_revenue": period1["revenue"]
         },
         "period2": {
             "start": period2_start,
             "end": period2_end,
-            "total_revenue": period2_revenue
+            "total_revenue": period2["revenue"]
         },
-        "percentage_change": percentage_change
-    } 
\ No newline at end of file
+        "percentage_change": sales_analytics.percentage_change(period1["revenue"], period2["revenue"])
+    }
+
+def _parse_period(value: str):
+    """Parse an ISO 8601 ``start/end`` interval"""
+    try:
+        start, end = value.split("/")
+        start, end = parse_datetime(start), parse_datetime(end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid period '{value}', expected <start>/<end> in ISO 8601")
+    # Bounds are compared by wall clock, as period_totals reads them
+    if end.replace(tzinfo=None) < start.replace(tzinfo=None):
+        raise HTTPException(status_code=400, detail=f"Period '{value}' ends before it starts")
+    return start, end
+
+@router.get("/revenue/compare/periods", response_model=MultiPeriodComparisonResponse)
+@fast_response(MultiPeriodComparisonResponse)
+@response_cache.cached("sales")
+async def compare_revenue_periods(
+    period: Optional[List[str]] = Query(None, description="Repeatable ISO 8601 interval, e.g. 2024-01-01T00:00:00/2024-01-07T23:59:59"),
+    product_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Compare sales across any number of periods with a fixed number of queries.
+
+    Each period reports revenue, order count, quantity and average order
+    value; ``percentage_change`` is the revenue change relative to the first
+    period.
+    """
+    if not period:
+        raise HTTPException(status_code=400, detail="At least one period is required")
+    if len(period) > MAX_COMPARE_PERIODS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_PERIODS} periods can be compared")
+    periods = [_parse_period(value) for value in period]
+    totals = await _period_totals(db, periods, product_id)
+
+    baseline = totals[0]["revenue"]
+    return {
+        "product_id": product_id,
+        "periods": [
+            {
+                "period": value,
+                "start": t["start"],
+                "end": t["end"],
+                "total_sales": t["revenue"],
+                "order_count": t["order_count"],
+                "total_quantity": t["quantity"],
+                "average_order_value": t["average_order_value"],
+                "percentage_change": None if index == 0 else sales_analytics.percentage_change(baseline, t["revenue"]),
+            }
+            for index, (value, t) in enumerate(zip(period, totals))
+        ]
+    }
+
+def _analytics_window(start_date: Optional[datetime], end_date: Optional[datetime]):
+    """Inclusive day range, defaulting to the last 30 days"""
+    end_day = (end_date or datetime.utcnow()).date()
+    start_day = start_date.date() if start_date else end_day - timedelta(days=29)
+    if end_day < start_day:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    return start_day, end_day
+
+@router.get("/analytics/top-products", response_model=List[ProductLeaderboardEntry])
+@fast_response(List[ProductLeaderboardEntry])
+@response_cache.cached("sales")
+async def get_top_products(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    metric: str = Query("revenue", pattern="^(revenue|units)$"),
+    limit: int = Query(50, gt=0, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Top products by revenue or units, with share of the total and growth
+    against the preceding window of the same length (day granularity)"""
+    start_day, end_day = _analytics_window(start_date, end_date)
+    return await sales_analytics.top_products(db, start_day, end_day, metric, limit)
+
+@router.get("/analytics/velocity", response_model=List[ProductVelocity])
+@fast_response(List[ProductVelocity])
+@response_cache.cached("sales")
+async def get_sales_velocity(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    product_id: Optional[int] = None,
+    window: int = Query(7, gt=0, le=365),
+    limit: int = Query(50, gt=0, le=1000),
+    include_daily: bool = False,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Units sold per day for the fastest-moving products, with a trailing
+    ``window``-day moving average and its growth over the previous window"""
+    start_day, end_day = _analytics_window(start_date, end_date)
+    return await sales_analytics.velocity(db, start_day, end_day, window, limit, product_id, include_daily)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from app.core.cache import response_cache
+from app.core.startup import startup_timer
+from app.db.pool import pool_status
+from app.db.session import async_engine, async_read_engine, engine
+from app.services.sales_snapshot import sales_snapshot
+
+router = APIRouter()
+
+@router.get("/pool")
+def get_pool_status():
+    """Get connection pool occupancy and checkout wait statistics for this worker"""
+    status = {
+        "api": pool_status(async_engine.sync_engine),
+        "sync": pool_status(engine),
+    }
+    if async_read_engine is not async_engine:
+        status["read"] = pool_status(async_read_engine.sync_engine)
+    return status
+
+@router.get("/cache")
+def get_cache_stats():
+    """Get response cache hit/miss counters for this worker"""
+    return response_cache.report()
+
+@router.get("/sales-snapshot")
+def get_sales_snapshot_status():
+    """Get the size and freshness of this worker's columnar sales snapshot"""
+    return sales_snapshot.report()
+
+@router.get("/startup")
+def get_startup_report():
+    """Get this worker's import and startup phase timings and warm-up results"""
+    return startup_timer.report()
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from typing import Any, Optional, List
+from datetime import date, datetime
 
 # Product Schemas
 class ProductBase(BaseModel):
@@ -55,9 +55,12 @@ class InventoryStatus(BaseModel):
 
 class InventoryHistory(BaseModel):
     id: int
-    product_name: str
+    event_id: int
+    product_name: Optional[str] = None
     quantity: int
     low_stock_threshold: int
+    delta: int
+    reason: str
     change_date: datetime
     status: str
 
@@ -80,17 +83,30 @@ class SaleResponse(SaleBase):
     id: int
     created_at: datetime
     updated_at: datetime
-    product: ProductResponse
+    # Sales outlive their product; both are null once it is deleted
+    product_id: Optional[int] = None
+    product: Optional[ProductResponse] = None
 
     class Config:
         from_attributes = True
 
+class BulkSaleResult(BaseModel):
+    index: int
+    status: str
+    error: Optional[str] = None
+
+class BulkSaleResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkSaleResult]
+
 # Analytics Schemas
 class SalesAnalytics(BaseModel):
     period: str
     total_sales: float
     total_quantity: int
     average_order_value: float
+    order_count: int = 0
 
 class SalesComparison(BaseModel):
     period1: SalesAnalytics
@@ -110,6 +126,12 @@ class RevenueResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class RevenueBucket(BaseModel):
+    start: datetime
+    revenue: float
+    order_count: int
+    quantity: int
+
 class PeriodRevenue(BaseModel):
     start: datetime
     end: datetime
@@ -118,10 +140,64 @@ class PeriodRevenue(BaseModel):
     class Config:
         from_attributes = True
 
+class PeriodSalesAnalytics(SalesAnalytics):
+    start: datetime
+    end: datetime
+    percentage_change: Optional[float] = None
+
+class MultiPeriodComparisonResponse(BaseModel):
+    product_id: Optional[int] = None
+    periods: List[PeriodSalesAnalytics]
+
+class ProductLeaderboardEntry(BaseModel):
+    rank: int
+    product_id: int
+    product_name: Optional[str] = None
+    revenue: float
+    units: int
+    order_count: int
+    share: float
+    growth: Optional[float] = None
+
+class DailyVelocity(BaseModel):
+    day: date
+    units: int
+    moving_average: float
+
+class ProductVelocity(BaseModel):
+    product_id: int
+    product_name: Optional[str] = None
+    total_units: int
+    units_per_day: float
+    moving_average: float
+    growth: Optional[float] = None
+    daily: Optional[List[DailyVelocity]] = None
+
 class RevenueComparisonResponse(BaseModel):
     period1: PeriodRevenue
     period2: PeriodRevenue
     percentage_change: float
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class ReportRequest(BaseModel):
+    report: str = Field(pattern="^(revenue|top_products|velocity)$")
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    product_id: Optional[int] = None
+    granularity: str = Field("week", pattern="^(hour|day|week|month|year)$")
+    timezone: Optional[str] = None
+    metric: str = Field("revenue", pattern="^(revenue|units)$")
+    window: int = Field(7, gt=0, le=365)
+    limit: int = Field(1000, gt=0, le=100000)
+
+class ReportJob(BaseModel):
+    id: str
+    report: str
+    status: str
+    submitted_at: datetime
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[Any] = None
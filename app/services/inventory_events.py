@@ -0,0 +1,48 @@
+from datetime import datetime
+from sqlalchemy import case, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Inventory, InventoryEvent, Product
+
+
+def record_event(db: AsyncSession, inventory: Inventory, delta: int, reason: str):
+    """Append a movement for ``inventory`` in its resulting state. Runs in the caller's transaction."""
+    # Stamped here rather than by the server so stored values and history cursors
+    # share one format (SQLite compares them as text)
+    db.add(InventoryEvent(
+        inventory_id=inventory.id,
+        product_id=inventory.product_id,
+        delta=delta,
+        quantity=inventory.quantity,
+        low_stock_threshold=inventory.low_stock_threshold,
+        reason=reason,
+        created_at=datetime.utcnow(),
+    ))
+
+
+async def remove_inventory(db: AsyncSession, inventory: Inventory):
+    """Delete ``inventory``, closing its log with a "deleted" event down to
+    quantity 0 so the deltas still sum to the stock. Runs in the caller's transaction."""
+    delta = -inventory.quantity
+    inventory.quantity = 0
+    record_event(db, inventory, delta, "deleted")
+    await db.delete(inventory)
+
+
+def history_statement():
+    """Events joined with product names, shaped like InventoryHistory; events
+    of deleted products are kept with a null name"""
+    return select(
+        InventoryEvent.inventory_id.label('id'),
+        InventoryEvent.id.label('event_id'),
+        Product.name.label('product_name'),
+        InventoryEvent.quantity,
+        InventoryEvent.low_stock_threshold,
+        InventoryEvent.delta,
+        InventoryEvent.reason,
+        InventoryEvent.created_at.label('change_date'),
+        case(
+            (InventoryEvent.quantity <= InventoryEvent.low_stock_threshold, 'Low Stock'),
+            (InventoryEvent.quantity == 0, 'Out of Stock'),
+            else_='In Stock'
+        ).label('status')
+    ).outerjoin(Product, Product.id == InventoryEvent.product_id)
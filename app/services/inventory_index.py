@@ -0,0 +1,166 @@
+import asyncio
+import bisect
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from app.models.models import Inventory, Product
+
+logger = logging.getLogger(__name__)
+
+
+def stock_status(quantity: int, low_stock_threshold: int) -> str:
+    """Status bucket, evaluated in the same order as the original SQL CASE"""
+    if quantity <= low_stock_threshold:
+        return "Low Stock"
+    if quantity == 0:
+        return "Out of Stock"
+    return "In Stock"
+
+
+@dataclass
+class InventoryEntry:
+    id: int
+    product_id: int
+    product_name: str
+    quantity: int
+    low_stock_threshold: int
+
+    def as_status(self) -> dict:
+        return {
+            "id": self.id,
+            "product_name": self.product_name,
+            "quantity": self.quantity,
+            "low_stock_threshold": self.low_stock_threshold,
+            "status": stock_status(self.quantity, self.low_stock_threshold),
+        }
+
+
+class InventoryIndex:
+    """Process-local view of inventory joined with product names.
+
+    Entries are kept in a list sorted by (quantity, id) so "quantity <= n"
+    alerts are a bisect plus a slice, and the ids at or below their own
+    threshold are tracked as a set. Write routes update the index after they
+    commit; ``reload`` rebuilds it from the database to reconcile changes made
+    by other workers or processes.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._entries: Dict[int, InventoryEntry] = {}
+        self._by_quantity: List[tuple] = []
+        self._low_stock = set()
+        # Write logs of the reloads currently querying; apps sharing the process may overlap them
+        self._pending: List[list] = []
+
+    def _insert(self, entry: InventoryEntry):
+        self._entries[entry.id] = entry
+        bisect.insort(self._by_quantity, (entry.quantity, entry.id))
+        if entry.quantity <= entry.low_stock_threshold:
+            self._low_stock.add(entry.id)
+
+    def _discard(self, inventory_id: int):
+        entry = self._entries.pop(inventory_id, None)
+        if entry is None:
+            return
+        position = bisect.bisect_left(self._by_quantity, (entry.quantity, entry.id))
+        del self._by_quantity[position]
+        self._low_stock.discard(inventory_id)
+
+    def _record(self, action: str, *args):
+        # Writes seen while a reload is querying are replayed onto the new snapshot
+        for pending in self._pending:
+            pending.append((action, args))
+
+    def upsert(self, entry: InventoryEntry):
+        self._record("upsert", entry)
+        self._discard(entry.id)
+        self._insert(entry)
+
+    def upsert_from(self, inventory: Inventory):
+        """Index a committed Inventory row whose product is loaded"""
+        if inventory.product is None:
+            self.remove(inventory.id)
+            return
+        self.upsert(InventoryEntry(
+            inventory.id,
+            inventory.product_id,
+            inventory.product.name,
+            inventory.quantity,
+            inventory.low_stock_threshold,
+        ))
+
+    def set_stock(self, inventory_id: int, quantity: int, low_stock_threshold: int):
+        """Update the stock level of an indexed item, keeping its product name"""
+        entry = self._entries.get(inventory_id)
+        if entry is None:
+            return
+        self.upsert(InventoryEntry(entry.id, entry.product_id, entry.product_name, quantity, low_stock_threshold))
+
+    def remove(self, inventory_id: int):
+        self._record("remove", inventory_id)
+        self._discard(inventory_id)
+
+    def rename_product(self, product_id: int, name: str):
+        self._record("rename_product", product_id, name)
+        for entry in self._entries.values():
+            if entry.product_id == product_id:
+                entry.product_name = name
+
+    def remove_product(self, product_id: int):
+        self._record("remove_product", product_id)
+        for entry in [e for e in self._entries.values() if e.product_id == product_id]:
+            self.remove(entry.id)
+
+    def status(self, low_stock_only: bool = False) -> List[dict]:
+        ids = sorted(self._low_stock) if low_stock_only else sorted(self._entries)
+        return [self._entries[i].as_status() for i in ids]
+
+    def alerts(self, threshold: Optional[int] = None) -> List[dict]:
+        if threshold is None:
+            return self.status(low_stock_only=True)
+        end = bisect.bisect_right(self._by_quantity, (threshold, float("inf")))
+        ids = sorted(inventory_id for _, inventory_id in self._by_quantity[:end])
+        return [self._entries[i].as_status() for i in ids]
+
+    async def reload(self, session_factory):
+        """Rebuild from the database, replaying writes that land during the load"""
+        pending = []
+        self._pending.append(pending)
+        try:
+            async with session_factory() as db:
+                rows = (await db.execute(
+                    select(
+                        Inventory.id,
+                        Inventory.product_id,
+                        Product.name,
+                        Inventory.quantity,
+                        Inventory.low_stock_threshold,
+                    ).join(Product)
+                )).all()
+            entries = {row.id: InventoryEntry(*row) for row in rows}
+            # Replay without logging again into the other reloads, which hold these writes already
+            logs, self._pending = self._pending, []
+            try:
+                self._entries = entries
+                self._by_quantity = sorted((e.quantity, e.id) for e in entries.values())
+                self._low_stock = {e.id for e in entries.values() if e.quantity <= e.low_stock_threshold}
+                for action, args in pending:
+                    getattr(self, action)(*args)
+            finally:
+                self._pending = logs
+            self.ready = True
+        finally:
+            self._pending = [p for p in self._pending if p is not pending]
+
+    async def reconcile_forever(self, session_factory, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload(session_factory)
+            except Exception:
+                logger.exception("Inventory index reconciliation failed")
+
+
+inventory_index = InventoryIndex()
@@ -0,0 +1,186 @@
+import asyncio
+import bisect
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Product
+
+logger = logging.getLogger(__name__)
+
+# A term found in the name counts this many times more than one in the description
+NAME_WEIGHT = 2
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class _Postings:
+    """Immutable token -> sorted id array map with a sorted vocabulary for prefix lookups"""
+
+    def __init__(self, postings: Dict[str, list]):
+        self.vocabulary = sorted(postings)
+        self.ids = [np.unique(np.asarray(postings[t], dtype=np.int64)) for t in self.vocabulary]
+
+    def prefix_ids(self, prefix: str) -> np.ndarray:
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff", start)
+        if start == end:
+            return np.empty(0, dtype=np.int64)
+        if end - start == 1:
+            return self.ids[start]
+        return np.unique(np.concatenate(self.ids[start:end]))
+
+
+class ProductSearchIndex:
+    """Process-local inverted index over product names and descriptions.
+
+    A reload builds immutable NumPy posting arrays from the database. Writes
+    made since then live in a small overlay keyed by product id that shadows
+    the arrays, so updates never rebuild postings; the periodic reload folds
+    them back in. Every query term is a prefix and all terms must match.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._name = _Postings({})
+        self._description = _Postings({})
+        self._overlay: Dict[int, Optional[Tuple[List[str], List[str]]]] = {}
+        # Write logs of the reloads currently querying; apps sharing the process may overlap them
+        self._pending: List[dict] = []
+
+    def _set(self, product_id: int, value):
+        if not self.ready and not self._pending:
+            # Not maintained in this process (e.g. on MySQL), nothing to shadow
+            return
+        self._overlay[product_id] = value
+        # Writes seen while a reload is querying survive into the new snapshot
+        for pending in self._pending:
+            pending[product_id] = value
+
+    def upsert(self, product_id: int, name: str, description: Optional[str]):
+        self._set(product_id, (tokenize(name), tokenize(description)))
+
+    def remove(self, product_id: int):
+        self._set(product_id, None)
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Ids of the best ``limit`` matches, by score then id"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        candidates = scores = None
+        for term in terms:
+            name_ids = self._name.prefix_ids(term)
+            matched = np.union1d(name_ids, self._description.prefix_ids(term))
+            term_scores = 1 + (NAME_WEIGHT - 1) * np.isin(matched, name_ids, assume_unique=True)
+            if candidates is None:
+                candidates, scores = matched, term_scores
+            else:
+                keep = np.isin(candidates, matched, assume_unique=True)
+                candidates = candidates[keep]
+                scores = scores[keep] + term_scores[np.isin(matched, candidates, assume_unique=True)]
+
+        if self._overlay:
+            # Overlay entries replace whatever the arrays hold for those products
+            shadowed = np.fromiter(self._overlay, dtype=np.int64, count=len(self._overlay))
+            keep = ~np.isin(candidates, shadowed)
+            candidates, scores = candidates[keep], scores[keep]
+            extra = [
+                (product_id, score)
+                for product_id, tokens in self._overlay.items()
+                if tokens is not None and (score := _score(terms, *tokens))
+            ]
+            if extra:
+                candidates = np.concatenate([candidates, np.array([e[0] for e in extra], dtype=np.int64)])
+                scores = np.concatenate([scores, np.array([e[1] for e in extra], dtype=scores.dtype)])
+
+        order = np.lexsort((candidates, -scores))[:limit]
+        return candidates[order].tolist()
+
+    async def reload(self, session_factory):
+        """Rebuild the posting arrays from the database off the event loop"""
+        pending = {}
+        self._pending.append(pending)
+        try:
+            async with session_factory() as db:
+                rows = (await db.execute(select(Product.id, Product.name, Product.description))).all()
+            name, description = await asyncio.to_thread(_build, rows)
+            self._name, self._description = name, description
+            self._overlay = pending
+            self.ready = True
+        finally:
+            self._pending = [p for p in self._pending if p is not pending]
+
+    async def maintain(self, session_factory, interval: float):
+        """Load the index, then rebuild it every ``interval`` seconds"""
+        while True:
+            try:
+                await self.reload(session_factory)
+            except Exception:
+                logger.exception("Product search index reload failed")
+            await asyncio.sleep(interval)
+
+
+def _score(terms, name_tokens, description_tokens) -> int:
+    score = 0
+    for term in terms:
+        if any(token.startswith(term) for token in name_tokens):
+            score += NAME_WEIGHT
+        elif any(token.startswith(term) for token in description_tokens):
+            score += 1
+        else:
+            return 0
+    return score
+
+
+def _build(rows):
+    name, description = defaultdict(list), defaultdict(list)
+    for product_id, product_name, product_description in rows:
+        for token in set(tokenize(product_name)):
+            name[token].append(product_id)
+        for token in set(tokenize(product_description)):
+            description[token].append(product_id)
+    return _Postings(name), _Postings(description)
+
+
+product_search_index = ProductSearchIndex()
+
+
+async def search_products(db: AsyncSession, query: str, skip: int, limit: int) -> List[Product]:
+    """Products matching every term of ``query`` as a prefix, most relevant first.
+
+    MySQL uses the FULLTEXT index on (name, description) in boolean mode; other
+    backends use the in-process index, falling back to a LIKE scan until it
+    has loaded.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+
+    if db.get_bind().dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import match
+        relevance = match(
+            Product.name, Product.description, against=" ".join(f"+{t}*" for t in terms)
+        ).in_boolean_mode()
+        stmt = select(Product).where(relevance).order_by(relevance.desc(), Product.id)
+        return (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
+
+    if product_search_index.ready:
+        ids = product_search_index.search(query, skip + limit)[skip:]
+        if not ids:
+            return []
+        products = {p.id: p for p in (await db.execute(select(Product).where(Product.id.in_(ids)))).scalars()}
+        return [products[i] for i in ids if i in products]
+
+    stmt = select(Product)
+    for term in terms:
+        stmt = stmt.where(or_(Product.name.ilike(f"%{term}%"), Product.description.ilike(f"%{term}%")))
+    return (await db.execute(stmt.order_by(Product.id).offset(skip).limit(limit))).scalars().all()
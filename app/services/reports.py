@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.db.session import AsyncReadSessionLocal, async_read_engine
+from app.services import sales_analytics, time_buckets
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("queued", "running", "done", "failed")
+
+# Shared records of jobs still pending expire after this many seconds, in case
+# the worker that accepted them dies before they finish
+PENDING_RECORD_TTL = 24 * 3600
+
+
+class QueueFull(Exception):
+    """Raised when REPORT_MAX_PENDING jobs are already waiting or running"""
+
+
+def _days(start_date: Optional[datetime], end_date: Optional[datetime]):
+    """Inclusive day range, defaulting to the last 30 days like the analytics routes"""
+    end_day = (end_date or datetime.utcnow()).date()
+    start_day = start_date.date() if start_date else end_day - timedelta(days=29)
+    return start_day, end_day
+
+
+async def _revenue(db, start_date, end_date, product_id, granularity, timezone, **_):
+    zone = time_buckets.get_zone(timezone)
+    if start_date is None or end_date is None:
+        bounds = await time_buckets.sales_bounds(db, product_id)
+        if bounds is None:
+            return []
+        start_date, end_date = start_date or bounds[0], end_date or bounds[1]
+    start_date, end_date = time_buckets.aware(start_date, zone), time_buckets.aware(end_date, zone)
+    buckets = await time_buckets.bucket_totals(db, granularity, zone, start_date, end_date, product_id)
+    return [bucket._asdict() for bucket in buckets]
+
+
+async def _top_products(db, start_date, end_date, metric, limit, **_):
+    return await sales_analytics.top_products(db, *_days(start_date, end_date), metric, limit)
+
+
+async def _velocity(db, start_date, end_date, product_id, window, limit, **_):
+    return await sales_analytics.velocity(db, *_days(start_date, end_date), window, limit, product_id, True)
+
+
+# Report name -> coroutine taking a read session and the ReportRequest fields
+REPORTS = {
+    "revenue": _revenue,
+    "top_products": _top_products,
+    "velocity": _velocity,
+}
+
+
+async def _run(report: str, params: dict):
+    try:
+        async with AsyncReadSessionLocal() as db:
+            return jsonable_encoder(await REPORTS[report](db, **params))
+    finally:
+        # Pooled connections belong to this call's event loop
+        await async_read_engine.dispose()
+
+
+def run_report(report: str, params: dict):
+    """Entry point in a worker process: run one report to JSON-ready data"""
+    return asyncio.run(_run(report, params))
+
+
+def validate(report: str, params: dict):
+    """Raise ValueError for parameters a report would fail on, before it is queued"""
+    if report not in REPORTS:
+        raise ValueError(f"Unknown report: {report}")
+    start_date, end_date = params.get("start_date"), params.get("end_date")
+    if report == "revenue":
+        zone = time_buckets.get_zone(params.get("timezone"))
+        backwards = start_date and end_date and time_buckets.aware(end_date, zone) < time_buckets.aware(start_date, zone)
+        if start_date and end_date and not backwards:
+            time_buckets.check_bucket_count(params.get("granularity", "week"), zone, start_date, end_date)
+    else:
+        start_day, end_day = _days(start_date, end_date)
+        backwards = end_day < start_day
+    if backwards:
+        raise ValueError("end_date is before start_date")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Job:
+    """One submitted report and the future of its run in the process pool"""
+
+    def __init__(self, key: str, report: str, future):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.report = report
+        self.future = future
+        self.submitted_at = _now()
+        self.finished_at: Optional[datetime] = None
+        self.expires_at: Optional[datetime] = None
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        return "failed" if self.future.cancelled() or self.future.exception() else "done"
+
+    def to_dict(self) -> dict:
+        status = self.status
+        data = {
+            "id": self.id,
+            "report": self.report,
+            "status": status,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.expires_at,
+            "error": None,
+            "result": None,
+        }
+        if status == "done":
+            data["result"] = self.future.result()
+        elif status == "failed":
+            error = None if self.future.cancelled() else self.future.exception()
+            data["error"] = "cancelled" if error is None else f"{type(error).__name__}: {error}"
+        return data
+
+
+class ReportJobs:
+    """Runs reports in a bounded process pool, away from the API's event loop and connections.
+
+    Identical requests share the job that is still waiting or running; finished
+    jobs are kept for ``ttl`` seconds. Jobs run in the API worker that accepted
+    them; with a shared ``store`` (Redis) their state and results are also
+    published there when queued and when finished, so any worker can answer
+    a poll.
+    """
+
+    def __init__(self, workers: int, max_pending: int, ttl: float, store=None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.store = store
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers open their own connections instead of inheriting the API's pool
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _expire(self):
+        now = _now()
+        for job_id in [i for i, job in self._jobs.items() if job.expires_at and job.expires_at < now]:
+            del self._jobs[job_id]
+
+    def _publish(self, job: Job, ttl: float):
+        if self.store is None:
+            return
+        try:
+            self.store.set(f"report:{job.id}", json.dumps(jsonable_encoder(job.to_dict())), px=int(ttl * 1000))
+        except Exception:
+            # Polls to this worker still find the job
+            logger.warning("Could not share report job %s", job.id, exc_info=True)
+
+    def _finished(self, job: Job):
+        with self._lock:
+            job.finished_at = _now()
+            job.expires_at = job.finished_at + timedelta(seconds=self.ttl)
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+        self._publish(job, self.ttl)
+
+    def submit(self, report: str, params: dict) -> Job:
+        """Queue a report, or return the identical one already waiting or running"""
+        key = hashlib.sha1(json.dumps([report, params], sort_keys=True, default=str).encode()).hexdigest()
+        with self._lock:
+            self._expire()
+            job = self._in_flight.get(key)
+            if job is not None:
+                return job
+            if len(self._in_flight) >= self.max_pending:
+                raise QueueFull()
+            try:
+                future = self._executor().submit(run_report, report, params)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start a fresh pool
+                self._pool = None
+                future = self._executor().submit(run_report, report, params)
+            job = Job(key, report, future)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+        self._publish(job, PENDING_RECORD_TTL)
+        future.add_done_callback(lambda _: self._finished(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def lookup(self, job_id: str) -> Optional[dict]:
+        """A job's state as returned to clients, from this worker or the shared store"""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is None:
+            return None
+        raw = self.store.get(f"report:{job_id}")
+        return None if raw is None else json.loads(raw)
+
+    def counts(self) -> dict:
+        with self._lock:
+            self._expire()
+            jobs = list(self._jobs.values())
+        return {status: sum(1 for job in jobs if job.status == status) for status in STATUSES}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _build_store():
+    if settings.CACHE_URL:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_URL requires the redis package (pip install '.[redis]')")
+        return redis.from_url(settings.CACHE_URL)
+    return None
+
+
+report_jobs = ReportJobs(
+    settings.REPORT_WORKERS, settings.REPORT_MAX_PENDING, settings.REPORT_RESULT_TTL, _build_store()
+)
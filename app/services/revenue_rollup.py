@@ -0,0 +1,293 @@
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.models import SaleDailyRollup
+from app.services.sales_archive import bounds_statement, union_sales
+
+# Rollup key for sales whose product has been deleted
+ORPHAN_PRODUCT_ID = 0
+
+DailyTotal = namedtuple("DailyTotal", "sale_day revenue order_count quantity")
+ProductTotal = namedtuple("ProductTotal", "revenue order_count quantity")
+
+
+def _rollup_product_id(product_id: Optional[int]) -> int:
+    return ORPHAN_PRODUCT_ID if product_id is None else product_id
+
+
+async def _upsert(db: AsyncSession, product_id: int, sale_day: date, revenue: float, order_count: int, quantity: int):
+    """Add the given deltas to a rollup row, creating it if needed"""
+    values = dict(
+        product_id=_rollup_product_id(product_id),
+        sale_day=sale_day,
+        revenue=revenue,
+        order_count=order_count,
+        quantity=quantity,
+    )
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(SaleDailyRollup).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            revenue=SaleDailyRollup.revenue + stmt.inserted.revenue,
+            order_count=SaleDailyRollup.order_count + stmt.inserted.order_count,
+            quantity=SaleDailyRollup.quantity + stmt.inserted.quantity,
+            updated_at=func.now(),
+        )
+        await db.execute(stmt)
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(SaleDailyRollup).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SaleDailyRollup.product_id, SaleDailyRollup.sale_day],
+            set_={
+                "revenue": SaleDailyRollup.revenue + stmt.excluded.revenue,
+                "order_count": SaleDailyRollup.order_count + stmt.excluded.order_count,
+                "quantity": SaleDailyRollup.quantity + stmt.excluded.quantity,
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+        return
+
+    # Generic fallback for backends without a native upsert
+    result = await db.execute(
+        update(SaleDailyRollup)
+        .where(SaleDailyRollup.product_id == values["product_id"], SaleDailyRollup.sale_day == sale_day)
+        .values(
+            revenue=SaleDailyRollup.revenue + revenue,
+            order_count=SaleDailyRollup.order_count + order_count,
+            quantity=SaleDailyRollup.quantity + quantity,
+        )
+    )
+    if result.rowcount == 0:
+        await db.execute(insert(SaleDailyRollup).values(**values))
+
+
+async def record_sale(db: AsyncSession, product_id: int, sale_date: datetime, quantity: int, total_amount: float):
+    """Add a sale to the rollup. Runs in the caller's transaction."""
+    await _upsert(db, product_id, sale_date.date(), total_amount, 1, quantity)
+
+
+async def record_sales(db: AsyncSession, rows):
+    """Add many sales to the rollup with one upsert per (product, day)"""
+    totals = {}
+    for row in rows:
+        key = (row["product_id"], row["sale_date"].date())
+        revenue, order_count, quantity = totals.get(key, (0.0, 0, 0))
+        totals[key] = (revenue + row["total_amount"], order_count + 1, quantity + row["quantity"])
+    for (product_id, sale_day), (revenue, order_count, quantity) in totals.items():
+        await _upsert(db, product_id, sale_day, revenue, order_count, quantity)
+
+
+async def remove_sale(db: AsyncSession, product_id: int, sale_date: datetime, quantity: int, total_amount: float):
+    """Subtract a sale from the rollup. Runs in the caller's transaction."""
+    sale_day = sale_date.date()
+    await _upsert(db, product_id, sale_day, -total_amount, -1, -quantity)
+    # Drop rows that no longer represent any sale so empty days are not reported
+    await db.execute(
+        delete(SaleDailyRollup).where(
+            SaleDailyRollup.product_id == _rollup_product_id(product_id),
+            SaleDailyRollup.sale_day == sale_day,
+            SaleDailyRollup.order_count <= 0,
+        )
+    )
+
+
+async def orphan_product(db: AsyncSession, product_id: int):
+    """Move a deleted product's rows under ORPHAN_PRODUCT_ID, where rebuild_rollup
+    files its sales once their product_id is NULL. Runs in the caller's transaction."""
+    rows = (await db.execute(
+        select(SaleDailyRollup.sale_day, SaleDailyRollup.revenue, SaleDailyRollup.order_count, SaleDailyRollup.quantity)
+        .where(SaleDailyRollup.product_id == product_id)
+    )).all()
+    await db.execute(delete(SaleDailyRollup).where(SaleDailyRollup.product_id == product_id))
+    for row in rows:
+        await _upsert(db, None, row.sale_day, row.revenue, row.order_count, row.quantity)
+
+
+def rebuild_rollup(
+    db: Session,
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+    batch_days: int = 31
+) -> int:
+    """Recompute rollup rows from the sales and sales_archive tables for an inclusive day range.
+
+    The range is processed in windows of ``batch_days`` with one commit per
+    window so a full backfill does not hold a single huge transaction.
+    Returns the number of rollup rows written.
+    """
+    if start_day is None or end_day is None:
+        bounds = db.execute(bounds_statement()).one()
+        if bounds[0] is None:
+            return 0
+        start_day = start_day or bounds[0].date()
+        end_day = end_day or bounds[1].date()
+
+    written = 0
+    window_start = start_day
+    while window_start <= end_day:
+        window_end = min(window_start + timedelta(days=batch_days - 1), end_day)
+
+        db.execute(
+            delete(SaleDailyRollup).where(
+                SaleDailyRollup.sale_day >= window_start,
+                SaleDailyRollup.sale_day <= window_end,
+            )
+        )
+        window = union_sales(
+            lambda table: select(table.id, table.product_id, table.quantity, table.total_amount, table.sale_date).where(
+                table.sale_date >= datetime.combine(window_start, time.min),
+                table.sale_date < datetime.combine(window_end + timedelta(days=1), time.min),
+            )
+        ).subquery()
+        sale_day = func.date(window.c.sale_date)
+        product_id = func.coalesce(window.c.product_id, ORPHAN_PRODUCT_ID)
+        source = (
+            select(
+                product_id,
+                sale_day,
+                func.sum(window.c.total_amount),
+                func.count(window.c.id),
+                func.sum(window.c.quantity),
+            )
+            .group_by(product_id, sale_day)
+        )
+        result = db.execute(
+            insert(SaleDailyRollup).from_select(
+                ["product_id", "sale_day", "revenue", "order_count", "quantity"],
+                source,
+            )
+        )
+        db.commit()
+        written += max(result.rowcount or 0, 0)
+        window_start = window_end + timedelta(days=1)
+
+    return written
+
+
+def split_period(start: Optional[datetime], end: Optional[datetime]):
+    """Whole UTC days of an inclusive period, for the rollup, and the partial-day
+    ranges left over as (low, high, high inclusive) for the sales rows. A
+    missing bound leaves the days open on that side."""
+    first = last = None
+    if start is not None:
+        first = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+    if end is not None:
+        last = end.date() if end.time() == time.max else end.date() - timedelta(days=1)
+    if first is not None and last is not None and first > last:
+        return None, [(start, end, True)]
+    ranges = []
+    if start is not None and start < datetime.combine(first, time.min):
+        ranges.append((start, datetime.combine(first, time.min), False))
+    if end is not None and end >= datetime.combine(last + timedelta(days=1), time.min):
+        ranges.append((datetime.combine(last + timedelta(days=1), time.min), end, True))
+    return (first, last), ranges
+
+
+def in_ranges(column, ranges):
+    return or_(*(
+        and_(column >= low, column <= high if inclusive else column < high)
+        for low, high, inclusive in ranges
+    ))
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    # Same wall-clock reading as the rollup days
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+def _as_date(value) -> date:
+    # DATE() comes back as a string on SQLite
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+async def _partial_day_totals(db: AsyncSession, ranges, product_id: Optional[int] = None) -> Dict[date, DailyTotal]:
+    """Per-day totals of the hot and archived sales inside ``ranges``"""
+    if not ranges:
+        return {}
+
+    def partial_days(table):
+        stmt = select(table.id, table.quantity, table.total_amount, table.sale_date).where(
+            in_ranges(table.sale_date, ranges)
+        )
+        if product_id:
+            stmt = stmt.where(table.product_id == product_id)
+        return stmt
+
+    sales = union_sales(partial_days).subquery()
+    sale_day = func.date(sales.c.sale_date)
+    stmt = select(
+        sale_day,
+        func.sum(sales.c.total_amount),
+        func.count(sales.c.id),
+        func.sum(sales.c.quantity),
+    ).group_by(sale_day)
+    totals = {}
+    for day, revenue, order_count, quantity in (await db.execute(stmt)).all():
+        totals[_as_date(day)] = DailyTotal(_as_date(day), float(revenue or 0), int(order_count), int(quantity or 0))
+    return totals
+
+
+async def daily_totals(
+    db: AsyncSession,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    product_id: Optional[int] = None
+) -> List[DailyTotal]:
+    """Return (sale_day, revenue, order_count, quantity) rows summed over products.
+
+    Whole days between the bounds are read from the rollup; when a bound
+    falls inside a day, that day is summed from the sales rows it covers.
+    """
+    days, ranges = split_period(_naive(start_date), _naive(end_date))
+    totals = {}
+    if days:
+        stmt = select(
+            SaleDailyRollup.sale_day,
+            func.sum(SaleDailyRollup.revenue).label("revenue"),
+            func.sum(SaleDailyRollup.order_count).label("order_count"),
+            func.sum(SaleDailyRollup.quantity).label("quantity"),
+        )
+        if days[0]:
+            stmt = stmt.where(SaleDailyRollup.sale_day >= days[0])
+        if days[1]:
+            stmt = stmt.where(SaleDailyRollup.sale_day <= days[1])
+        if product_id:
+            stmt = stmt.where(SaleDailyRollup.product_id == product_id)
+        stmt = stmt.group_by(SaleDailyRollup.sale_day)
+        for row in (await db.execute(stmt)).all():
+            totals[row.sale_day] = DailyTotal(row.sale_day, float(row.revenue), int(row.order_count), int(row.quantity))
+    totals.update(await _partial_day_totals(db, ranges, product_id))
+    return [totals[day] for day in sorted(totals)]
+
+
+async def product_totals(db: AsyncSession, product_id: int, start_date: datetime, end_date: datetime) -> ProductTotal:
+    """Return summed revenue, order_count and quantity for one product, with the
+    same day split as daily_totals"""
+    days = await daily_totals(db, start_date, end_date, product_id)
+    return ProductTotal(
+        sum(day.revenue for day in days),
+        sum(day.order_count for day in days),
+        sum(day.quantity for day in days),
+    )
+
+
+def mysql_week(day: date) -> int:
+    """Week number matching MySQL's WEEK(day, 1) (Monday start, 0-53)"""
+    iso_year, iso_week, _ = day.isocalendar()
+    if iso_year < day.year:
+        return 0
+    if iso_year > day.year:
+        return 53
+    return iso_week
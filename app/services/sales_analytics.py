@@ -0,0 +1,226 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Product, SaleDailyRollup
+from app.services.revenue_rollup import ORPHAN_PRODUCT_ID, in_ranges, split_period
+from app.services.sales_archive import union_sales
+
+
+async def period_totals(
+    db: AsyncSession,
+    periods: Sequence[Tuple[datetime, datetime]],
+    product_id: Optional[int] = None
+) -> List[dict]:
+    """Revenue, order count and quantity for each (start, end) period in two queries.
+
+    The whole days of every period are summed from the daily rollup, which
+    also covers archived sales; only the partial days at the ends are read
+    from the hot and archive sales tables. Each query holds a set of
+    conditional aggregates per period over the union of the period ranges, so
+    N periods cost one pass instead of N. Bounds are inclusive and periods may
+    overlap.
+    """
+    # Same wall-clock reading as the rollup days
+    splits = [split_period(start.replace(tzinfo=None), end.replace(tzinfo=None)) for start, end in periods]
+    sums = {f"{name}_{index}": 0 for index in range(len(periods)) for name in ("revenue", "orders", "quantity")}
+
+    day_columns = []
+    for index, (days, _) in enumerate(splits):
+        if days:
+            in_days = and_(SaleDailyRollup.sale_day >= days[0], SaleDailyRollup.sale_day <= days[1])
+            day_columns += [
+                func.sum(case((in_days, SaleDailyRollup.revenue), else_=0)).label(f"revenue_{index}"),
+                func.sum(case((in_days, SaleDailyRollup.order_count), else_=0)).label(f"orders_{index}"),
+                func.sum(case((in_days, SaleDailyRollup.quantity), else_=0)).label(f"quantity_{index}"),
+            ]
+    if day_columns:
+        stmt = select(*day_columns).where(or_(*(
+            and_(SaleDailyRollup.sale_day >= days[0], SaleDailyRollup.sale_day <= days[1])
+            for days, _ in splits if days
+        )))
+        if product_id:
+            stmt = stmt.where(SaleDailyRollup.product_id == product_id)
+        for key, value in (await db.execute(stmt)).one()._mapping.items():
+            sums[key] += value or 0
+
+    all_ranges = [r for _, ranges in splits for r in ranges]
+    if all_ranges:
+        def partial_days(table):
+            stmt = select(table.id, table.quantity, table.total_amount, table.sale_date).where(
+                in_ranges(table.sale_date, all_ranges)
+            )
+            if product_id:
+                stmt = stmt.where(table.product_id == product_id)
+            return stmt
+
+        sales = union_sales(partial_days).subquery()
+        row_columns = []
+        for index, (_, ranges) in enumerate(splits):
+            if ranges:
+                in_period = in_ranges(sales.c.sale_date, ranges)
+                row_columns += [
+                    func.sum(case((in_period, sales.c.total_amount), else_=0)).label(f"revenue_{index}"),
+                    func.count(case((in_period, sales.c.id))).label(f"orders_{index}"),
+                    func.sum(case((in_period, sales.c.quantity), else_=0)).label(f"quantity_{index}"),
+                ]
+        for key, value in (await db.execute(select(*row_columns))).one()._mapping.items():
+            sums[key] += value or 0
+
+    totals = []
+    for index, (start, end) in enumerate(periods):
+        revenue = float(sums[f"revenue_{index}"])
+        order_count = int(sums[f"orders_{index}"])
+        totals.append({
+            "start": start,
+            "end": end,
+            "revenue": revenue,
+            "order_count": order_count,
+            "quantity": int(sums[f"quantity_{index}"]),
+            "average_order_value": revenue / order_count if order_count else 0.0,
+        })
+    return totals
+
+
+def percentage_change(before: float, after: float) -> float:
+    """Change from ``before`` to ``after`` as a percentage, 100 when starting from zero"""
+    if before == 0:
+        return 100 if after > 0 else 0
+    return ((after - before) / before) * 100
+
+
+async def _daily_product_frame(db: AsyncSession, start_day: date, end_day: date, product_id: Optional[int] = None):
+    """Per-product daily rollup rows in [start_day, end_day] as a DataFrame"""
+    import pandas as pd
+
+    stmt = select(
+        SaleDailyRollup.product_id,
+        SaleDailyRollup.sale_day,
+        SaleDailyRollup.revenue,
+        SaleDailyRollup.order_count,
+        SaleDailyRollup.quantity,
+    ).where(
+        SaleDailyRollup.sale_day >= start_day,
+        SaleDailyRollup.sale_day <= end_day,
+        SaleDailyRollup.product_id != ORPHAN_PRODUCT_ID,
+    )
+    if product_id:
+        stmt = stmt.where(SaleDailyRollup.product_id == product_id)
+    rows = (await db.execute(stmt)).all()
+    frame = pd.DataFrame(rows, columns=["product_id", "sale_day", "revenue", "order_count", "quantity"])
+    frame["sale_day"] = pd.to_datetime(frame["sale_day"])
+    return frame
+
+
+async def _product_names(db: AsyncSession, product_ids) -> Dict[int, str]:
+    if not len(product_ids):
+        return {}
+    rows = await db.execute(select(Product.id, Product.name).where(Product.id.in_([int(i) for i in product_ids])))
+    return dict(rows.all())
+
+
+def _growth(current, previous):
+    """Vectorized percentage change; None where there is no previous value"""
+    import numpy as np
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (current - previous) / previous * 100
+    return [None if not np.isfinite(g) else float(g) for g in growth]
+
+
+async def top_products(db: AsyncSession, start_day: date, end_day: date, metric: str, limit: int) -> List[dict]:
+    """Rank products by revenue or units over a day range.
+
+    Growth compares each product with the window of equal length that ends
+    the day before ``start_day``; both windows come from one rollup query.
+    """
+    import pandas as pd
+
+    length = (end_day - start_day).days + 1
+    previous_start = start_day - timedelta(days=length)
+    frame = await _daily_product_frame(db, previous_start, end_day)
+    if frame.empty:
+        return []
+
+    current = frame[frame["sale_day"] >= pd.Timestamp(start_day)]
+    previous = frame[frame["sale_day"] < pd.Timestamp(start_day)]
+    totals = current.groupby("product_id")[["revenue", "quantity", "order_count"]].sum()
+    if totals.empty:
+        return []
+    column = "revenue" if metric == "revenue" else "quantity"
+    prior = previous.groupby("product_id")[column].sum().reindex(totals.index, fill_value=0)
+
+    totals["share"] = totals[column] / totals[column].sum() * 100
+    totals["previous"] = prior
+    # Ties broken by product id so pages are stable
+    leaders = totals.reset_index().sort_values([column, "product_id"], ascending=[False, True]).head(limit)
+    growth = _growth(leaders[column].to_numpy(float), leaders["previous"].to_numpy(float))
+    names = await _product_names(db, leaders["product_id"].tolist())
+
+    return [
+        {
+            "rank": rank,
+            "product_id": int(row.product_id),
+            "product_name": names.get(int(row.product_id)),
+            "revenue": float(row.revenue),
+            "units": int(row.quantity),
+            "order_count": int(row.order_count),
+            "share": float(row.share),
+            "growth": growth[rank - 1],
+        }
+        for rank, row in enumerate(leaders.itertuples(index=False), start=1)
+    ]
+
+
+async def velocity(
+    db: AsyncSession,
+    start_day: date,
+    end_day: date,
+    window: int,
+    limit: int,
+    product_id: Optional[int] = None,
+    include_daily: bool = False
+) -> List[dict]:
+    """Units sold per day for the fastest-moving products over a day range.
+
+    Days without sales count as zero. ``moving_average`` is the trailing
+    ``window``-day mean on the last day and ``growth`` compares it with the
+    window before.
+    """
+    import pandas as pd
+
+    frame = await _daily_product_frame(db, start_day, end_day, product_id)
+    if frame.empty:
+        return []
+
+    units = frame.groupby("product_id")["quantity"].sum()
+    leaders = units.sort_values(ascending=False, kind="stable").head(limit).index
+    days = pd.date_range(start_day, end_day, freq="D")
+    # Dense days x products matrix, only for the products being returned
+    matrix = (
+        frame[frame["product_id"].isin(leaders)]
+        .pivot_table(index="sale_day", columns="product_id", values="quantity", aggfunc="sum", fill_value=0)
+        .reindex(index=days, columns=leaders, fill_value=0)
+    )
+    moving = matrix.rolling(window, min_periods=1).mean()
+    latest = moving.iloc[-1].to_numpy(float)
+    before = moving.iloc[-1 - window].to_numpy(float) if len(days) > window else [float("nan")] * len(leaders)
+    growth = _growth(latest, pd.Series(before).to_numpy(float))
+    names = await _product_names(db, leaders.tolist())
+
+    results = []
+    for position, product in enumerate(leaders):
+        entry = {
+            "product_id": int(product),
+            "product_name": names.get(int(product)),
+            "total_units": int(units[product]),
+            "units_per_day": float(units[product] / len(days)),
+            "moving_average": float(latest[position]),
+            "growth": growth[position],
+        }
+        if include_daily:
+            entry["daily"] = [
+                {"day": day.date(), "units": int(value), "moving_average": float(avg)}
+                for day, value, avg in zip(days, matrix[product].to_numpy(), moving[product].to_numpy())
+            ]
+        results.append(entry)
+    return results
@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.models import Sale, SaleArchive
+
+# Hot and archived sales share their columns; readers covering all of history
+# select from both
+SALE_TABLES = (Sale, SaleArchive)
+
+ARCHIVE_COLUMNS = ["id", "product_id", "quantity", "total_amount", "sale_date", "created_at", "updated_at"]
+
+
+def union_sales(build):
+    """UNION ALL of ``build(table)`` over the hot and archive tables.
+
+    ``build`` should filter on the table it is given, so each branch keeps
+    its own index range scan instead of filtering the union afterwards.
+    """
+    return union_all(*(build(table) for table in SALE_TABLES))
+
+
+def bounds_statement(product_id: Optional[int] = None):
+    """First and last sale_date over both tables, each read from the ends of a sale_date index"""
+    def ends(table):
+        stmt = select(func.min(table.sale_date).label("first"), func.max(table.sale_date).label("last"))
+        if product_id:
+            stmt = stmt.where(table.product_id == product_id)
+        return stmt
+
+    both = union_sales(ends).subquery()
+    return select(func.min(both.c.first), func.max(both.c.last))
+
+
+async def archived_through(db: AsyncSession) -> Optional[datetime]:
+    """sale_date of the newest archived sale, or None when nothing is archived"""
+    return (await db.execute(select(func.max(SaleArchive.sale_date)))).scalar()
+
+
+def archive_sales(db: Session, cutoff: datetime, batch_size: int = 5000) -> int:
+    """Move sales dated before ``cutoff`` to sales_archive; returns the rows moved.
+
+    Each batch of the oldest ``batch_size`` sales is copied and deleted in one
+    transaction. Their daily totals stay in the rollup untouched. The newest
+    sale by id is never moved, so SQLite cannot hand its id out again.
+    """
+    newest_id = db.execute(select(func.max(Sale.id))).scalar()
+    moved = 0
+    while True:
+        ids = db.execute(
+            select(Sale.id)
+            .where(Sale.sale_date < cutoff, Sale.id != newest_id)
+            .order_by(Sale.sale_date)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return moved
+        db.execute(
+            insert(SaleArchive).from_select(
+                ARCHIVE_COLUMNS,
+                select(*(getattr(Sale, column) for column in ARCHIVE_COLUMNS)).where(Sale.id.in_(ids)),
+            )
+        )
+        db.execute(delete(Sale).where(Sale.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import select
+from app.models.models import Sale
+
+EXPORT_COLUMNS = (
+    Sale.id,
+    Sale.product_id,
+    Sale.quantity,
+    Sale.total_amount,
+    Sale.sale_date,
+    Sale.created_at,
+    Sale.updated_at,
+)
+EXPORT_FIELDS = [c.key for c in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def export_statement(table=Sale):
+    """Plain column SELECT so rows are never materialized as ORM objects"""
+    return select(*(getattr(table, field) for field in EXPORT_FIELDS))
+
+
+async def _iter_batches(bind, stmt, batch_size):
+    """Yield lists of rows from a server-side cursor on a dedicated connection"""
+    async with bind.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions(batch_size):
+            yield partition
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def stream_csv(bind, stmt, batch_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in _iter_batches(bind, stmt, batch_size):
+        writer.writerows([_iso(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def stream_ndjson(bind, stmt, batch_size):
+    async for rows in _iter_batches(bind, stmt, batch_size):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, (_iso(v) for v in row)))) + "\n" for row in rows
+        ).encode()
+
+
+class _ParquetSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the response generator.
+
+    It keeps a running offset for ``tell()`` because the Parquet footer records
+    absolute column chunk positions even though earlier bytes were already sent.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def stream_parquet(bind, stmt, batch_size):
+    """Emit one Parquet row group per batch"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("product_id", pa.int64()),
+        ("quantity", pa.int64()),
+        ("total_amount", pa.float64()),
+        ("sale_date", pa.timestamp("us")),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+    ])
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in _iter_batches(bind, stmt, batch_size):
+            columns = list(zip(*rows))
+            writer.write_table(pa.table(
+                {name: pa.array(column, type=schema.field(name).type) for name, column in zip(EXPORT_FIELDS, columns)},
+                schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
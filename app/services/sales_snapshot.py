@@ -0,0 +1,342 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select
+from app.services.revenue_rollup import DailyTotal, ProductTotal
+from app.services.sales_archive import union_sales
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("id", "product_id", "quantity", "total_amount", "sale_date", "live")
+DTYPES = {
+    "id": np.int64,
+    "product_id": np.int64,
+    "quantity": np.int64,
+    "total_amount": np.float64,
+    "sale_date": "datetime64[us]",
+    "live": np.bool_,
+}
+MANIFEST = "manifest.json"
+
+
+def _naive(value: datetime) -> datetime:
+    # Same wall-clock reading the database comparison and the rollup use
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+def _empty():
+    return {name: np.empty(0, dtype=DTYPES[name]) for name in COLUMNS}
+
+
+def _columns(rows) -> dict:
+    """Column arrays for a batch of (id, product_id, quantity, total_amount, sale_date) rows"""
+    ids, product_ids, quantities, amounts, sale_dates = zip(*rows)
+    return {
+        "id": np.array(ids, dtype=np.int64),
+        "product_id": np.array([p or 0 for p in product_ids], dtype=np.int64),
+        "quantity": np.array(quantities, dtype=np.int64),
+        "total_amount": np.array(amounts, dtype=np.float64),
+        "sale_date": np.array([_naive(d) for d in sale_dates], dtype="datetime64[us]"),
+        "live": np.ones(len(ids), dtype=np.bool_),
+    }
+
+
+def _concatenate(parts) -> dict:
+    if not parts:
+        return _empty()
+    return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+
+class SalesSnapshot:
+    """Columnar copy of the sales table held as NumPy arrays.
+
+    Rows are ordered by id, so new sales are picked up by reading ``id >
+    max_id - overlap`` and replacing the rows from there on; a sale written
+    through this process marks the snapshot stale so the next read does that
+    at once. Rereading the last ``overlap`` ids catches sales whose
+    transaction committed after a higher id was read; one that commits later
+    still, past ``overlap`` newer ids, is missing until the next rebuild.
+    Updates and deletes made through this process are patched in place, and
+    replayed when they land while a refresh is reading; changes from other
+    processes are picked up by the periodic full rebuild, which reads into
+    new arrays and swaps them in. When ``path`` is set the arrays are saved there as ``.npy``
+    files and memory-mapped copy-on-write on startup, so a restart only has
+    to read the sales added since the last save.
+    """
+
+    def __init__(self, path: str = "", overlap: int = 1000):
+        self.path = path
+        self.overlap = overlap
+        self.ready = False
+        self.stale = False
+        self.refreshed_at = 0.0
+        self.rebuilt_at = 0.0
+        self._buffers = _empty()
+        self._rows = 0
+        self._lock = asyncio.Lock()
+        # Change logs of the refreshes currently reading
+        self._pending: List[list] = []
+
+    @property
+    def _arrays(self) -> dict:
+        return {name: buffer[:self._rows] for name, buffer in self._buffers.items()}
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    @property
+    def max_id(self) -> int:
+        return int(self._buffers["id"][self._rows - 1]) if self._rows else 0
+
+    def _append(self, part: dict):
+        """Copy rows into the buffers, doubling their capacity when full"""
+        count = len(part["id"])
+        capacity = len(self._buffers["id"])
+        if self._rows + count > capacity:
+            capacity = max(capacity * 2, self._rows + count, 1024)
+            grown = {}
+            for name in COLUMNS:
+                grown[name] = np.empty(capacity, dtype=DTYPES[name])
+                grown[name][:self._rows] = self._buffers[name][:self._rows]
+            self._buffers = grown
+        for name in COLUMNS:
+            self._buffers[name][self._rows:self._rows + count] = part[name]
+        self._rows += count
+
+    def load(self) -> bool:
+        """Map a previously saved snapshot, if there is a consistent one"""
+        manifest = os.path.join(self.path, MANIFEST) if self.path else None
+        if not manifest or not os.path.exists(manifest):
+            return False
+        with open(manifest) as f:
+            meta = json.load(f)
+        buffers = {}
+        for name in COLUMNS:
+            array = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="c")
+            if len(array) < meta["rows"]:
+                logger.warning("Sales snapshot at %s is incomplete, rebuilding", self.path)
+                return False
+            buffers[name] = array
+        self._buffers, self._rows = buffers, meta["rows"]
+        self.rebuilt_at = meta["rebuilt_at"]
+        return True
+
+    def save(self):
+        if not self.path or not self.ready:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        arrays = self._arrays
+        for name in COLUMNS:
+            target = os.path.join(self.path, f"{name}.npy")
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, arrays[name])
+            os.replace(target + ".tmp", target)
+        # Written last: readers never trust more rows than every array holds
+        with open(os.path.join(self.path, MANIFEST + ".tmp"), "w") as f:
+            json.dump({"rows": len(arrays["id"]), "rebuilt_at": self.rebuilt_at}, f)
+        os.replace(os.path.join(self.path, MANIFEST + ".tmp"), os.path.join(self.path, MANIFEST))
+
+    async def _fetch(self, engine, after_id: int, batch_size: int):
+        """Column arrays for hot and archived sales with id > after_id, read in server-side batches"""
+        stmt = union_sales(
+            lambda table: select(table.id, table.product_id, table.quantity, table.total_amount, table.sale_date)
+            .where(table.id > after_id)
+        )
+        stmt = stmt.order_by(stmt.selected_columns.id).execution_options(yield_per=batch_size)
+        parts = []
+        async with engine.connect() as conn:
+            result = await conn.stream(stmt)
+            async for rows in result.partitions(batch_size):
+                parts.append(await asyncio.to_thread(_columns, rows))
+        return parts
+
+    @contextmanager
+    def _recording(self):
+        """Collect the updates and deletes applied while a refresh reads, to replay onto its rows"""
+        changes = []
+        self._pending.append(changes)
+        try:
+            yield changes
+        finally:
+            self._pending = [log for log in self._pending if log is not changes]
+
+    def _replay(self, changes):
+        # Replaying records the changes again; only the ones seen so far are applied
+        for action, args in list(changes):
+            getattr(self, action)(*args)
+
+    async def refresh(self, engine, batch_size: int = 50000, rebuild: bool = False) -> int:
+        """Read new sales and the last ``overlap`` ids again, or everything when ``rebuild``; returns rows read"""
+        if rebuild:
+            return await self._rebuild(engine, batch_size)
+        async with self._lock:
+            self.stale = False
+            with self._recording() as changes:
+                try:
+                    after_id = max(self.max_id - self.overlap, 0)
+                    parts = await self._fetch(engine, after_id, batch_size)
+                    # The reread rows replace the copies held, deduplicating on id
+                    ids = self._buffers["id"][:self._rows]
+                    self._rows = int(np.searchsorted(ids, after_id, side="right"))
+                    for part in parts:
+                        self._append(part)
+                    self._replay(changes)
+                except BaseException:
+                    self.stale = True
+                    raise
+            self.refreshed_at = time.monotonic()
+            self.ready = True
+            return sum(len(p["id"]) for p in parts)
+
+    async def _rebuild(self, engine, batch_size: int) -> int:
+        """Read every sale into new arrays and swap them in.
+
+        The read and the copy run without the lock, so requests keep answering
+        from the current arrays until the swap.
+        """
+        with self._recording() as changes:
+            started = time.time()
+            parts = await self._fetch(engine, 0, batch_size)
+            buffers = await asyncio.to_thread(_concatenate, parts)
+            async with self._lock:
+                # An append since the read may hold newer rows; the next catch_up reads them again
+                if self.max_id > (int(buffers["id"][-1]) if len(buffers["id"]) else 0):
+                    self.stale = True
+                self._buffers, self._rows = buffers, len(buffers["id"])
+                self._replay(changes)
+                self.rebuilt_at = started
+                self.refreshed_at = time.monotonic()
+                self.ready = True
+        await asyncio.to_thread(self.save)
+        return self._rows
+
+    def mark_stale(self):
+        """Make the next catch_up read new sales, e.g. after this process wrote some"""
+        self.stale = True
+
+    async def catch_up(self, engine, max_age: float):
+        """Read new sales if marked stale or the last refresh is older than ``max_age`` seconds.
+
+        Returns at once while another refresh holds the lock, leaving the
+        current arrays to answer rather than queueing every request behind it.
+        """
+        if self._lock.locked():
+            return
+        if self.stale or time.monotonic() - self.refreshed_at >= max_age:
+            await self.refresh(engine)
+
+    async def maintain(self, engine, refresh_seconds: float, rebuild_seconds: float):
+        """Load or build the snapshot, then keep it fresh until cancelled"""
+        await asyncio.to_thread(self.load)
+        while True:
+            try:
+                await self.refresh(engine, rebuild=time.time() - self.rebuilt_at >= rebuild_seconds)
+            except Exception:
+                logger.exception("Sales snapshot refresh failed")
+            await asyncio.sleep(refresh_seconds)
+
+    def _position(self, sale_id: int) -> Optional[int]:
+        ids = self._buffers["id"][:self._rows]
+        position = int(np.searchsorted(ids, sale_id))
+        return position if position < len(ids) and ids[position] == sale_id else None
+
+    def _record(self, action: str, *args):
+        # Changes seen while a refresh is reading are replayed onto the rows it loads
+        for changes in self._pending:
+            changes.append((action, args))
+
+    def apply_update(self, sale_id: int, product_id: Optional[int], quantity: int, total_amount: float, sale_date: datetime):
+        self._record("apply_update", sale_id, product_id, quantity, total_amount, sale_date)
+        position = self._position(sale_id)
+        if position is None:
+            return
+        self._buffers["product_id"][position] = product_id or 0
+        self._buffers["quantity"][position] = quantity
+        self._buffers["total_amount"][position] = total_amount
+        self._buffers["sale_date"][position] = np.datetime64(_naive(sale_date), "us")
+
+    def apply_delete(self, sale_id: int):
+        self._record("apply_delete", sale_id)
+        position = self._position(sale_id)
+        if position is not None:
+            self._buffers["live"][position] = False
+
+    @staticmethod
+    def _mask(a: dict, start: Optional[datetime], end: Optional[datetime], product_id: Optional[int]):
+        """Live rows in range, with exact timestamp bounds"""
+        mask = a["live"].copy()
+        if start:
+            mask &= a["sale_date"] >= np.datetime64(_naive(start), "us")
+        if end:
+            mask &= a["sale_date"] <= np.datetime64(_naive(end), "us")
+        if product_id:
+            mask &= a["product_id"] == product_id
+        return mask
+
+    def daily_totals(self, start_date=None, end_date=None, product_id=None) -> List[DailyTotal]:
+        """Same rows as revenue_rollup.daily_totals, grouped with bincount"""
+        a = self._arrays
+        mask = self._mask(a, start_date, end_date, product_id)
+        if not mask.any():
+            return []
+        days = a["sale_date"][mask].astype("datetime64[D]")
+        unique_days, group = np.unique(days, return_inverse=True)
+        revenue = np.bincount(group, weights=a["total_amount"][mask])
+        orders = np.bincount(group)
+        quantity = np.bincount(group, weights=a["quantity"][mask])
+        return [
+            DailyTotal(day, float(r), int(o), int(q))
+            for day, r, o, q in zip(unique_days.astype(date), revenue, orders, quantity)
+        ]
+
+    def product_totals(self, product_id: int, start_date: datetime, end_date: datetime) -> ProductTotal:
+        a = self._arrays
+        mask = self._mask(a, start_date, end_date, product_id)
+        return ProductTotal(
+            float(a["total_amount"][mask].sum()),
+            int(mask.sum()),
+            int(a["quantity"][mask].sum()),
+        )
+
+    def period_totals(self, periods: Sequence[Tuple[datetime, datetime]], product_id: Optional[int] = None) -> List[dict]:
+        """Same result as sales_analytics.period_totals, with exact timestamp bounds"""
+        a = self._arrays
+        totals = []
+        for start, end in periods:
+            mask = self._mask(a, start, end, product_id)
+            revenue = float(a["total_amount"][mask].sum())
+            order_count = int(mask.sum())
+            totals.append({
+                "start": start,
+                "end": end,
+                "revenue": revenue,
+                "order_count": order_count,
+                "quantity": int(a["quantity"][mask].sum()),
+                "average_order_value": revenue / order_count if order_count else 0.0,
+            })
+        return totals
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "rows": self.rows,
+            "max_id": self.max_id,
+            "stale": self.stale,
+            "path": self.path or None,
+            "seconds_since_refresh": round(time.monotonic() - self.refreshed_at, 1) if self.ready else None,
+        }
+
+
+def _build_snapshot():
+    from app.core.config import settings
+    return SalesSnapshot(settings.SALES_SNAPSHOT_PATH, settings.SALES_SNAPSHOT_OVERLAP_IDS)
+
+
+sales_snapshot = _build_snapshot()
@@ -0,0 +1,34 @@
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Inventory
+from app.services.inventory_events import record_event
+
+
+async def decrement_stock(db: AsyncSession, product_id: int, quantity: int):
+    """Take ``quantity`` units of a product's stock. Runs in the caller's transaction.
+
+    The decrement is a single conditional UPDATE, so concurrent sales of the
+    same product serialize on the row inside the database and can never take
+    the quantity below zero; no row is read or locked beforehand. Returns the
+    inventory row in its new state, or raises 409 when stock is insufficient.
+    """
+    result = await db.execute(
+        update(Inventory)
+        .where(Inventory.product_id == product_id, Inventory.quantity >= quantity)
+        .values(quantity=Inventory.quantity - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        exists = await db.scalar(select(Inventory.id).where(Inventory.product_id == product_id))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Inventory not found for this product")
+        raise HTTPException(status_code=409, detail="Insufficient stock")
+
+    # Our own UPDATE holds the row lock, so this read sees exactly the new state
+    inventory = (await db.execute(
+        select(Inventory.id, Inventory.product_id, Inventory.quantity, Inventory.low_stock_threshold)
+        .where(Inventory.product_id == product_id)
+    )).one()
+    record_event(db, inventory, -quantity, "sale")
+    return inventory
@@ -0,0 +1,242 @@
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import case, func, literal, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.sales_archive import bounds_statement, union_sales
+
+GRANULARITIES = ("hour", "day", "week", "month", "year")
+
+# Bucket keys are rendered as 'YYYY-MM-DD HH:MM:SS' text; these formats read
+# the same to SQLite's strftime and MySQL's DATE_FORMAT
+KEY_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+    "week": "%Y-%m-%d 00:00:00",
+    "month": "%Y-%m-01 00:00:00",
+    "year": "%Y-01-01 00:00:00",
+}
+
+Bucket = namedtuple("Bucket", "start revenue order_count quantity")
+
+# Upper bound on buckets per query, for the routes and report jobs alike
+MAX_BUCKETS = 10000
+
+
+def get_zone(name: Optional[str]) -> ZoneInfo:
+    """ZoneInfo for an IANA name (UTC when empty); ValueError when unknown"""
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def aware(value: datetime, zone: ZoneInfo) -> datetime:
+    """``value`` with naive inputs read as wall time in ``zone``"""
+    return value.replace(tzinfo=zone) if value.tzinfo is None else value
+
+
+def _to_utc(value: datetime, zone: ZoneInfo) -> datetime:
+    """Naive UTC, as sale_date is stored; naive inputs are read as wall time in ``zone``"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=zone)
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _to_local(value: datetime, zone: ZoneInfo) -> datetime:
+    """Naive wall time in ``zone``; naive inputs are already wall time there"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(zone).replace(tzinfo=None)
+
+
+def floor(local: datetime, granularity: str) -> datetime:
+    """Start of the bucket holding a naive wall time (weeks start on Monday)"""
+    if granularity == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def next_start(start: datetime, granularity: str) -> datetime:
+    """Start of the bucket after the one starting at ``start``"""
+    if granularity == "hour":
+        return start + timedelta(hours=1)
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return start.replace(year=start.year + 1)
+
+
+def bucket_count(granularity: str, first: datetime, last: datetime) -> int:
+    """Number of buckets from the one starting at ``first`` to the one starting at ``last``"""
+    if granularity == "month":
+        count = (last.year - first.year) * 12 + last.month - first.month + 1
+    elif granularity == "year":
+        count = last.year - first.year + 1
+    else:
+        width = timedelta(hours=1) if granularity == "hour" else timedelta(days=7 if granularity == "week" else 1)
+        count = (last - first) // width + 1
+    return max(count, 0)
+
+
+def bucket_range(granularity: str, zone: ZoneInfo, start: datetime, end: datetime) -> Tuple[datetime, datetime, int]:
+    """UTC [start, end) covering whole buckets from the one holding ``start`` to the one holding ``end``,
+    plus the number of buckets. ValueError when those buckets fall outside the datetime range."""
+    try:
+        first = floor(_to_local(start, zone), granularity)
+        last = floor(_to_local(end, zone), granularity)
+        return _to_utc(first, zone), _to_utc(next_start(last, granularity), zone), bucket_count(granularity, first, last)
+    except (OverflowError, ValueError):
+        raise ValueError("Date range is outside the supported dates (years 1 to 9999)")
+
+
+def check_bucket_count(granularity: str, zone: ZoneInfo, start: datetime, end: datetime):
+    """ValueError unless ``start`` to ``end`` spans at most MAX_BUCKETS buckets inside the datetime range"""
+    _, _, count = bucket_range(granularity, zone, start, end)
+    if count > MAX_BUCKETS:
+        raise ValueError(f"{count} {granularity} buckets requested, at most {MAX_BUCKETS} allowed")
+
+
+def _offset(zone: ZoneInfo, utc: datetime) -> int:
+    return int(utc.replace(tzinfo=timezone.utc).astimezone(zone).utcoffset().total_seconds())
+
+
+def offset_segments(zone: ZoneInfo, start: datetime, end: datetime) -> List[Tuple[Optional[datetime], int]]:
+    """UTC offsets of ``zone`` over naive UTC [start, end) as (applies from, seconds) pairs.
+
+    The first pair applies from ``start``. Transitions are found by checking
+    the offset once a day and bisecting the day it changes in.
+    """
+    segments = [(None, _offset(zone, start))]
+    day = start
+    while day < end:
+        following = min(day + timedelta(days=1), end)
+        if _offset(zone, following) != segments[-1][1]:
+            low, high = day, following
+            while high - low > timedelta(microseconds=1):
+                middle = low + (high - low) / 2
+                if _offset(zone, middle) == segments[-1][1]:
+                    low = middle
+                else:
+                    high = middle
+            segments.append((high, _offset(zone, high)))
+        day = following
+    return segments
+
+
+def _offset_expression(column, segments):
+    """UTC offset in seconds that applies to each row, as a constant or a CASE over the transitions"""
+    if len(segments) == 1:
+        return literal(segments[0][1])
+    whens = [(column < applies_from, offset) for (_, offset), (applies_from, _) in zip(segments, segments[1:])]
+    return case(*whens, else_=segments[-1][1])
+
+
+def bucket_key(dialect: str, column, granularity: str, zone: ZoneInfo, segments):
+    """Text key 'YYYY-MM-DD HH:MM:SS' of the local bucket holding each row's ``column``.
+
+    PostgreSQL converts with its own time zone database. MySQL and SQLite
+    shift the stored UTC value by the offset in force at that instant, then
+    truncate with date formatting, so neither needs time zone tables.
+    """
+    if dialect == "postgresql":
+        # sale_date is timestamptz there, which timezone() turns into local wall time
+        local = func.timezone(zone.key, column)
+        return func.to_char(func.date_trunc(granularity, local), "YYYY-MM-DD HH24:MI:SS")
+
+    offset = _offset_expression(column, segments)
+    if dialect == "mysql":
+        local = func.timestampadd(literal_column("SECOND"), offset, column)
+        if granularity == "week":
+            local = func.timestampadd(literal_column("DAY"), -func.weekday(local), local)
+        return func.date_format(local, KEY_FORMATS[granularity])
+
+    # SQLite, and the fallback for other backends with SQLite-compatible date functions
+    local = func.datetime(column, offset.concat(" seconds"))
+    modifiers = ("weekday 0", "-6 days") if granularity == "week" else ()
+    return func.strftime(KEY_FORMATS[granularity], local, *modifiers)
+
+
+async def bucket_totals(
+    db: AsyncSession,
+    granularity: str,
+    zone: ZoneInfo,
+    start: datetime,
+    end: datetime,
+    product_id: Optional[int] = None
+) -> List[Bucket]:
+    """Revenue, order count and quantity per local ``granularity`` bucket in ``zone``.
+
+    ``start`` and ``end`` are widened to whole buckets and become a plain
+    range on sale_date, an index range scan on (sale_date) or (product_id,
+    sale_date) of both the hot and archive tables; the bucket expression only
+    appears in the SELECT list and GROUP BY. Empty buckets are omitted, and
+    UTC offsets are looked up only between the first and last sale.
+    ValueError when the range spans more than MAX_BUCKETS buckets.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    check_bucket_count(granularity, zone, start, end)
+    range_start, range_end, _ = bucket_range(granularity, zone, start, end)
+    # Offsets are only needed where sales exist; a wide range would otherwise
+    # be scanned day by day for transitions
+    bounds = await sales_bounds(db, product_id)
+    if bounds is None:
+        return []
+    first, last = (value.astimezone(timezone.utc).replace(tzinfo=None) for value in bounds)
+    segments = offset_segments(zone, max(range_start, first), min(range_end, last))
+
+    def in_range(table):
+        stmt = select(table.id, table.quantity, table.total_amount, table.sale_date).where(
+            table.sale_date >= range_start,
+            table.sale_date < range_end,
+        )
+        if product_id:
+            stmt = stmt.where(table.product_id == product_id)
+        return stmt
+
+    sales = union_sales(in_range).subquery()
+    dialect = db.get_bind().dialect.name
+    key = bucket_key(dialect, sales.c.sale_date, granularity, zone, segments)
+
+    stmt = select(
+        key.label("bucket"),
+        func.sum(sales.c.total_amount).label("revenue"),
+        func.count(sales.c.id).label("order_count"),
+        func.sum(sales.c.quantity).label("quantity"),
+    )
+    # Grouping by the label keeps MySQL from treating the SELECT and GROUP BY
+    # copies of the expression (with separately bound formats) as different
+    stmt = stmt.group_by(text("bucket")).order_by(text("bucket"))
+
+    return [
+        Bucket(
+            datetime.fromisoformat(row.bucket).replace(tzinfo=zone),
+            float(row.revenue or 0),
+            int(row.order_count),
+            int(row.quantity or 0),
+        )
+        for row in (await db.execute(stmt))
+    ]
+
+
+async def sales_bounds(db: AsyncSession, product_id: Optional[int] = None) -> Optional[Tuple[datetime, datetime]]:
+    """First and last sale_date as aware UTC, read from the ends of the sale_date indexes"""
+    first, last = (await db.execute(bounds_statement(product_id))).one()
+    if first is None:
+        return None
+    return tuple(
+        value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+        for value in (first, last)
+    )
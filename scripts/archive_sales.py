@@ -0,0 +1,32 @@
+import pymysql
+pymysql.install_as_MySQLdb()
+import argparse
+from datetime import datetime, time, timedelta
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.sales_archive import archive_sales
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old sales from the sales table to sales_archive")
+    parser.add_argument("--days", type=int, default=settings.SALES_ARCHIVE_AFTER_DAYS,
+                        help="Archive sales older than this many days")
+    parser.add_argument("--before", type=datetime.fromisoformat, default=None,
+                        help="Archive sales before this date instead (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=settings.SALES_ARCHIVE_BATCH_SIZE,
+                        help="Sales moved per transaction")
+    args = parser.parse_args()
+
+    # Whole UTC days, like the rollup
+    cutoff = args.before or datetime.combine(datetime.utcnow().date() - timedelta(days=args.days), time.min)
+    db = SessionLocal()
+    try:
+        moved = archive_sales(db, cutoff, args.batch_size)
+        print(f"Archived {moved} sales dated before {cutoff}")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
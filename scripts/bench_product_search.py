@@ -0,0 +1,100 @@
+import argparse
+import itertools
+import random
+import statistics
+import time
+import tracemalloc
+from app.services.product_search import ProductSearchIndex, _build, tokenize
+
+ADJECTIVES = ["red", "blue", "green", "black", "white", "light", "heavy", "compact", "classic", "premium",
+              "wireless", "organic", "vintage", "smart", "portable", "waterproof", "leather", "wooden"]
+NOUNS = ["shoe", "shirt", "laptop", "lamp", "chair", "table", "phone", "speaker", "bottle", "backpack",
+         "jacket", "watch", "camera", "kettle", "blender", "monitor", "keyboard", "mouse", "sofa", "tent"]
+
+
+def generate(count: int, vocabulary: int, seed: int):
+    """Synthetic (id, name, description) rows with a Zipf-like long tail of brand words"""
+    rng = random.Random(seed)
+    brands = [f"brand{i}" for i in range(vocabulary)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(vocabulary)))
+    for product_id in range(1, count + 1):
+        brand = rng.choices(brands, cum_weights=cum_weights)[0]
+        name = f"{brand} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        description = " ".join(rng.choices(ADJECTIVES + NOUNS, k=8))
+        yield product_id, name, description
+
+
+def like_scan(rows, query, limit):
+    """What the old ILIKE '%term%' filter did, over name and description"""
+    terms = tokenize(query)
+    hits = []
+    for product_id, name, description in rows:
+        text = f"{name} {description}".lower()
+        if all(term in text for term in terms):
+            hits.append(product_id)
+            if len(hits) == limit:
+                break
+    return hits
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def report(label, samples):
+    print(f"{label:<14} p50 {percentile(samples, 0.5) * 1000:8.2f} ms   "
+          f"p95 {percentile(samples, 0.95) * 1000:8.2f} ms   "
+          f"mean {statistics.mean(samples) * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-process product search index against a LIKE scan")
+    parser.add_argument("--products", type=int, default=1_000_000, help="Catalog size")
+    parser.add_argument("--brands", type=int, default=20_000, help="Distinct brand words")
+    parser.add_argument("--queries", type=int, default=200, help="Queries against the index")
+    parser.add_argument("--scan-queries", type=int, default=10, help="Queries against the LIKE scan (slow)")
+    parser.add_argument("--limit", type=int, default=20, help="Results per query")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = list(generate(args.products, args.brands, args.seed))
+    rng = random.Random(args.seed + 1)
+    queries = [
+        rng.choice([
+            lambda: rng.choice(NOUNS)[:3],
+            lambda: f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}",
+            lambda: f"brand{rng.randrange(args.brands)}"[:7],
+            lambda: f"brand{rng.randrange(args.brands)} {rng.choice(NOUNS)[:4]}",
+        ])()
+        for _ in range(args.queries)
+    ]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = ProductSearchIndex()
+    index._name, index._description = _build(rows)
+    index.ready = True
+    build_seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"catalog:       {args.products} products, {len(index._name.vocabulary)} name tokens")
+    print(f"index build:   {build_seconds:.2f}s, peak {peak / 2**20:.0f} MiB traced")
+
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, args.limit)
+        samples.append(time.perf_counter() - started)
+    report("index", samples)
+
+    samples = []
+    for query in queries[:args.scan_queries]:
+        started = time.perf_counter()
+        like_scan(rows, query, args.limit)
+        samples.append(time.perf_counter() - started)
+    report("like scan", samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.core.config import settings
+from app.core.serialization import FastJSONResponse, serializer_for
+from app.models.models import Inventory, Product, Sale
+from app.schemas.schemas import InventoryHistory, InventoryResponse, ProductResponse, RevenueResponse, SaleResponse
+
+
+def generate(rows: int, seed: int):
+    """Transient ORM objects and plain dicts shaped like the list and analytics route results"""
+    rng = random.Random(seed)
+    now = datetime(2024, 6, 1, 12, 0, 0)
+    products = [
+        Product(id=i, name=f"Product {i}", description=None if i % 3 else f"Description of product {i}",
+                price=round(rng.uniform(1, 500), 2), created_at=now, updated_at=now)
+        for i in range(1, rows + 1)
+    ]
+    inventory = [
+        Inventory(id=p.id, product_id=p.id, quantity=rng.randint(0, 500), low_stock_threshold=10,
+                  created_at=now, updated_at=now, product=p)
+        for p in products
+    ]
+    sales = []
+    for i in range(1, rows + 1):
+        product = rng.choice(products)
+        quantity = rng.randint(1, 5)
+        sales.append(Sale(id=i, product_id=product.id, quantity=quantity, total_amount=round(product.price * quantity, 2),
+                          sale_date=now - timedelta(minutes=i), created_at=now, updated_at=now, product=product))
+    history = [
+        {"id": i, "event_id": i, "product_name": f"Product {i}", "quantity": 50, "low_stock_threshold": 10,
+         "delta": -1, "reason": "sale", "change_date": now - timedelta(minutes=i), "status": "In Stock"}
+        for i in range(1, rows + 1)
+    ]
+    revenue = [
+        {"period": str((now - timedelta(days=i)).date()), "total_revenue": rng.uniform(100, 10000)}
+        for i in range(rows)
+    ]
+    return [
+        ("products", List[ProductResponse], products),
+        ("inventory", List[InventoryResponse], inventory),
+        ("sales", List[SaleResponse], sales),
+        ("history", List[InventoryHistory], history),
+        ("revenue", List[RevenueResponse], revenue),
+    ]
+
+
+def fastapi_body(field, rows) -> bytes:
+    """What a route returning ``rows`` costs today: response_model validation, then stdlib json"""
+    content = asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def fast_body(serialize, rows) -> bytes:
+    return FastJSONResponse(serialize(rows)).body
+
+
+def timed(func, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization cost of list responses, FastAPI default vs the fast path")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median reported)")
+    parser.add_argument("--gzip-level", type=int, default=settings.GZIP_COMPRESS_LEVEL, help="Compression level to time")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'response':<10} {'default':>10} {'fast':>10} {'speedup':>8} {'bytes':>10} {'gzip':>10} {'gzip ms':>8}")
+    for name, annotation, rows in generate(args.rows, args.seed):
+        field = create_response_field("Response", annotation, mode="serialization")
+        serialize = serializer_for(annotation)
+        before, default = timed(lambda: fastapi_body(field, rows), args.repeat)
+        after, fast = timed(lambda: fast_body(serialize, rows), args.repeat)
+        if json.loads(default) != json.loads(fast):
+            raise SystemExit(f"{name}: fast path output differs from the default path")
+        compress, compressed = timed(lambda: gzip.compress(fast, compresslevel=args.gzip_level), args.repeat)
+        print(f"{name:<10} {before * 1000:8.1f}ms {after * 1000:8.1f}ms {before / after:7.1f}x "
+              f"{len(fast):>10} {len(compressed):>10} {compress * 1000:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+def call(base_url, method, path, payload=None):
+    """Send a JSON request and return (status, decoded body)"""
+    data = None if payload is None else json.dumps(payload).encode()
+    request = urllib.request.Request(
+        base_url + path, data=data, method=method, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def place_atomic(base_url, product_id, quantity):
+    status, _ = call(base_url, "POST", "/api/sales/place", {
+        "product_id": product_id,
+        "quantity": quantity,
+        "total_amount": quantity * 1.0,
+        "sale_date": datetime.utcnow().isoformat(),
+    })
+    return status == 200
+
+
+def place_read_modify_write(base_url, product_id, quantity, inventory_id):
+    """The racy client-side pattern: read stock, check, write it back, record the sale"""
+    _, inventory = call(base_url, "GET", f"/api/inventory/{inventory_id}")
+    if inventory["quantity"] < quantity:
+        return False
+    call(base_url, "PUT", f"/api/inventory/{inventory_id}", {"quantity": inventory["quantity"] - quantity})
+    status, _ = call(base_url, "POST", "/api/sales/", {
+        "product_id": product_id,
+        "quantity": quantity,
+        "total_amount": quantity * 1.0,
+        "sale_date": datetime.utcnow().isoformat(),
+    })
+    return status == 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hammer one product with concurrent sales and count oversells")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of a running API")
+    parser.add_argument("--stock", type=int, default=500, help="Starting stock of the hot product")
+    parser.add_argument("--requests", type=int, default=2000, help="Sales to attempt")
+    parser.add_argument("--threads", type=int, default=32, help="Concurrent client threads")
+    parser.add_argument("--quantity", type=int, default=1, help="Units per sale")
+    parser.add_argument("--mode", choices=["atomic", "read-modify-write"], default="atomic")
+    args = parser.parse_args()
+
+    _, product = call(args.url, "POST", "/api/products/", {
+        "name": f"bench-hot-sku-{int(time.time())}", "price": 1.0
+    })
+    _, inventory = call(args.url, "POST", "/api/inventory/", {
+        "product_id": product["id"], "quantity": args.stock, "low_stock_threshold": 0
+    })
+
+    def attempt(_):
+        if args.mode == "atomic":
+            return place_atomic(args.url, product["id"], args.quantity)
+        return place_read_modify_write(args.url, product["id"], args.quantity, inventory["id"])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        outcomes = list(pool.map(attempt, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    sold = sum(outcomes) * args.quantity
+    _, final = call(args.url, "GET", f"/api/inventory/{inventory['id']}")
+    # Units sold beyond the starting stock, or lost to overwritten stock updates
+    oversold = max(sold - args.stock, 0) + max(args.stock - sold - final["quantity"], 0)
+
+    print(f"mode:          {args.mode}")
+    print(f"attempts:      {args.requests} on {args.threads} threads in {elapsed:.2f}s")
+    print(f"throughput:    {args.requests / elapsed:.1f} req/s")
+    print(f"sales placed:  {sum(outcomes)} ({sold} units)")
+    print(f"rejected:      {args.requests - sum(outcomes)}")
+    print(f"final stock:   {final['quantity']}")
+    print(f"oversold:      {oversold} units")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import quote, urlsplit
+
+
+class Client:
+    """Keep-alive HTTP client with one connection per thread"""
+
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self._local = threading.local()
+
+    def _connection(self):
+        if getattr(self._local, "conn", None) is None:
+            self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=300)
+        return self._local.conn
+
+    def request(self, method: str, path: str, body=None):
+        """Returns (status, parsed JSON or None, headers)"""
+        payload = None if body is None else json.dumps(body)
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, payload, headers)
+                response = conn.getresponse()
+                data = response.read()
+                content_type = response.getheader("Content-Type", "")
+                parsed = json.loads(data) if data and content_type.startswith("application/json") else None
+                return response.status, parsed, dict(response.getheaders())
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+
+class Context:
+    """Ids and date windows discovered from the running API, shared by scenarios"""
+
+    def __init__(self, client: Client, rng: random.Random):
+        self.client = client
+        self.rng = rng
+        self.created_products = deque()
+        self.created_inventory = deque()
+        self.created_sales = deque()
+        self.free_products = deque()
+        # Products the benchmark created and stocked; every sale it writes is for one of them
+        self.stocked_products = deque()
+
+        _, products, _ = client.request("GET", "/api/products/?cursor=&limit=1000")
+        _, inventory, _ = client.request("GET", "/api/inventory/?cursor=&limit=1000")
+        _, sales, _ = client.request("GET", "/api/sales/?cursor=&limit=1000")
+        if not products or not sales:
+            sys.exit("The API has no products or sales; seed it first (see --seed-sales)")
+        self.product_ids = [p["id"] for p in products]
+        self.words = sorted({w for p in products for w in p["name"].lower().split() if w.isalpha()})
+        self.inventory_ids = [i["id"] for i in inventory or []]
+        self.sale_ids = [s["id"] for s in sales]
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def product_id(self):
+        return self.rng.choice(self.product_ids)
+
+    def inventory_id(self):
+        return self.rng.choice(self.inventory_ids)
+
+    def sale_id(self):
+        return self.rng.choice(self.sale_ids)
+
+    def stocked_product(self):
+        return self.rng.choice(self.stocked_products)
+
+    def window(self, days: int):
+        end = self.now - timedelta(days=self.rng.randint(0, 30))
+        return (end - timedelta(days=days)).isoformat(), end.isoformat()
+
+    def sale_body(self, product_id=None):
+        return {
+            "product_id": product_id or self.product_id(),
+            "quantity": self.rng.randint(1, 3),
+            "total_amount": round(self.rng.uniform(5, 500), 2),
+            "sale_date": (self.now - timedelta(seconds=self.rng.randint(0, 86400 * 30))).isoformat(),
+        }
+
+
+def _created(queue: deque, status: int, body):
+    if status == 200 and isinstance(body, dict) and "id" in body:
+        queue.append(body["id"])
+
+
+def _stocked(ctx: Context, status: int, body):
+    _created(ctx.created_inventory, status, body)
+    if status == 200 and isinstance(body, dict):
+        ctx.stocked_products.append(body["product_id"])
+
+
+def _delete_all(ctx: Context, paths, concurrency: int):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda path: ctx.client.request("DELETE", path), paths))
+
+
+def delete_benchmark_sales(ctx: Context, concurrency: int):
+    """Delete every sale still recorded for the benchmark's products, including bulk ones"""
+    ids = []
+    for product_id in ctx.stocked_products:
+        cursor = ""
+        while cursor is not None:
+            status, sales, headers = ctx.client.request(
+                "GET", f"/api/sales/?product_id={product_id}&limit=1000&cursor={quote(cursor)}"
+            )
+            if status != 200:
+                break
+            ids.extend(sale["id"] for sale in sales)
+            cursor = headers.get("X-Next-Cursor")
+    _delete_all(ctx, [f"/api/sales/{sale_id}" for sale_id in ids], concurrency)
+    ctx.created_sales.clear()
+
+
+def delete_benchmark_stock(ctx: Context, concurrency: int):
+    """Delete the inventory and products left once the measured deletes ran"""
+    _delete_all(ctx, [f"/api/inventory/{i}" for i in ctx.created_inventory], concurrency)
+    _delete_all(ctx, [f"/api/products/{p}" for p in [*ctx.created_products, *ctx.stocked_products]], concurrency)
+    ctx.created_inventory.clear()
+    ctx.created_products.clear()
+    ctx.stocked_products.clear()
+
+
+def scenarios(ctx: Context):
+    """(name, method, request builder, max requests, callback) for every route, reads before writes.
+
+    Builders return a path or a ``(path, body)`` pair. A string limit names the
+    queue of ids a scenario draws from, capping it at what was created. Writes
+    only touch products, inventory and sales the benchmark created. Entries
+    without a method are unmeasured cleanup steps, called with the context
+    and the concurrency, that delete what the measured deletes left over.
+    """
+    def q(path, **params):
+        query = "&".join(f"{k}={quote(str(v))}" for k, v in params.items() if v is not None)
+        return path + ("?" + query if query else "")
+
+    def window_params(days):
+        start, end = ctx.window(days)
+        return {"start_date": start, "end_date": end}
+
+    def periods():
+        start = ctx.now - timedelta(days=28)
+        return "&".join(
+            "period=" + quote(f"{(start + timedelta(days=7 * i)).isoformat()}/{(start + timedelta(days=7 * i + 7)).isoformat()}")
+            for i in range(4)
+        )
+
+    def setup_free_product(status, body):
+        _created(ctx.free_products, status, body)
+
+    return [
+        # products.py
+        ("products.list", "GET", lambda: (q("/api/products/", skip=ctx.rng.randint(0, 500), limit=100)), None, None),
+        ("products.list_cursor", "GET", lambda: (q("/api/products/", cursor="", limit=100)), None, None),
+        ("products.search", "GET", lambda: (q("/api/products/", search=ctx.rng.choice(ctx.words)[:4], limit=20)), None, None),
+        ("products.get", "GET", lambda: (f"/api/products/{ctx.product_id()}"), None, None),
+        # inventory.py
+        ("inventory.list", "GET", lambda: (q("/api/inventory/", skip=ctx.rng.randint(0, 500), limit=100)), None, None),
+        ("inventory.list_cursor", "GET", lambda: (q("/api/inventory/", cursor="", limit=100)), None, None),
+        ("inventory.status", "GET", lambda: ("/api/inventory/status"), 50, None),
+        ("inventory.status_low", "GET", lambda: (q("/api/inventory/status", low_stock_only="true")), 50, None),
+        ("inventory.alerts", "GET", lambda: (q("/api/inventory/alerts", threshold=ctx.rng.randint(0, 50))), None, None),
+        ("inventory.history", "GET", lambda: (q("/api/inventory/history", limit=100)), None, None),
+        ("inventory.history_item", "GET", lambda: (f"/api/inventory/history/{ctx.inventory_id()}"), None, None),
+        ("inventory.get", "GET", lambda: (f"/api/inventory/{ctx.inventory_id()}"), None, None),
+        # sales.py
+        ("sales.list", "GET", lambda: (q("/api/sales/", skip=ctx.rng.randint(0, 1000), limit=100)), None, None),
+        ("sales.list_cursor", "GET", lambda: (q("/api/sales/", cursor="", limit=100, **window_params(7))), None, None),
+        ("sales.get", "GET", lambda: (f"/api/sales/{ctx.sale_id()}"), None, None),
+        ("sales.export_csv", "GET", lambda: (q("/api/sales/export", format="csv", **window_params(1))), 20, None),
+        ("sales.export_ndjson", "GET", lambda: (q("/api/sales/export", format="ndjson", **window_params(1))), 20, None),
+        ("sales.revenue_product", "GET", lambda: (q(f"/api/sales/revenue/product/{ctx.product_id()}", **window_params(90))), None, None),
+        ("sales.revenue_daily", "GET", lambda: (q("/api/sales/revenue/daily", **window_params(90))), None, None),
+        ("sales.revenue_weekly", "GET", lambda: (q("/api/sales/revenue/weekly", **window_params(365))), None, None),
+        ("sales.revenue_monthly", "GET", lambda: (q("/api/sales/revenue/monthly", **window_params(365))), None, None),
+        ("sales.revenue_annual", "GET", lambda: ("/api/sales/revenue/annual"), 50, None),
+        ("sales.revenue_compare", "GET", lambda: (q("/api/sales/revenue/compare", **{
+            "period1_start": ctx.window(60)[0], "period1_end": ctx.window(30)[0],
+            "period2_start": ctx.window(30)[0], "period2_end": ctx.now.isoformat(),
+        })), None, None),
+        ("sales.revenue_compare_periods", "GET", lambda: ("/api/sales/revenue/compare/periods?" + periods()), None, None),
+        ("sales.top_products", "GET", lambda: (q("/api/sales/analytics/top-products", limit=50, **window_params(30))), None, None),
+        ("sales.velocity", "GET", lambda: (q("/api/sales/analytics/velocity", limit=50, **window_params(30))), None, None),
+        # Writes, each cleaning up after the one that created its rows
+        ("products.create", "POST", lambda: ("/api/products/", {
+            "name": f"Benchmark product {ctx.rng.random():.8f}", "description": "benchmark", "price": 9.99,
+        }), None, lambda status, body: _created(ctx.created_products, status, body)),
+        ("products.update", "PUT", lambda: (f"/api/products/{ctx.rng.choice(ctx.created_products)}", {"price": 10.99}), None, None),
+        ("inventory.setup_products", "POST", lambda: ("/api/products/", {
+            "name": f"Benchmark stock {ctx.rng.random():.8f}", "price": 1.0,
+        }), None, setup_free_product),
+        ("inventory.create", "POST", lambda: ("/api/inventory/", {
+            "product_id": ctx.free_products.popleft(), "quantity": 100, "low_stock_threshold": 10,
+        }), "free_products", lambda status, body: _stocked(ctx, status, body)),
+        ("inventory.update", "PUT", lambda: (f"/api/inventory/{ctx.rng.choice(ctx.created_inventory)}", {
+            "quantity": ctx.rng.randint(50, 150),
+        }), "created_inventory", None),
+        ("sales.create", "POST", lambda: ("/api/sales/", ctx.sale_body(ctx.stocked_product())), "stocked_products",
+         lambda status, body: _created(ctx.created_sales, status, body)),
+        ("sales.place", "POST", lambda: ("/api/sales/place", ctx.sale_body(ctx.stocked_product()) | {"quantity": 1}),
+         "stocked_products", lambda status, body: _created(ctx.created_sales, status, body)),
+        ("sales.bulk", "POST", lambda: ("/api/sales/bulk", [ctx.sale_body(ctx.stocked_product()) for _ in range(100)]),
+         50, None),
+        # Each update takes its sale out of the queue until it answers, so no two edit the same sale at once
+        ("sales.update", "PUT", lambda: (f"/api/sales/{ctx.created_sales.popleft()}", ctx.sale_body(ctx.stocked_product())),
+         "created_sales", lambda status, body: _created(ctx.created_sales, status, body)),
+        ("sales.delete", "DELETE", lambda: (f"/api/sales/{ctx.created_sales.popleft()}"), "created_sales", None),
+        ("cleanup.sales", None, delete_benchmark_sales, None, None),
+        ("inventory.delete", "DELETE", lambda: (f"/api/inventory/{ctx.created_inventory.popleft()}"), "created_inventory", None),
+        ("products.delete", "DELETE", lambda: (f"/api/products/{ctx.created_products.popleft()}"), "created_products", None),
+        ("cleanup.stock", None, delete_benchmark_stock, None, None),
+    ]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+def run_scenario(ctx: Context, method: str, build, count: int, concurrency: int, callback):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        request = build()
+        path, body = (request, None) if isinstance(request, str) else request
+        started = time.perf_counter()
+        status, parsed, _ = ctx.client.request(method, path, body)
+        elapsed = time.perf_counter() - started
+        if callback:
+            callback(status, parsed)
+        with lock:
+            latencies.append(elapsed)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(count)))
+    wall = time.perf_counter() - started
+    return {
+        "requests": count,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput_rps": count / wall if wall else 0.0,
+    }
+
+
+def start_server(database_url: str, port: int):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    client = Client(f"http://127.0.0.1:{port}")
+    for _ in range(100):
+        try:
+            if client.request("GET", "/")[0] == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit("The API server did not start")
+
+
+def print_results(results, baseline=None):
+    header = f"{'route':<32}{'reqs':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"
+    if baseline:
+        header += f"{'p50 vs base':>13}{'p95 vs base':>13}"
+    print(header)
+    for name, r in results.items():
+        line = (f"{name:<32}{r['requests']:>6}{r['errors']:>5}{r['p50_ms']:>10.2f}"
+                f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['throughput_rps']:>10.1f}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            for key in ("p50_ms", "p95_ms"):
+                change = (r[key] - previous[key]) / previous[key] * 100 if previous[key] else 0.0
+                line += f"{change:>+12.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure latency and throughput of every API route")
+    parser.add_argument("--url", default=None, help="Base URL of a running API (default: start one)")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db", help="Database to seed and serve")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the started API")
+    parser.add_argument("--seed-products", type=int, default=0, help="Seed this many products before running")
+    parser.add_argument("--seed-sales", type=int, default=0, help="Seed this many sales before running")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per read route")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--only", default=None, help="Regex of route names to run")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="JSON results of a previous run to compare against")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for request parameters")
+    args = parser.parse_args()
+
+    if args.seed_products or args.seed_sales:
+        subprocess.run([
+            sys.executable, "-m", "scripts.seed_data", "--create-tables",
+            "--products", str(args.seed_products or 1000), "--sales", str(args.seed_sales or 100_000),
+        ], env=dict(os.environ, DATABASE_URL=args.database_url), check=True)
+
+    server = None if args.url else start_server(args.database_url, args.port)
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    try:
+        ctx = Context(Client(base_url), random.Random(args.seed))
+        results = {}
+        for name, method, build, limit, callback in scenarios(ctx):
+            if method is None:
+                build(ctx, args.concurrency)
+                continue
+            if args.only and not re.search(args.only, name):
+                continue
+            if isinstance(limit, str):
+                # Deletes consume rows created by an earlier write scenario
+                count = min(args.requests, len(getattr(ctx, limit)))
+            else:
+                count = min(args.requests, limit or args.requests)
+            if count == 0:
+                continue
+            if method == "GET":
+                run_scenario(ctx, method, build, min(args.warmup, count), args.concurrency, None)
+            results[name] = run_scenario(ctx, method, build, count, args.concurrency, callback)
+            print(f"  {name}: p50 {results[name]['p50_ms']:.1f} ms", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "started_at": ctx.now.isoformat(),
+                "url": base_url,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
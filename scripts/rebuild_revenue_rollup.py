@@ -0,0 +1,26 @@
+import pymysql
+pymysql.install_as_MySQLdb()
+import argparse
+from datetime import date
+from app.db.session import SessionLocal
+from app.services.revenue_rollup import rebuild_rollup
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the sales daily revenue rollup from the sales table")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--batch-days", type=int, default=31, help="Days recomputed per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        written = rebuild_rollup(db, args.start, args.end, args.batch_days)
+        print(f"Wrote {written} rollup rows")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,162 @@
 import pymysql
 pymysql.install_as_MySQLdb()
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
-from app.models.models import Category, Product, Inventory, Sale
+import argparse
+import time
 from datetime import datetime, timedelta
-import random
+import numpy as np
+from sqlalchemy import func, insert, literal, select
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+from app.models.models import Inventory, InventoryEvent, Product, Sale
+from app.services.revenue_rollup import rebuild_rollup
 
-def seed_data():
-    db = SessionLocal()
-    try:
-        # Create categories
-        categories = [
-            Category(name="Electronics", description="Electronic devices and accessories"),
-            Category(name="Clothing", description="Apparel and fashion items"),
-            Category(name="Home & Kitchen", description="Home goods and kitchen appliances"),
-            Category(name="Books", description="Books and publications"),
-            Category(name="Sports", description="Sports equipment and accessories")
-        ]
-        db.add_all(categories)
-        db.commit()
+ADJECTIVES = ["Classic", "Premium", "Compact", "Wireless", "Organic", "Vintage", "Smart", "Portable",
+              "Waterproof", "Leather", "Wooden", "Ultra", "Eco", "Pro", "Mini", "Deluxe"]
+NOUNS = ["Headphones", "Laptop", "Lamp", "Chair", "Table", "Phone", "Speaker", "Bottle", "Backpack",
+         "Jacket", "Watch", "Camera", "Kettle", "Blender", "Monitor", "Keyboard", "Mouse", "Sofa", "Tent", "Shoes"]
+CATEGORIES = ["Electronics", "Clothing", "Home & Kitchen", "Books", "Sports", "Outdoors", "Toys", "Beauty"]
+
+
+def _batches(total: int, size: int):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
 
-        # Create products
-        products = []
-        for category in categories:
-            for i in range(5):  # 5 products per category
-                product = Product(
-                    name=f"{category.name} Product {i+1}",
-                    description=f"Description for {category.name} Product {i+1}",
-                    price=random.uniform(10.0, 1000.0),
-                    category_id=category.id
-                )
-                products.append(product)
-        
-        db.add_all(products)
+
+def seed_products(db, rng, count: int, batch_size: int, now: datetime):
+    """Insert products with generated names; returns (ids, prices) of the new rows"""
+    first_id = (db.scalar(select(func.max(Product.id))) or 0)
+    for start, size in _batches(count, batch_size):
+        adjectives = rng.choice(ADJECTIVES, size)
+        nouns = rng.choice(NOUNS, size)
+        categories = rng.choice(CATEGORIES, size)
+        prices = np.round(rng.lognormal(3.5, 1.0, size), 2) + 0.99
+        db.execute(insert(Product), [
+            {
+                "name": f"{adjective} {noun} {start + i + 1}",
+                "description": f"{adjective} {noun.lower()} from our {category} range",
+                "price": float(price),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i, (adjective, noun, category, price) in enumerate(zip(adjectives, nouns, categories, prices))
+        ])
         db.commit()
+    rows = db.execute(select(Product.id, Product.price).where(Product.id > first_id).order_by(Product.id)).all()
+    return np.array([r.id for r in rows], dtype=np.int64), np.array([r.price for r in rows], dtype=np.float64)
+
 
-        # Create inventory
-        for product in products:
-            inventory = Inventory(
-                product_id=product.id,
-                quantity=random.randint(0, 100),
-                low_stock_threshold=10
-            )
-            db.add(inventory)
+def seed_inventory(db, rng, product_ids, batch_size: int, now: datetime):
+    """One inventory row per product plus its initial movement event"""
+    first_id = (db.scalar(select(func.max(Inventory.id))) or 0)
+    for start, size in _batches(len(product_ids), batch_size):
+        quantities = rng.integers(0, 500, size)
+        thresholds = rng.integers(5, 50, size)
+        db.execute(insert(Inventory), [
+            {
+                "product_id": int(product_id),
+                "quantity": int(quantity),
+                "low_stock_threshold": int(threshold),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for product_id, quantity, threshold in zip(product_ids[start:start + size], quantities, thresholds)
+        ])
         db.commit()
+    db.execute(insert(InventoryEvent).from_select(
+        ["inventory_id", "product_id", "delta", "quantity", "low_stock_threshold", "reason", "created_at"],
+        select(
+            Inventory.id, Inventory.product_id, Inventory.quantity, Inventory.quantity,
+            Inventory.low_stock_threshold, literal("created"), Inventory.created_at,
+        ).where(Inventory.id > first_id),
+    ))
+    db.commit()
+
+
+def day_weights(days: int, end: datetime) -> np.ndarray:
+    """Relative sales volume per day: yearly season, weekend lift and slow growth"""
+    dates = [end - timedelta(days=days - d) for d in range(days)]
+    day_of_year = np.array([d.timetuple().tm_yday for d in dates])
+    weekday = np.array([d.weekday() for d in dates])
+    seasonal = 1 + 0.35 * np.cos(2 * np.pi * (day_of_year - 350) / 365)
+    weekend = np.where(weekday >= 5, 1.25, 1.0)
+    trend = np.linspace(0.8, 1.2, days)
+    weights = seasonal * weekend * trend
+    return weights / weights.sum()
+
 
-        # Create sales
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=30)
-        
-        for product in products:
-            # Create 10-20 sales per product
-            for _ in range(random.randint(10, 20)):
-                quantity = random.randint(1, 5)
-                sale = Sale(
-                    product_id=product.id,
-                    quantity=quantity,
-                    total_amount=product.price * quantity,
-                    sale_date=start_date + timedelta(
-                        seconds=random.randint(0, int((end_date - start_date).total_seconds()))
-                    )
-                )
-                db.add(sale)
+def seed_sales(db, rng, product_ids, prices, count: int, days: int, skew: float, batch_size: int, now: datetime):
+    """Insert sales whose product popularity follows a Zipf-like distribution"""
+    ranks = rng.permutation(len(product_ids)) + 1
+    popularity = 1 / ranks ** skew
+    popularity /= popularity.sum()
+    weights = day_weights(days, now)
+    # Day slots are counted back from now so no sale lands in the future
+    start = now - timedelta(days=days)
+
+    written = 0
+    for _, size in _batches(count, batch_size):
+        picks = rng.choice(len(product_ids), size, p=popularity)
+        quantities = rng.geometric(0.55, size)
+        offsets = rng.choice(days, size, p=weights) * 86400 + rng.integers(0, 86400, size)
+        db.execute(insert(Sale), [
+            {
+                "product_id": int(product_ids[pick]),
+                "quantity": int(quantity),
+                "total_amount": round(float(prices[pick]) * int(quantity), 2),
+                "sale_date": start + timedelta(seconds=int(offset)),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for pick, quantity, offset in zip(picks, quantities, offsets)
+        ])
         db.commit()
+        written += size
+        print(f"  sales: {written}/{count}", end="\r", flush=True)
+    print()
+    return start.date(), now.date()
+
+
+def seed_data(products: int, sales: int, days: int, skew: float, batch_size: int, seed: int, create_tables: bool):
+    if create_tables:
+        Base.metadata.create_all(engine)
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        product_ids, prices = seed_products(db, rng, products, batch_size, now)
+        print(f"Inserted {len(product_ids)} products in {time.perf_counter() - started:.1f}s")
 
+        started = time.perf_counter()
+        seed_inventory(db, rng, product_ids, batch_size, now)
+        print(f"Inserted {len(product_ids)} inventory rows in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        first_day, last_day = seed_sales(db, rng, product_ids, prices, sales, days, skew, batch_size, now)
+        print(f"Inserted {sales} sales in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        written = rebuild_rollup(db, first_day, last_day)
+        print(f"Rebuilt {written} rollup rows in {time.perf_counter() - started:.1f}s")
     except Exception as e:
         print(f"An error occurred: {e}")
         db.rollback()
     finally:
         db.close()
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-generate products, inventory and sales")
+    parser.add_argument("--products", type=int, default=1000, help="Products to create")
+    parser.add_argument("--sales", type=int, default=100_000, help="Sales to create")
+    parser.add_argument("--days", type=int, default=365, help="Days of sales history, ending today")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of product popularity")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per INSERT transaction")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--create-tables", action="store_true", help="Create missing tables first (SQLite stand-ins)")
+    args = parser.parse_args()
+    seed_data(args.products, args.sales, args.days, args.skew, args.batch_size, args.seed, args.create_tables)
+
+
 if __name__ == "__main__":
-    seed_data() 
\ No newline at end of file
+    main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+# Settings are read when app.core.config is imported: point the app at a
+# throwaway SQLite database, with the X-Query-Count header, before that happens
+_database_dir = tempfile.mkdtemp(prefix="ecommerce-admin-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_dir}/test.db"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ["READ_DATABASE_URL"] = ""
+os.environ["CACHE_URL"] = ""
+os.environ["DEBUG"] = "true"
+os.environ["STARTUP_WARMUP"] = "false"
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+from app.models.models import Inventory, Product, Sale
+
+
+@pytest.fixture(scope="session")
+def client():
+    Base.metadata.create_all(engine)
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_products(client, db):
+    """Create ``count`` products, each with inventory and ``sales`` sales"""
+    def make(count: int, sales: int = 0):
+        products = []
+        for n in range(count):
+            product = Product(name=f"Product {n}", description="test", price=10.0)
+            product.inventory = Inventory(quantity=100, low_stock_threshold=10)
+            product.sales = [
+                Sale(quantity=1, total_amount=10.0, sale_date=datetime(2024, 1, 1) + timedelta(days=n, hours=i))
+                for i in range(sales)
+            ]
+            db.add(product)
+            products.append(product)
+        db.commit()
+        return products
+    return make
+
+
+
+@pytest.fixture
+def rejecting_trigger(client):
+    """Make the database abort any sale insert with the yielded total_amount"""
+    amount = 13.13
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TRIGGER reject_sale BEFORE INSERT ON sales "
+            f"WHEN NEW.total_amount = {amount} BEGIN SELECT RAISE(ABORT, 'sale rejected'); END"
+        ))
+    yield amount
+    with engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER reject_sale"))
@@ -0,0 +1,29 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core import admission, metrics
+from app.main import create_app
+
+
+def test_shed_requests_carry_cors_headers(client, monkeypatch):
+    client.get("/")  # builds the middleware stack
+    group = next(g for g in admission._groups if g.name == "analytics")
+    monkeypatch.setattr(group, "_semaphore", asyncio.Semaphore(0))
+    monkeypatch.setattr(group, "queue", 0)
+
+    response = client.get("/api/sales/revenue/daily", headers={"Origin": "https://admin.example.com"})
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert "Retry-After" in response.headers["access-control-expose-headers"]
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_building_another_app_does_not_add_collectors(client):
+    client.get("/")
+    groups, collectors = list(admission._groups), len(metrics.registry._collectors)
+    try:
+        TestClient(create_app()).get("/")
+        assert len(metrics.registry._collectors) == collectors
+    finally:
+        admission._groups[:] = groups
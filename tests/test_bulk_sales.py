@@ -0,0 +1,58 @@
+import json
+
+from sqlalchemy import select
+
+from app.models.models import Sale, SaleDailyRollup
+
+BULK = "/api/sales/bulk?chunk_size=2"
+
+
+def _sale(product_id: int, amount: float) -> dict:
+    return {"product_id": product_id, "quantity": 1, "total_amount": amount, "sale_date": "2017-07-07T09:00:00"}
+
+
+def _stored(db, product_id: int):
+    db.expire_all()
+    return (
+        db.scalars(select(Sale.total_amount).where(Sale.product_id == product_id).order_by(Sale.id)).all(),
+        db.execute(
+            select(SaleDailyRollup.revenue, SaleDailyRollup.order_count).where(SaleDailyRollup.product_id == product_id)
+        ).all(),
+    )
+
+
+def test_every_ndjson_row_gets_a_status(client, make_products, db, rejecting_trigger):
+    product_id = make_products(1)[0].id
+    lines = [
+        json.dumps(_sale(product_id, 5.0)),
+        "{not json",
+        json.dumps(_sale(product_id, rejecting_trigger)),
+        "[1, 2]",
+        json.dumps(_sale(product_id, 6.0)),
+        json.dumps({**_sale(product_id, 7.0), "quantity": 0}),
+        json.dumps(_sale(product_id, 8.0)),
+    ]
+    response = client.post(BULK, content="\n".join(lines), headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    # Rows 0 and 2 share the chunk the database rejects; 4 and 6 share one that commits
+    assert [(row["index"], row["status"]) for row in body["results"]] == [
+        (0, "failed"), (1, "invalid"), (2, "failed"), (3, "invalid"), (4, "created"), (5, "invalid"), (6, "created"),
+    ]
+    errors = [row["error"] for row in body["results"]]
+    assert errors[1].startswith("invalid JSON") and errors[3] == "expected a JSON object"
+    assert errors[5].startswith("quantity") and "sale rejected" in errors[0]
+    assert errors[4] is None and errors[6] is None
+    assert (body["created"], body["failed"]) == (2, 5)
+    assert _stored(db, product_id) == ([6.0, 8.0], [(14.0, 2)])
+
+
+def test_json_array_body_is_written_in_chunks(client, make_products, db):
+    product_id = make_products(1)[0].id
+    response = client.post(BULK, json=[_sale(product_id, amount) for amount in (1.0, 2.0, 3.0)])
+    assert response.status_code == 200, response.text
+    assert [row["status"] for row in response.json()["results"]] == ["created"] * 3
+    assert _stored(db, product_id) == ([1.0, 2.0, 3.0], [(6.0, 3)])
+
+    assert client.post(BULK, json={"sales": []}).status_code == 400
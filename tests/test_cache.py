@@ -0,0 +1,36 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import cache
+from app.db.session import async_engine
+
+
+def test_replica_results_are_not_served_to_primary_reads(monkeypatch):
+    replica = SimpleNamespace()
+    monkeypatch.setattr(cache, "async_read_engine", replica)
+    response_cache = cache.ResponseCache(cache.TTLCache(16), ttl=30)
+    calls = []
+
+    @response_cache.cached("sales")
+    async def revenue(db, days: int):
+        calls.append(db.bind)
+        return {"source": "replica" if db.bind is replica else "primary", "days": days}
+
+    async def read(bind):
+        return await revenue(db=SimpleNamespace(bind=bind), days=7)
+
+    assert asyncio.run(read(replica))["source"] == "replica"
+    assert asyncio.run(read(async_engine))["source"] == "primary"
+    assert asyncio.run(read(replica))["source"] == "replica"
+    assert asyncio.run(read(async_engine))["source"] == "primary"
+    assert calls == [replica, async_engine]
+
+
+def test_cache_url_without_redis_names_the_missing_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    monkeypatch.setitem(sys.modules, "redis.asyncio", None)
+    with pytest.raises(RuntimeError, match="requires the redis package"):
+        cache.RedisCache("redis://localhost:6379/0")
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from app.db import conditional
+from app.models.models import Inventory, Product
+
+PRODUCTS = "/api/products/?limit=1000"
+INVENTORY = "/api/inventory/?limit=1000"
+
+
+@pytest.fixture
+def backdate(client, db, monkeypatch):
+    """Turn off the settling delay; calling the fixture marks every listing row as changed long ago.
+
+    Timestamps have whole seconds, so backdating keeps a change made within
+    the test from landing in the same second as the state before it.
+    """
+    monkeypatch.setattr(conditional, "SETTLE_SECONDS", 0)
+
+    def backdate():
+        for table in (Product, Inventory):
+            db.execute(update(table).values(updated_at=datetime(2000, 1, 1)))
+        db.commit()
+    return backdate
+
+
+def _etag(client, path: str) -> str:
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+    return response.headers["ETag"]
+
+
+def test_unchanged_listing_answers_304(client, make_products, backdate):
+    make_products(1)
+    backdate()
+    for path in (PRODUCTS, INVENTORY):
+        first = client.get(path)
+        assert first.status_code == 200
+        assert client.get(path, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+        assert client.get(path, headers={"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+        assert client.get(path, headers={"If-None-Match": 'W/"other"'}).status_code == 200
+
+
+def test_listing_etag_changes_on_create_and_update(client, backdate):
+    backdate()
+    before = _etag(client, PRODUCTS)
+    product = client.post("/api/products/", json={"name": "Tagged", "price": 1.0}).json()
+    assert _etag(client, PRODUCTS) != before
+
+    backdate()
+    created = _etag(client, PRODUCTS)
+    assert client.put(f"/api/products/{product['id']}", json={"price": 2.0}).status_code == 200
+    response = client.get(PRODUCTS, headers={"If-None-Match": created})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != created
+
+
+def test_inventory_etag_changes_when_a_sale_takes_stock(client, make_products, backdate):
+    product = make_products(1)[0]
+    backdate()
+    before = _etag(client, INVENTORY)
+    sale = {"product_id": product.id, "quantity": 1, "total_amount": 1.0, "sale_date": "2011-01-01T00:00:00"}
+    assert client.post("/api/sales/place", json=sale).status_code == 200
+    response = client.get(INVENTORY, headers={"If-None-Match": before})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != before
+
+
+def test_listing_changed_within_the_settle_window_has_no_validators(client):
+    client.post("/api/products/", json={"name": "Fresh", "price": 1.0})
+    response = client.get(PRODUCTS)
+    assert response.status_code == 200
+    assert "ETag" not in response.headers and "Last-Modified" not in response.headers
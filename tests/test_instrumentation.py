@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import instrumentation
+
+
+def test_failing_statement_on_an_async_engine_raises_the_database_error(tmp_path):
+    async def run():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/failing.db")
+        instrumentation.install(async_engine.sync_engine)
+        try:
+            async with async_engine.connect() as conn:
+                with pytest.raises(SQLAlchemyError):
+                    await conn.execute(text("SELECT * FROM no_such_table"))
+                assert conn.sync_connection.info["query_started"] == []
+                assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_bulk_ingest_reports_a_failed_chunk(client, make_products, rejecting_trigger):
+    product_id = make_products(1)[0].id
+    sales = [
+        {"product_id": product_id, "quantity": 1, "total_amount": amount, "sale_date": "2016-05-05T12:00:00"}
+        for amount in (5.0, rejecting_trigger, 6.0)
+    ]
+    response = client.post("/api/sales/bulk?chunk_size=2", json=sales)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [row["status"] for row in body["results"]] == ["failed", "failed", "created"]
+    assert "sale rejected" in body["results"][0]["error"]
+    assert (body["created"], body["failed"]) == (1, 2)
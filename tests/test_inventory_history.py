@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from app.db.pagination import NEXT_CURSOR_HEADER
+from app.models.models import InventoryEvent
+
+
+def _pages(client, path: str, limit: int):
+    """Every row of a cursor-paged route, failing if a cursor repeats"""
+    rows, cursor, seen = [], "", set()
+    while True:
+        response = client.get(path, params={"limit": limit, "cursor": cursor})
+        assert response.status_code == 200, response.text
+        rows.extend(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return rows
+        assert cursor not in seen, "history paging did not advance"
+        seen.add(cursor)
+
+
+def _event_ids(rows):
+    return [row["event_id"] for row in rows]
+
+
+def test_history_pages_through_events_of_the_same_second(client, make_products):
+    inventory = make_products(1)[0].inventory
+    for quantity in (90, 80, 70, 60):
+        response = client.put(f"/api/inventory/{inventory.id}", json={"quantity": quantity})
+        assert response.status_code == 200, response.text
+
+    rows = _pages(client, f"/api/inventory/history/{inventory.id}", limit=2)
+    assert [row["quantity"] for row in rows] == [60, 70, 80, 90]
+    assert _event_ids(rows) == sorted(_event_ids(rows), reverse=True)
+
+
+def test_history_breaks_timestamp_ties_by_event_id(client, make_products, db):
+    inventory = make_products(1)[0].inventory
+    stamp = datetime.utcnow().replace(microsecond=0)
+    db.add_all([
+        InventoryEvent(
+            inventory_id=inventory.id, product_id=inventory.product_id, delta=-1,
+            quantity=100 - n, low_stock_threshold=10, reason="adjustment", created_at=stamp,
+        )
+        for n in range(5)
+    ])
+    db.commit()
+
+    rows = _pages(client, f"/api/inventory/history/{inventory.id}", limit=2)
+    assert len(rows) == 5
+    assert _event_ids(rows) == sorted(_event_ids(rows), reverse=True)
+
+
+def test_deleting_an_item_keeps_its_history_and_closes_it(client, make_products):
+    inventory = make_products(1)[0].inventory
+    assert client.put(f"/api/inventory/{inventory.id}", json={"quantity": 40}).status_code == 200
+    assert client.delete(f"/api/inventory/{inventory.id}").status_code == 200
+
+    rows = _pages(client, f"/api/inventory/history/{inventory.id}", limit=10)
+    assert [(row["reason"], row["delta"], row["quantity"]) for row in rows] == [("deleted", -40, 0), ("adjustment", -60, 40)]
+    assert client.get(f"/api/inventory/history/{inventory.id + 1000}").status_code == 404
+
+
+def test_history_of_a_deleted_product_is_listed(client, make_products):
+    product = make_products(1)[0]
+    inventory_id = product.inventory.id
+    assert client.put(f"/api/inventory/{inventory_id}", json={"quantity": 55}).status_code == 200
+    assert client.delete(f"/api/products/{product.id}").status_code == 200
+
+    rows = _pages(client, f"/api/inventory/history?product_id={product.id}", limit=10)
+    assert [(row["id"], row["reason"], row["quantity"], row["product_name"]) for row in rows] == [
+        (inventory_id, "deleted", 0, None),
+        (inventory_id, "adjustment", 55, None),
+    ]
+    assert client.get("/api/inventory/").status_code == 200
@@ -0,0 +1,99 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import update
+
+from app.core.cache import response_cache
+from app.db.session import AsyncSessionLocal
+from app.models.models import Inventory
+from app.services.inventory_index import inventory_index
+
+
+@pytest.fixture
+def reconcile(client):
+    """Calling the fixture runs one reconcile pass and drops cached inventory responses"""
+    def reconcile():
+        client.portal.call(inventory_index.reload, AsyncSessionLocal)
+        client.portal.call(response_cache.invalidate, "inventory")
+    return reconcile
+
+
+def _by_id(client, path: str, ids, **params) -> dict:
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return {item["id"]: (item["product_name"], item["quantity"], item["status"]) for item in response.json() if item["id"] in ids}
+
+
+def test_reconcile_picks_up_writes_made_elsewhere(client, make_products, db, reconcile):
+    product = make_products(1)[0]
+    inventory_id = product.inventory.id
+    db.execute(update(Inventory).where(Inventory.id == inventory_id).values(quantity=5))
+    db.commit()
+    client.portal.call(response_cache.invalidate, "inventory")
+    # Written straight to the database, as another worker would: the index has not seen it
+    assert _by_id(client, "/api/inventory/alerts", {inventory_id}) == {}
+
+    reconcile()
+    assert _by_id(client, "/api/inventory/alerts", {inventory_id}) == {inventory_id: ("Product 0", 5, "Low Stock")}
+
+
+def test_write_routes_update_the_index(client, make_products, reconcile):
+    product = make_products(1)[0]
+    inventory_id = product.inventory.id
+    reconcile()
+    ids = {inventory_id}
+
+    assert client.put(f"/api/inventory/{inventory_id}", json={"quantity": 8}).status_code == 200
+    assert _by_id(client, "/api/inventory/alerts", ids) == {inventory_id: ("Product 0", 8, "Low Stock")}
+    assert client.put(f"/api/inventory/{inventory_id}", json={"low_stock_threshold": 5}).status_code == 200
+    assert _by_id(client, "/api/inventory/alerts", ids) == {}
+    assert _by_id(client, "/api/inventory/alerts", ids, threshold=8) == {inventory_id: ("Product 0", 8, "In Stock")}
+
+    assert client.put(f"/api/products/{product.id}", json={"name": "Renamed"}).status_code == 200
+    client.portal.call(response_cache.invalidate, "inventory")
+    assert _by_id(client, "/api/inventory/status", ids) == {inventory_id: ("Renamed", 8, "In Stock")}
+
+    assert client.delete(f"/api/products/{product.id}").status_code == 200
+    client.portal.call(response_cache.invalidate, "inventory")
+    assert _by_id(client, "/api/inventory/status", ids) == {}
+
+
+def test_index_answers_match_the_sql_path(client, make_products, db, reconcile, monkeypatch):
+    products = make_products(3)
+    for product, quantity in zip(products, (0, 10, 40)):
+        product.inventory.quantity = quantity
+    db.commit()
+    ids = {product.inventory.id for product in products}
+    reconcile()
+
+    queries = [
+        ("/api/inventory/status", {}),
+        ("/api/inventory/status", {"low_stock_only": True}),
+        ("/api/inventory/alerts", {}),
+        ("/api/inventory/alerts", {"threshold": 20}),
+    ]
+    from_index = [_by_id(client, path, ids, **params) for path, params in queries]
+    monkeypatch.setattr(inventory_index, "ready", False)
+    client.portal.call(response_cache.invalidate, "inventory")
+    assert [_by_id(client, path, ids, **params) for path, params in queries] == from_index
+    assert len(from_index[0]) == 3 and len(from_index[3]) == 2
+
+
+def test_overlapping_reloads_keep_writes_made_while_they_load(client, make_products, reconcile):
+    inventory_id = make_products(1)[0].inventory.id
+    reconcile()
+
+    @asynccontextmanager
+    async def session_then_sale():
+        async with AsyncSessionLocal() as db:
+            yield db
+        # A sale commits after this reload has read its rows
+        inventory_index.set_stock(inventory_id, 4, 10)
+
+    async def overlap():
+        await asyncio.gather(inventory_index.reload(session_then_sale), inventory_index.reload(AsyncSessionLocal))
+
+    client.portal.call(overlap)
+    client.portal.call(response_cache.invalidate, "inventory")
+    assert _by_id(client, "/api/inventory/alerts", {inventory_id}) == {inventory_id: ("Product 0", 4, "Low Stock")}
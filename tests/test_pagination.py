@@ -0,0 +1,14 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from app.db.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_its_sort_key():
+    assert decode_cursor(encode_cursor(datetime(2024, 1, 1, 12), 5), datetime, int) == (datetime(2024, 1, 1, 12), 5)
+
+
+def test_cursor_with_a_z_suffix_is_decoded():
+    token = base64.urlsafe_b64encode(json.dumps(["2024-01-01T00:00:00Z", 5]).encode()).decode()
+    assert decode_cursor(token, datetime, int) == (datetime(2024, 1, 1, tzinfo=timezone.utc), 5)
@@ -0,0 +1,73 @@
+import pytest
+
+from app.db.session import AsyncSessionLocal
+from app.services.product_search import product_search_index
+
+
+@pytest.fixture
+def reload_index(client):
+    """Calling the fixture folds every write so far into the posting arrays"""
+    def reload_index():
+        client.portal.call(product_search_index.reload, AsyncSessionLocal)
+        assert product_search_index.ready
+    return reload_index
+
+
+def _search(client, query: str, **params):
+    response = client.get("/api/products/", params={"search": query, **params})
+    assert response.status_code == 200, response.text
+    return [product["name"] for product in response.json()]
+
+
+def _create(client, name: str, description: str = None) -> int:
+    response = client.post("/api/products/", json={"name": name, "price": 1.0, "description": description})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_writes_show_up_before_the_next_reload(client, reload_index):
+    reload_index()
+    product_id = _create(client, "Zephyrine lamp")
+    assert _search(client, "zephyr") == ["Zephyrine lamp"]
+
+    assert client.put(f"/api/products/{product_id}", json={"name": "Quokkaline lamp"}).status_code == 200
+    assert _search(client, "zephyr") == []
+    assert _search(client, "quokka lamp") == ["Quokkaline lamp"]
+
+    assert client.delete(f"/api/products/{product_id}").status_code == 200
+    assert _search(client, "quokka") == []
+
+
+def test_overlay_shadows_the_posting_arrays(client, reload_index):
+    product_id = _create(client, "Marmoset mug")
+    reload_index()
+    assert _search(client, "marmo") == ["Marmoset mug"]
+
+    client.put(f"/api/products/{product_id}", json={"name": "Plain mug", "description": "formerly marmoset"})
+    assert _search(client, "marmoset mug") == ["Plain mug"]
+    client.delete(f"/api/products/{product_id}")
+    assert _search(client, "marmo") == []
+
+    reload_index()
+    assert _search(client, "marmo") == []
+
+
+def test_name_matches_rank_first_and_every_term_must_match(client, reload_index):
+    _create(client, "Ocelot poster", "wall art")
+    reload_index()
+    _create(client, "Wall clock", "ocelot themed")
+    _create(client, "Ocelot figurine")
+
+    assert _search(client, "ocelot") == ["Ocelot poster", "Ocelot figurine", "Wall clock"]
+    assert _search(client, "ocelot wall") == ["Ocelot poster", "Wall clock"]
+    assert _search(client, "ocelot", skip=1, limit=1) == ["Ocelot figurine"]
+
+
+def test_like_scan_is_used_until_the_index_loads(client, monkeypatch):
+    _create(client, "Wombatic kettle", "stainless")
+    _create(client, "Teapot", "a wombatic design")
+    monkeypatch.setattr(product_search_index, "ready", False)
+
+    # The scan matches substrings and orders by id
+    assert _search(client, "ombat") == ["Wombatic kettle", "Teapot"]
+    assert _search(client, "wombatic stainless") == ["Wombatic kettle"]
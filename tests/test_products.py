@@ -0,0 +1,64 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models.models import SaleDailyRollup
+from app.services import revenue_rollup
+from app.services.revenue_rollup import ORPHAN_PRODUCT_ID
+
+TOP_PRODUCTS = "/api/sales/analytics/top-products?start_date=2019-06-01T00:00:00&end_date=2019-06-01T23:59:59"
+
+
+def test_renaming_a_product_refreshes_cached_analytics(client):
+    product = client.post("/api/products/", json={"name": "Old name", "price": 5.0}).json()
+    sale = {"product_id": product["id"], "quantity": 1, "total_amount": 5.0, "sale_date": "2019-06-01T12:00:00"}
+    assert client.post("/api/sales/", json=sale).status_code == 200
+    assert client.get(TOP_PRODUCTS).json()[0]["product_name"] == "Old name"
+
+    assert client.put(f"/api/products/{product['id']}", json={"name": "New name"}).status_code == 200
+    assert client.get(TOP_PRODUCTS).json()[0]["product_name"] == "New name"
+
+
+def _rollup(db, day):
+    rows = db.execute(
+        select(SaleDailyRollup.product_id, SaleDailyRollup.revenue, SaleDailyRollup.order_count, SaleDailyRollup.quantity)
+        .where(SaleDailyRollup.sale_day == day)
+        .order_by(SaleDailyRollup.product_id)
+    ).all()
+    return [tuple(row) for row in rows]
+
+
+def test_deleting_a_product_files_its_rollup_rows_like_a_rebuild(client, db):
+    day = date(2018, 3, 3)
+    kept, deleted = (client.post("/api/products/", json={"name": name, "price": 5.0}).json() for name in ("Kept", "Deleted"))
+    sale_ids = []
+    for product, amount in ((kept, 5.0), (deleted, 7.0), (deleted, 8.0)):
+        sale = {"product_id": product["id"], "quantity": 1, "total_amount": amount, "sale_date": "2018-03-03T12:00:00"}
+        sale_ids.append(client.post("/api/sales/", json=sale).json()["id"])
+
+    assert client.delete(f"/api/products/{deleted['id']}").status_code == 200
+    incremental = _rollup(db, day)
+    assert incremental == [(ORPHAN_PRODUCT_ID, 15.0, 2, 2), (kept["id"], 5.0, 1, 1)]
+
+    revenue_rollup.rebuild_rollup(db, day, day)
+    db.expire_all()
+    assert _rollup(db, day) == incremental
+
+    for sale_id in sale_ids[1:]:
+        assert client.delete(f"/api/sales/{sale_id}").status_code == 200
+    assert _rollup(db, day) == [(kept["id"], 5.0, 1, 1)]
+
+
+def test_sales_of_a_deleted_product_still_serialize(client):
+    product = client.post("/api/products/", json={"name": "Gone", "price": 5.0}).json()
+    sale = {"product_id": product["id"], "quantity": 1, "total_amount": 5.0, "sale_date": "2017-02-02T12:00:00"}
+    sale_id = client.post("/api/sales/", json=sale).json()["id"]
+
+    assert client.delete(f"/api/products/{product['id']}").status_code == 200
+    response = client.get(f"/api/sales/{sale_id}")
+    assert response.status_code == 200
+    assert response.json()["product_id"] is None and response.json()["product"] is None
+
+    listed = client.get("/api/sales/?start_date=2017-02-02T00:00:00&end_date=2017-02-02T23:59:59")
+    assert listed.status_code == 200
+    assert [row["id"] for row in listed.json()] == [sale_id]
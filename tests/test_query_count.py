@@ -0,0 +1,38 @@
+"""The list and detail routes must run a fixed number of queries, however many rows they return"""
+from app.db.instrumentation import QUERY_COUNT_HEADER
+
+
+def _query_count(client, path: str) -> int:
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+    return int(response.headers[QUERY_COUNT_HEADER])
+
+
+def test_sales_list_does_not_query_per_row(client, make_products):
+    make_products(1, sales=1)
+    few = _query_count(client, "/api/sales/?limit=1000")
+    make_products(10, sales=3)
+    assert _query_count(client, "/api/sales/?limit=1000") == few
+    assert _query_count(client, "/api/sales/?limit=1000&cursor=") == few
+
+
+def test_inventory_list_does_not_query_per_row(client, make_products):
+    make_products(1)
+    few = _query_count(client, "/api/inventory/?limit=1000")
+    make_products(10)
+    assert _query_count(client, "/api/inventory/?limit=1000") == few
+    assert _query_count(client, "/api/inventory/?limit=1000&cursor=") == few
+
+
+def test_products_list_does_not_query_per_row(client, make_products):
+    make_products(1)
+    few = _query_count(client, "/api/products/?limit=1000")
+    make_products(10)
+    assert _query_count(client, "/api/products/?limit=1000") == few
+
+
+def test_detail_routes_load_their_product_with_the_row(client, make_products):
+    product = make_products(1, sales=1)[0]
+    assert _query_count(client, f"/api/sales/{product.sales[0].id}") == 1
+    assert _query_count(client, f"/api/inventory/{product.inventory.id}") == 1
+    assert _query_count(client, f"/api/products/{product.id}") == 1
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import main
+from app.db import session
+from app.models.base import Base
+from app.models.models import Product
+
+
+@pytest.fixture
+def replica(client, tmp_path, monkeypatch):
+    """An app whose read routes use a second SQLite file, as with READ_DATABASE_URL set.
+
+    Yields a test client and a sync engine on the replica file.
+    """
+    url = f"sqlite:///{tmp_path}/replica.db"
+    replica_engine = create_engine(url)
+    Base.metadata.create_all(replica_engine)
+    with Session(replica_engine) as db:
+        db.add(Product(name="Only on the replica", price=1.0))
+        db.commit()
+
+    read_engine = create_async_engine(session._async_url(url))
+    monkeypatch.setattr(session, "async_read_engine", read_engine)
+    monkeypatch.setattr(session, "AsyncReadSessionLocal", async_sessionmaker(
+        read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    ))
+    monkeypatch.setattr(main, "async_read_engine", read_engine)
+    with TestClient(main.create_app()) as replica_client:
+        yield replica_client
+        replica_client.portal.call(read_engine.dispose)
+    replica_engine.dispose()
+
+
+def _names(response):
+    assert response.status_code == 200, response.text
+    return {product["name"] for product in response.json()}
+
+
+def test_reads_go_to_the_replica(replica):
+    assert _names(replica.get("/api/products/?limit=1000")) == {"Only on the replica"}
+
+
+def test_header_sends_reads_to_the_primary(replica):
+    names = _names(replica.get("/api/products/?limit=1000", headers={session.READ_PRIMARY_HEADER: "true"}))
+    assert "Only on the replica" not in names
+
+
+def test_writer_reads_its_writes_from_the_primary(replica):
+    response = replica.post("/api/products/", json={"name": "Just written", "price": 1.0})
+    assert response.status_code == 200
+    assert session.READ_PRIMARY_COOKIE in response.cookies
+    assert "Just written" in _names(replica.get("/api/products/?limit=1000"))
+
+    replica.cookies.clear()
+    assert _names(replica.get("/api/products/?limit=1000")) == {"Only on the replica"}
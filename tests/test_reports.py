@@ -0,0 +1,50 @@
+import sys
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import reports
+from app.services.reports import ReportJobs
+
+
+class SharedStore:
+    """Stand-in for the Redis client behind CACHE_URL"""
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, px=None):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+
+def test_jobs_are_visible_to_other_workers(monkeypatch):
+    store = SharedStore()
+    accepting, other = ReportJobs(1, 5, 60, store), ReportJobs(1, 5, 60, store)
+    future = Future()
+    monkeypatch.setattr(accepting, "_executor", lambda: SimpleNamespace(submit=lambda *args: future))
+
+    job = accepting.submit("top_products", {"metric": "revenue", "limit": 5})
+    assert other.lookup(job.id)["status"] == "queued"
+
+    future.set_result([{"product_id": 1, "revenue": 10.0}])
+    shared = other.lookup(job.id)
+    assert shared["status"] == "done"
+    assert shared["result"] == [{"product_id": 1, "revenue": 10.0}]
+    assert other.lookup("unknown") is None
+
+
+def test_unknown_job_without_a_shared_store_names_the_worker(client):
+    response = client.get("/api/reports/unknown")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Report not found or expired in this worker"
+
+
+def test_cache_url_without_redis_names_the_missing_package(monkeypatch):
+    monkeypatch.setattr(reports.settings, "CACHE_URL", "redis://localhost:6379/0")
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(RuntimeError, match="requires the redis package"):
+        reports._build_store()
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app.services import time_buckets
+
+BUCKETS = "/api/sales/revenue/buckets"
+
+
+def test_bucket_cap_is_checked_without_walking_the_range(client):
+    started = time.perf_counter()
+    response = client.get(BUCKETS, params={
+        "granularity": "hour", "start_date": "0001-01-02T00:00:00", "end_date": "2500-12-31T00:00:00",
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("21914497 hour buckets requested")
+    assert time.perf_counter() - started < 1
+
+
+@pytest.mark.parametrize("path, params", [
+    (BUCKETS, {"granularity": "year", "start_date": "9990-01-01T00:00:00", "end_date": "9999-12-31T00:00:00"}),
+    (BUCKETS, {"granularity": "day", "start_date": "0001-01-01T00:00:00", "end_date": "0001-01-05T00:00:00",
+               "timezone": "Europe/Berlin"}),
+    ("/api/sales/revenue/daily", {"start_date": "9999-12-01T00:00:00", "end_date": "9999-12-31T00:00:00", "timezone": "Europe/Berlin"}),
+])
+def test_ranges_reaching_the_ends_of_the_calendar_are_rejected(client, path, params):
+    response = client.get(path, params=params)
+    assert response.status_code == 400
+    assert "outside the supported dates" in response.json()["detail"]
+
+
+def test_local_daily_revenue_is_capped(client):
+    response = client.get("/api/sales/revenue/daily", params={
+        "start_date": "1900-01-01T00:00:00", "end_date": "2100-01-01T00:00:00", "timezone": "Europe/Berlin",
+    })
+    assert response.status_code == 400
+    assert "day buckets requested" in response.json()["detail"]
+
+
+def test_report_past_the_end_of_the_calendar_is_not_queued(client):
+    response = client.post("/api/reports", json={
+        "report": "revenue", "granularity": "year", "start_date": "9990-01-01T00:00:00", "end_date": "9999-12-31T00:00:00",
+    })
+    assert response.status_code == 400
+
+
+def test_wide_year_range_only_looks_up_offsets_around_the_sales(client):
+    product = client.post("/api/products/", json={"name": "Yearly", "price": 5.0}).json()
+    sale = {"product_id": product["id"], "quantity": 1, "total_amount": 5.0, "sale_date": "2015-07-01T22:30:00"}
+    assert client.post("/api/sales/", json=sale).status_code == 200
+
+    started = time.perf_counter()
+    response = client.get(BUCKETS, params={
+        "granularity": "year", "timezone": "Europe/Berlin", "product_id": product["id"],
+        "start_date": "0002-01-01T00:00:00", "end_date": "9990-01-01T00:00:00",
+    })
+    assert response.status_code == 200, response.text
+    assert time.perf_counter() - started < 1
+    assert [(row["start"][:10], row["order_count"]) for row in response.json()] == [("2015-01-01", 1)]
+
+
+def test_revenue_report_over_the_bucket_limit_is_not_queued(client):
+    response = client.post("/api/reports", json={
+        "report": "revenue", "granularity": "hour", "start_date": "2010-01-01T00:00:00", "end_date": "2020-01-01T00:00:00",
+    })
+    assert response.status_code == 400
+    assert "hour buckets requested" in response.json()["detail"]
+
+
+def test_bucket_totals_refuses_too_many_buckets_before_querying():
+    zone = time_buckets.get_zone("UTC")
+    with pytest.raises(ValueError, match="87649 hour buckets requested"):
+        asyncio.run(time_buckets.bucket_totals(None, "hour", zone, datetime(2010, 1, 1), datetime(2020, 1, 1)))
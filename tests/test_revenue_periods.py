@@ -0,0 +1,33 @@
+import pytest
+
+PERIODS = "/api/sales/revenue/compare/periods"
+
+
+@pytest.mark.parametrize("period", [
+    "2024-01-07T00:00:00Z/2024-01-01T00:00:00",
+    "2024-01-07T00:00:00/2024-01-01T00:00:00+02:00",
+])
+def test_backwards_period_with_one_offset_is_rejected(client, period):
+    response = client.get(PERIODS, params={"period": period})
+    assert response.status_code == 400
+    assert "ends before it starts" in response.json()["detail"]
+
+
+def test_period_with_one_offset_is_compared(client):
+    response = client.get(PERIODS, params={"period": "2020-01-01T00:00:00Z/2020-01-07T00:00:00"})
+    assert response.status_code == 200, response.text
+    assert response.json()["periods"][0]["order_count"] == 0
+
+
+def test_period_bounds_are_compared_by_wall_clock_like_the_query(client):
+    product = client.post("/api/products/", json={"name": "Wall clock", "price": 5.0}).json()
+    sale = {"product_id": product["id"], "quantity": 1, "total_amount": 5.0, "sale_date": "2013-01-02T00:30:00"}
+    assert client.post("/api/sales/", json=sale).status_code == 200
+
+    response = client.get(PERIODS, params={"period": "2013-01-01T23:00:00-05:00/2013-01-02T01:00:00Z"})
+    assert response.status_code == 200, response.text
+    assert response.json()["periods"][0]["order_count"] == 1
+
+    response = client.get(PERIODS, params={"period": "2013-01-02T01:00:00+05:00/2013-01-01T23:00:00Z"})
+    assert response.status_code == 400
+    assert "ends before it starts" in response.json()["detail"]
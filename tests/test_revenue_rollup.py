@@ -0,0 +1,47 @@
+from app.db.session import async_read_engine
+from app.services.sales_snapshot import sales_snapshot
+
+
+def _edge_day_sales(client, year: int):
+    """A product with sales on both sides of 13:00 May 2nd and 11:00 May 3rd of ``year``"""
+    product = client.post("/api/products/", json={"name": "Edge days", "price": 1.0}).json()
+    for sale_date, amount in (
+        ("05-02T12:00:00", 1.0),
+        ("05-03T09:00:00", 10.0),
+        ("05-03T12:00:00", 100.0),
+        ("05-04T00:00:00", 1000.0),
+    ):
+        sale = {"product_id": product["id"], "quantity": 1, "total_amount": amount, "sale_date": f"{year}-{sale_date}"}
+        assert client.post("/api/sales/", json=sale).status_code == 200
+    return product
+
+
+def _assert_edge_days_are_cut(client, product, year: int):
+    bounds = {"start_date": f"{year}-05-02T13:00:00", "end_date": f"{year}-05-03T11:00:00"}
+    daily = client.get("/api/sales/revenue/daily", params=bounds).json()
+    assert daily == [{"period": f"{year}-05-03", "total_revenue": 10.0}]
+    weekly = client.get("/api/sales/revenue/weekly", params=bounds).json()
+    assert [week["total_revenue"] for week in weekly] == [10.0]
+
+    revenue = client.get(f"/api/sales/revenue/product/{product['id']}", params=bounds).json()
+    assert (revenue["revenue"], revenue["order_count"]) == (10.0, 1)
+
+    # Whole days still come from the rollup
+    whole = {"start_date": f"{year}-05-02T00:00:00", "end_date": f"{year}-05-03T23:59:59.999999"}
+    daily = client.get("/api/sales/revenue/daily", params=whole).json()
+    assert daily == [
+        {"period": f"{year}-05-02", "total_revenue": 1.0},
+        {"period": f"{year}-05-03", "total_revenue": 110.0},
+    ]
+
+
+def test_revenue_bounds_inside_a_day_are_applied_exactly(client):
+    product = _edge_day_sales(client, 2017)
+    _assert_edge_days_are_cut(client, product, 2017)
+
+
+def test_snapshot_applies_the_same_bounds(client, monkeypatch):
+    product = _edge_day_sales(client, 2016)
+    monkeypatch.setattr(sales_snapshot, "ready", False)
+    client.portal.call(sales_snapshot.refresh, async_read_engine)
+    _assert_edge_days_are_cut(client, product, 2016)
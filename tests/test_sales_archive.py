@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.db.pagination import NEXT_CURSOR_HEADER
+from app.models.models import Sale, SaleArchive
+from app.services.sales_archive import archive_sales
+
+# Every test's old sales fall before this, and no other test's sales do
+CUTOFF = datetime(1991, 1, 1)
+
+
+def _add_sales(db, product_id: int, first: datetime, count: int):
+    sales = [
+        Sale(product_id=product_id, quantity=1, total_amount=1.0, sale_date=first + timedelta(days=n))
+        for n in range(count)
+    ]
+    db.add_all(sales)
+    db.commit()
+    return [sale.id for sale in sales]
+
+
+@pytest.fixture
+def archived(client, make_products, db):
+    """A product with four archived sales from 1990 and two hot ones from 1995"""
+    product_id = make_products(1)[0].id
+    old = _add_sales(db, product_id, datetime(1990, 1, 1), 4)
+    hot = _add_sales(db, product_id, datetime(1995, 1, 1), 2)
+    archive_sales(db, CUTOFF, batch_size=3)
+    return product_id, old, hot
+
+
+def _ids(response):
+    assert response.status_code == 200, response.text
+    return [sale["id"] for sale in response.json()]
+
+
+def test_old_sales_move_to_the_archive(archived, db):
+    product_id, old, hot = archived
+    assert db.scalars(select(SaleArchive.id).where(SaleArchive.product_id == product_id).order_by(SaleArchive.id)).all() == old
+    assert db.scalars(select(Sale.id).where(Sale.product_id == product_id).order_by(Sale.id)).all() == hot
+
+
+def test_archiving_keeps_the_newest_sale_hot(client, make_products, db):
+    product_id = make_products(1)[0].id
+    older, newest = _add_sales(db, product_id, datetime(1990, 6, 1), 2)
+    assert archive_sales(db, CUTOFF) == 1
+    assert db.get(SaleArchive, older) is not None
+    assert db.get(Sale, newest) is not None and db.get(SaleArchive, newest) is None
+
+
+def test_skip_limit_pages_continue_from_hot_into_archived_sales(client, archived):
+    product_id, old, hot = archived
+    page = lambda skip: _ids(client.get("/api/sales/", params={"product_id": product_id, "skip": skip, "limit": 3}))
+    assert page(0) == [*hot, old[0]]
+    assert page(3) == old[1:]
+    assert page(6) == []
+
+
+def test_cursor_pages_merge_both_tables_by_date(client, archived):
+    product_id, old, hot = archived
+    ids, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/api/sales/", params={"product_id": product_id, "limit": 4, "cursor": cursor})
+        ids.extend(_ids(response))
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    assert ids == [*old, *hot]
+
+
+def test_archived_sales_are_read_only(client, archived):
+    _, old, _ = archived
+    assert client.get(f"/api/sales/{old[0]}").status_code == 200
+    update = {"quantity": 2, "product_id": archived[0]}
+    assert client.put(f"/api/sales/{old[0]}", json=update).status_code == 409
+    assert client.delete(f"/api/sales/{old[0]}").status_code == 409
+    assert client.delete("/api/sales/999999").status_code == 404
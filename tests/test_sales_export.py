@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.models import Sale
+from app.services.sales_archive import archive_sales
+from app.services.sales_export import EXPORT_FIELDS
+
+EXPORT = "/api/sales/export"
+
+
+@pytest.fixture
+def product_id(client, make_products, db, monkeypatch):
+    """A product with three archived sales from 1988 and three hot ones from 2014, exported two rows per batch"""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    product_id = make_products(1)[0].id
+    for first in (datetime(1988, 1, 1), datetime(2014, 1, 1)):
+        db.add_all(
+            Sale(product_id=product_id, quantity=n + 1, total_amount=2.5 * (n + 1), sale_date=first + timedelta(days=n))
+            for n in range(3)
+        )
+    db.commit()
+    archive_sales(db, datetime(1989, 1, 1))
+    return product_id
+
+
+def _listed(client, **params) -> list:
+    response = client.get("/api/sales/", params={"limit": 1000, **params})
+    assert response.status_code == 200, response.text
+    return sorted(
+        ({field: sale[field] for field in ("id", "product_id", "quantity", "total_amount", "sale_date")}
+         for sale in response.json()),
+        key=lambda sale: sale["id"],
+    )
+
+
+def _exported(client, format: str, **params) -> list:
+    response = client.get(EXPORT, params={"format": format, **params})
+    assert response.status_code == 200, response.text
+    if format == "csv":
+        assert response.headers["content-type"].startswith("text/csv")
+        reader = csv.DictReader(io.StringIO(response.text))
+        assert reader.fieldnames == EXPORT_FIELDS
+        rows = [
+            {"id": int(row["id"]), "product_id": int(row["product_id"]), "quantity": int(row["quantity"]),
+             "total_amount": float(row["total_amount"]), "sale_date": row["sale_date"]}
+            for row in reader
+        ]
+    else:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert all(list(row) == EXPORT_FIELDS for row in rows)
+        rows = [{field: row[field] for field in ("id", "product_id", "quantity", "total_amount", "sale_date")} for row in rows]
+    return sorted(rows, key=lambda sale: sale["id"])
+
+
+@pytest.mark.parametrize("format", ["csv", "ndjson"])
+def test_export_matches_the_listing_for_the_same_filters(client, product_id, format):
+    for params in (
+        {"product_id": product_id},
+        {"product_id": product_id, "start_date": "1988-01-02T00:00:00", "end_date": "2014-01-02T00:00:00"},
+        {"start_date": "1988-01-01T00:00:00", "end_date": "1988-01-02T00:00:00"},
+    ):
+        listed = _listed(client, **params)
+        assert listed, params
+        assert _exported(client, format, **params) == listed
+
+
+def test_export_covers_archived_and_hot_sales(client, product_id):
+    rows = _exported(client, "ndjson", product_id=product_id)
+    assert [row["sale_date"][:4] for row in rows] == ["1988"] * 3 + ["2014"] * 3
+    assert [row["quantity"] for row in rows] == [1, 2, 3, 1, 2, 3]
+
+
+def test_export_rejects_an_unknown_format(client):
+    assert client.get(EXPORT, params={"format": "xlsx"}).status_code == 422
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.db.session import async_read_engine
+from app.models.models import Sale
+from app.services.sales_snapshot import sales_snapshot
+
+DAY = "start_date=2030-01-01T00:00:00&end_date=2030-01-01T23:59:59"
+
+
+@pytest.fixture
+def snapshot(client, monkeypatch):
+    """The app's sales snapshot, built and serving the revenue routes for one test"""
+    monkeypatch.setattr(sales_snapshot, "ready", False)
+    client.portal.call(sales_snapshot.refresh, async_read_engine)
+    yield sales_snapshot
+
+
+def _daily_revenue(client) -> float:
+    response = client.get(f"/api/sales/revenue/daily?{DAY}")
+    assert response.status_code == 200, response.text
+    return sum(day["total_revenue"] for day in response.json())
+
+
+def test_revenue_includes_a_sale_created_since_the_last_refresh(client, make_products, snapshot):
+    product = make_products(1)[0]
+    sale = {"product_id": product.id, "quantity": 1, "total_amount": 10.0, "sale_date": "2030-01-01T12:00:00"}
+    assert client.post("/api/sales/", json=sale).status_code == 200
+    assert _daily_revenue(client) == 10.0
+
+    sale["total_amount"] = 100.0
+    assert client.post("/api/sales/place", json=sale).status_code == 200
+    assert client.post("/api/sales/bulk", json=[sale]).status_code == 200
+    assert _daily_revenue(client) == 210.0
+
+
+def test_changes_during_a_rebuild_survive_the_swap(client, make_products, snapshot, monkeypatch):
+    product = make_products(1, sales=2)[0]
+    updated, deleted = product.sales
+    fetch = sales_snapshot._fetch
+
+    async def fetch_then_write(*args):
+        parts = await fetch(*args)
+        # Committed after the rebuild read these rows
+        sales_snapshot.apply_update(updated.id, product.id, 5, 500.0, datetime(2031, 1, 1, 12))
+        sales_snapshot.apply_delete(deleted.id)
+        return parts
+
+    monkeypatch.setattr(sales_snapshot, "_fetch", fetch_then_write)
+    client.portal.call(lambda: sales_snapshot.refresh(async_read_engine, rebuild=True))
+    assert sales_snapshot.daily_totals(datetime(2031, 1, 1), datetime(2031, 1, 1, 23))[0].revenue == 500.0
+    totals = sales_snapshot.product_totals(product.id, datetime(2024, 1, 1), datetime(2024, 12, 31))
+    assert totals.order_count == 0
+
+
+def test_revenue_reads_do_not_wait_for_a_rebuild(client, make_products, snapshot, monkeypatch):
+    make_products(1, sales=1)
+    locked_while_reading = []
+    fetch = sales_snapshot._fetch
+
+    async def fetch_and_check(engine, after_id, batch_size):
+        locked_while_reading.append(sales_snapshot._lock.locked())
+        return await fetch(engine, after_id, batch_size)
+
+    monkeypatch.setattr(sales_snapshot, "_fetch", fetch_and_check)
+    client.portal.call(lambda: sales_snapshot.refresh(async_read_engine, rebuild=True))
+    assert locked_while_reading == [False]
+
+    async def catch_up_during_a_refresh():
+        async with sales_snapshot._lock:
+            sales_snapshot.mark_stale()
+            await asyncio.wait_for(sales_snapshot.catch_up(async_read_engine, 0), 1)
+
+    client.portal.call(catch_up_during_a_refresh)
+    assert sales_snapshot.stale
+
+
+def test_refresh_picks_up_a_sale_committed_below_the_highest_id(client, make_products, db, snapshot):
+    product = make_products(1, sales=2)[0]
+    late = min(product.sales, key=lambda sale: sale.id)
+    values = {column: getattr(late, column) for column in ("id", "product_id", "quantity", "total_amount", "sale_date")}
+    db.delete(late)
+    db.commit()
+
+    # The higher id is read before the lower one commits
+    client.portal.call(sales_snapshot.refresh, async_read_engine)
+    window = (datetime(2024, 1, 1), datetime(2024, 12, 31))
+    assert sales_snapshot.product_totals(product.id, *window).order_count == 1
+
+    db.add(Sale(**values))
+    db.commit()
+    client.portal.call(sales_snapshot.refresh, async_read_engine)
+    assert sales_snapshot.product_totals(product.id, *window).order_count == 2
+    client.portal.call(sales_snapshot.refresh, async_read_engine)
+    assert sales_snapshot.product_totals(product.id, *window).order_count == 2
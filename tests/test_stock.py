@@ -0,0 +1,53 @@
+from sqlalchemy import func, select
+
+from app.models.models import Inventory, InventoryEvent, Sale, SaleDailyRollup
+
+
+def _sale(product_id: int, quantity: int) -> dict:
+    return {"product_id": product_id, "quantity": quantity, "total_amount": 2.5 * quantity, "sale_date": "2012-04-04T10:00:00"}
+
+
+def _state(db, product_id: int):
+    db.expire_all()
+    return (
+        db.scalar(select(Inventory.quantity).where(Inventory.product_id == product_id)),
+        db.scalar(select(func.count(Sale.id)).where(Sale.product_id == product_id)),
+        db.execute(
+            select(SaleDailyRollup.revenue, SaleDailyRollup.order_count, SaleDailyRollup.quantity)
+            .where(SaleDailyRollup.product_id == product_id)
+        ).all(),
+        db.execute(
+            select(InventoryEvent.reason, InventoryEvent.delta, InventoryEvent.quantity)
+            .where(InventoryEvent.product_id == product_id)
+            .order_by(InventoryEvent.id)
+        ).all(),
+    )
+
+
+def test_placed_sale_takes_stock_and_logs_it(client, make_products, db):
+    product_id = make_products(1)[0].id
+    response = client.post("/api/sales/place", json=_sale(product_id, 30))
+    assert response.status_code == 200, response.text
+
+    quantity, sales, rollup, events = _state(db, product_id)
+    assert (quantity, sales) == (70, 1)
+    assert rollup == [(75.0, 1, 30)]
+    assert events == [("sale", -30, 70)]
+
+
+def test_oversell_is_refused_without_recording_anything(client, make_products, db):
+    product_id = make_products(1)[0].id
+    assert client.post("/api/sales/place", json=_sale(product_id, 60)).status_code == 200
+    before = _state(db, product_id)
+
+    response = client.post("/api/sales/place", json=_sale(product_id, 41))
+    assert response.status_code == 409
+    assert _state(db, product_id) == before
+
+
+def test_product_without_inventory_is_not_found(client, db):
+    product = client.post("/api/products/", json={"name": "Unstocked", "price": 2.5}).json()
+    response = client.post("/api/sales/place", json=_sale(product["id"], 1))
+    assert response.status_code == 404
+    _, sales, rollup, events = _state(db, product["id"])
+    assert (sales, rollup, events) == (0, [], [])